@@ -4,10 +4,8 @@ Dahora App - Aplicação principal
 
 import sys
 import os
-import hashlib
 import logging
 import threading
-import pyperclip
 import pystray
 import keyboard
 import time
@@ -35,6 +33,7 @@ from dahora_app import (
 from dahora_app.single_instance import initialize_single_instance, cleanup_single_instance
 from dahora_app.thread_sync import initialize_sync
 from dahora_app.callback_manager import CallbackRegistry
+from dahora_app.utils import truncate_text
 from dahora_app.handlers import (
     CopyDateTimeHandler,
     ShowSearchHandler,
@@ -89,13 +88,37 @@ class DahoraApp:
         logging.info("Inicializando Dahora App...")
 
         self.counter.load()
-        self.clipboard_manager.load_history()
         self.settings_manager.load()
+        self.clipboard_manager.set_storage_engine(
+            self.settings_manager.history_storage_engine
+        )
 
+        # Limites aplicados antes do load para não truncar o histórico no padrão
         try:
             self.clipboard_manager.set_max_history_items(
                 int(self.settings_manager.max_history_items)
             )
+            self.clipboard_manager.set_inline_limit(
+                int(self.settings_manager.history_inline_limit_kb) * 1024
+            )
+            self.clipboard_manager.set_retention_limits(
+                int(self.settings_manager.history_max_total_kb) * 1024,
+                int(self.settings_manager.history_max_entry_kb) * 1024,
+            )
+            self.clipboard_manager.set_persistence_config(
+                int(self.settings_manager.history_flush_latency_ms),
+                int(self.settings_manager.history_flush_max_pending),
+            )
+            self.clipboard_manager.set_eviction_policy(
+                self.settings_manager.history_eviction_policy
+            )
+            self.clipboard_manager.set_expiry_policy(
+                int(self.settings_manager.history_entry_ttl_minutes) * 60,
+                [
+                    (r["pattern"], int(r["ttl_minutes"]) * 60)
+                    for r in self.settings_manager.history_expiry_rules
+                ],
+            )
             self.clipboard_manager.set_monitoring_config(
                 float(self.settings_manager.clipboard_monitor_interval),
                 float(self.settings_manager.clipboard_idle_threshold),
@@ -106,6 +129,10 @@ class DahoraApp:
                 exc_info=False,
             )
 
+        # Só os itens do menu do tray (5) são abertos antes do ícone aparecer;
+        # o restante do histórico carrega em segundo plano
+        self.clipboard_manager.load_history(tail_items=5)
+
         try:
             if self._file_handler is not None:
                 self._file_handler.maxBytes = int(self.settings_manager.log_max_bytes)
@@ -162,6 +189,27 @@ class DahoraApp:
                 self.clipboard_manager.set_max_history_items(
                     int(current_settings.get("max_history_items", 100))
                 )
+                self.clipboard_manager.set_inline_limit(
+                    int(current_settings.get("history_inline_limit_kb", 256)) * 1024
+                )
+                self.clipboard_manager.set_retention_limits(
+                    int(current_settings.get("history_max_total_kb", 65536)) * 1024,
+                    int(current_settings.get("history_max_entry_kb", 16384)) * 1024,
+                )
+                self.clipboard_manager.set_persistence_config(
+                    int(current_settings.get("history_flush_latency_ms", 750)),
+                    int(current_settings.get("history_flush_max_pending", 64)),
+                )
+                self.clipboard_manager.set_eviction_policy(
+                    current_settings.get("history_eviction_policy", "fifo")
+                )
+                self.clipboard_manager.set_expiry_policy(
+                    int(current_settings.get("history_entry_ttl_minutes", 0)) * 60,
+                    [
+                        (r["pattern"], int(r["ttl_minutes"]) * 60)
+                        for r in current_settings.get("history_expiry_rules", [])
+                    ],
+                )
                 self.clipboard_manager.set_monitoring_config(
                     float(current_settings.get("clipboard_monitor_interval", 3.0)),
                     float(current_settings.get("clipboard_idle_threshold", 30.0)),
@@ -232,15 +280,30 @@ class DahoraApp:
         self.settings_dialog.notification_callback = self.notification_manager.show_toast
 
         self.search_dialog.set_get_history_callback(
-            lambda: self.clipboard_manager.clipboard_history
+            lambda: self.clipboard_manager.get_recent_items(
+                self.clipboard_manager.max_history_items
+            )
         )
+        self.search_dialog.set_search_callback(self.clipboard_manager.search)
         self.search_dialog.set_copy_callback(self._copy_from_history)
         self.search_dialog.notification_callback = self.notification_manager.show_toast
 
         self.modern_search_dialog.set_get_history_callback(
-            lambda: self.clipboard_manager.clipboard_history
+            lambda: self.clipboard_manager.get_recent_items(
+                self.clipboard_manager.max_history_items
+            )
+        )
+        self.modern_search_dialog.set_search_callback(self.clipboard_manager.search)
+        self.modern_search_dialog.set_fuzzy_search_callback(
+            lambda query, limit=None, offset=0: self.clipboard_manager.search(
+                query, limit, fuzzy=True, offset=offset
+            )
+        )
+        self.modern_search_dialog.set_history_version_callback(
+            lambda: self.clipboard_manager.history_version
         )
         self.modern_search_dialog.set_copy_callback(self._copy_from_history)
+        self.modern_search_dialog.set_delete_callback(self._delete_from_history)
         self.modern_search_dialog.notification_callback = (
             self.notification_manager.show_toast
         )
@@ -313,6 +376,9 @@ class DahoraApp:
             self.clipboard_manager.get_recent_items
         )
         self.menu_builder.set_copy_from_history_callback(self._copy_from_history)
+        self.clipboard_manager.set_on_items_removed_callback(
+            self._on_history_items_removed
+        )
         self.menu_builder.set_clear_history_callback(self._clear_history)
         self.menu_builder.set_show_about_callback(self._show_about)
         self.menu_builder.set_toggle_pause_callback(self._toggle_pause)
@@ -356,14 +422,12 @@ class DahoraApp:
 
     def _on_ctrl_c(self):
         """Callback para Ctrl+C"""
-        current_content = self.clipboard_manager.paste_text()
-        if current_content and current_content.strip():
-            self.clipboard_manager.add_to_history(current_content)
-            content_len = len(current_content)
-            content_hash = hashlib.sha256(
-                current_content.encode("utf-8", errors="replace")
-            ).hexdigest()[:12]
-            logging.info(f"Ctrl+C detectado: len={content_len}, sha256={content_hash}")
+        # Só acorda o monitor na hora, em vez de esperar o próximo tick: ele é
+        # o único caminho de ingestão (via `enqueue_text`, em lote), então cada
+        # cópia entra (e conta como reuso no LRU/LFU e na busca aproximada) uma
+        # única vez
+        self.clipboard_manager.notify_clipboard_changed()
+        logging.info("Ctrl+C detectado")
 
     def _on_history_updated(self):
         """Callback quando o histórico do clipboard é atualizado"""
@@ -420,13 +484,14 @@ class DahoraApp:
             dt_string = self.datetime_formatter.format_with_prefix(prefix)
             self.clipboard_manager.mark_own_content(dt_string)
 
+            clipboard = self.clipboard_manager.clipboard_backend
             clipboard_backup = None
             try:
-                clipboard_backup = pyperclip.paste()
+                clipboard_backup = clipboard.read_text()
             except Exception:
                 pass
 
-            pyperclip.copy(dt_string)
+            clipboard.write_text(dt_string)
             time.sleep(0.05)
 
             keyboard.send("ctrl+v")
@@ -434,7 +499,7 @@ class DahoraApp:
 
             if clipboard_backup is not None:
                 try:
-                    pyperclip.copy(clipboard_backup)
+                    clipboard.write_text(clipboard_backup)
                 except Exception:
                     pass
 
@@ -674,12 +739,14 @@ class DahoraApp:
         except Exception as e:
             logging.warning(f"Erro ao atualizar menu: {e}")
 
-    def _copy_from_history(self, text: str):
-        """Copia item do histórico"""
+    def _copy_from_history(self, item):
+        """Copia item do histórico (HistoryEntry ou texto)"""
+        text = self.clipboard_manager.load_text(item)
         self.clipboard_manager.copy_text(text)
         count = self.counter.increment()
         self.notification_manager.show_toast(
-            "Dahora App", f"Copiado do histórico!\n{text}\nTotal: {count}ª vez"
+            "Dahora App",
+            f"Copiado do histórico!\n{truncate_text(text, 200)}\nTotal: {count}ª vez",
         )
 
     def _clear_history(self, icon=None, item=None):
@@ -690,6 +757,19 @@ class DahoraApp:
         )
         self._update_menu()
 
+    def _delete_from_history(self, items):
+        """Exclui itens do histórico (seleção na janela de busca)"""
+        total = self.clipboard_manager.remove(item.key for item in items)
+        self.notification_manager.show_toast(
+            "Dahora App", f"Itens excluídos!\n{total} itens removidos do histórico"
+        )
+        return total
+
+    def _on_history_items_removed(self, items):
+        """Callback quando itens expiram ou são excluídos do histórico"""
+        self.menu_builder.invalidate_cache()
+        self._update_menu()
+
     def _show_about(self, icon, item):
         """Mostra janela Sobre (UI Moderna)"""
         self._run_on_ui_thread(lambda: self.modern_about_dialog.show())
@@ -856,6 +936,12 @@ class DahoraApp:
         except Exception:
             pass
 
+        try:
+            self.clipboard_manager.stop_monitoring()
+            self.clipboard_manager.close_history(timeout=2.0)
+        except Exception:
+            pass
+
         try:
             if icon:
                 try:
@@ -968,7 +1054,9 @@ class DahoraApp:
             logging.info("Thread de hotkey iniciada")
 
             monitor_thread = threading.Thread(
-                target=self.clipboard_manager.monitor_clipboard_smart, daemon=True
+                target=self.clipboard_manager.monitor_clipboard_smart,
+                kwargs={"should_stop": self._sync_manager.is_shutdown_requested},
+                daemon=True,
             )
             monitor_thread.start()
             logging.info("Thread de monitoramento de clipboard iniciada")
@@ -74,8 +74,8 @@ class SettingsSavedCallback(Protocol):
 
 @runtime_checkable
 class CopyFromHistoryCallback(Protocol):
-    """Protocol para callback de copiar do histórico"""
-    def __call__(self, text: str) -> None: ...
+    """Protocol para callback de copiar do histórico (recebe o item ou o texto)"""
+    def __call__(self, item: Any) -> None: ...
 
 
 @runtime_checkable
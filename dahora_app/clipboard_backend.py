@@ -0,0 +1,120 @@
+"""
+Acesso ao clipboard do sistema
+
+O monitor copiava o texto inteiro do clipboard a cada tick para descobrir se
+algo mudou. Os backends expõem também `change_token()`, um valor barato que
+muda sempre que o conteúdo muda (no Windows, o número de sequência do
+clipboard): o monitor compara só esse inteiro e lê o texto apenas quando ele
+muda. `MemoryClipboardBackend` é um clipboard em memória, usado em testes e
+benchmarks (roda em qualquer sistema).
+"""
+
+import logging
+import sys
+import threading
+from typing import Any, Optional
+
+import pyperclip
+
+
+class ClipboardBackend:
+    """Interface de acesso ao clipboard"""
+
+    name = ""
+
+    def read_text(self) -> str:
+        """Retorna o texto atual do clipboard ("" se vazio)"""
+        raise NotImplementedError
+
+    def write_text(self, text: str) -> None:
+        """Substitui o conteúdo do clipboard pelo texto"""
+        raise NotImplementedError
+
+    def change_token(self) -> Optional[int]:
+        """
+        Valor que muda sempre que o clipboard muda
+
+        Returns:
+            Inteiro barato de obter, ou None quando o backend não consegue
+            detectar mudanças sem ler o texto
+        """
+        return None
+
+
+class PyperclipBackend(ClipboardBackend):
+    """Clipboard via pyperclip (sem detecção barata de mudança)"""
+
+    name = "pyperclip"
+
+    def read_text(self) -> str:
+        text = pyperclip.paste()
+        return text if text is not None else ""
+
+    def write_text(self, text: str) -> None:
+        pyperclip.copy(text)
+
+
+class WindowsClipboardBackend(PyperclipBackend):
+    """Clipboard do Windows com o número de sequência como token de mudança"""
+
+    name = "win32"
+
+    def __init__(self, user32: Any = None):
+        """
+        Inicializa o backend
+
+        Args:
+            user32: Biblioteca user32 (padrão: `ctypes.windll.user32`)
+        """
+        if user32 is None:
+            if sys.platform != "win32":
+                raise OSError("user32 só existe no Windows")
+            import ctypes
+            from ctypes import wintypes
+
+            user32 = ctypes.windll.user32
+            user32.GetClipboardSequenceNumber.restype = wintypes.DWORD
+            user32.GetClipboardSequenceNumber.argtypes = []
+        self._user32 = user32
+
+    def change_token(self) -> Optional[int]:
+        # 0 = sem acesso à window station; nesse caso o monitor compara o texto
+        sequence = int(self._user32.GetClipboardSequenceNumber())
+        return sequence or None
+
+
+class MemoryClipboardBackend(ClipboardBackend):
+    """Clipboard em memória com contador de sequência (testes e benchmarks)"""
+
+    name = "memory"
+
+    def __init__(self, text: str = ""):
+        self._lock = threading.Lock()
+        self._text = text
+        self._sequence = 1
+        self.reads = 0
+        self.writes = 0
+
+    def read_text(self) -> str:
+        with self._lock:
+            self.reads += 1
+            return self._text
+
+    def write_text(self, text: str) -> None:
+        with self._lock:
+            self.writes += 1
+            self._text = text if text is not None else ""
+            self._sequence += 1
+
+    def change_token(self) -> Optional[int]:
+        return self._sequence
+
+
+def get_default_clipboard_backend() -> ClipboardBackend:
+    """Retorna o backend com número de sequência no Windows e pyperclip nos demais"""
+    if sys.platform == "win32":
+        try:
+            return WindowsClipboardBackend()
+        except Exception as e:
+            logging.warning(f"Número de sequência do clipboard indisponível: {e}")
+    return PyperclipBackend()
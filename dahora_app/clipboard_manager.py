@@ -2,30 +2,145 @@
 Gerenciamento de clipboard e histórico
 """
 
+import functools
 import json
-import hashlib
 import logging
 import os
+import re
 import shutil
 import threading
 import time
-from datetime import datetime
 from threading import Lock
-from typing import List, Dict, Optional, Any
-import pyperclip
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+)
 from dahora_app.constants import (
     HISTORY_FILE,
     MAX_HISTORY_ITEMS,
+    MAX_HISTORY_ITEMS_JSON,
+    MAX_HISTORY_ITEMS_SQLITE,
+    SQLITE_MEMORY_ITEMS,
     CLIPBOARD_MONITOR_INTERVAL,
     CLIPBOARD_IDLE_THRESHOLD,
 )
 from dahora_app.utils import (
     atomic_write_json,
-    dpapi_encrypt_bytes,
     dpapi_decrypt_bytes,
     b64encode_bytes,
     b64decode_str,
 )
+from dahora_app.clipboard_backend import (
+    ClipboardBackend,
+    get_default_clipboard_backend,
+)
+from dahora_app.eviction import (
+    EVICTION_FIFO,
+    EvictionPolicy,
+    create_eviction_policy,
+)
+from dahora_app.expiring_set import ExpiringSet
+from dahora_app.history_journal import HistoryJournal
+from dahora_app.ingest_queue import IngestQueue
+from dahora_app.persistence_worker import PersistenceWorker
+from dahora_app.polling_policy import PollingPolicy
+from dahora_app.history_blobs import BlobStore, stream_digest
+from dahora_app.history_sqlite import SqliteHistoryStore
+from dahora_app.history_index import TrigramIndex, split_terms
+from dahora_app.history_buffer import HistoryBuffer
+from dahora_app.history_entry import (
+    HistoryEntry,
+    blob_key,
+    fingerprint_text,
+    log_fingerprint,
+)
+from dahora_app.history_crypto import (
+    EncryptionBackend,
+    EnvelopeCipher,
+    get_default_backend,
+)
+
+# Formato do snapshot com um blob selado por item (envelope encryption)
+HISTORY_FORMAT_VERSION = 2
+
+STORAGE_ENGINE_JSON = "json"
+STORAGE_ENGINE_SQLITE = "sqlite"
+STORAGE_ENGINES = (STORAGE_ENGINE_JSON, STORAGE_ENGINE_SQLITE)
+
+# Textos maiores que o limite inline vão para um blob; o item guarda só a prévia
+DEFAULT_INLINE_LIMIT_CHARS = 256 * 1024
+BLOB_PREVIEW_CHARS = 4096
+
+# Retenção por tamanho (em caracteres do texto completo, incluindo blobs)
+DEFAULT_MAX_HISTORY_CHARS = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRY_CHARS = 16 * 1024 * 1024
+
+# Espera máxima da thread de expiração: os prazos são de relógio de parede e
+# um ajuste de hora não deve atrasar a expiração indefinidamente
+EXPIRY_MAX_WAIT_S = 60.0
+
+
+def _seal_key(item: HistoryEntry) -> Hashable:
+    """Chave do cache de itens selados: conteúdo e momento da cópia (uma cópia
+    repetida do mesmo texto é outro item e precisa ser selada de novo)"""
+    return (item.key, item.created)
+
+
+def _is_blob_id(value: Any) -> bool:
+    return (
+        isinstance(value, str)
+        and len(value) == 64
+        and all(c in "0123456789abcdef" for c in value)
+    )
+
+
+class _WritePlan:
+    """Cópia imutável do que uma gravação precisa, capturada sob o lock"""
+
+    __slots__ = (
+        "engine",
+        "force",
+        "snapshot",
+        "items",
+        "journal",
+        "removed",
+        "deleted",
+        "envelope",
+        "payload_meta",
+        "sealed_cache",
+        "journal_file",
+        "store",
+        "epoch",
+        "max_items",
+        "dropped_blobs",
+    )
+
+    def __init__(self, engine: str, force: bool, epoch: int):
+        self.engine = engine
+        self.force = force
+        self.epoch = epoch
+        self.snapshot = False
+        self.items: List[HistoryEntry] = []
+        self.journal: List[HistoryEntry] = []
+        self.removed: List[HistoryEntry] = []
+        self.deleted: List[HistoryEntry] = []
+        self.envelope: Optional[EnvelopeCipher] = None
+        self.payload_meta: Dict[str, Any] = {}
+        self.sealed_cache: Dict[Hashable, str] = {}
+        self.journal_file: Optional[HistoryJournal] = None
+        self.store: Optional[SqliteHistoryStore] = None
+        # SQLite: limite de itens do banco a aplicar nesta gravação (0 = nenhum)
+        self.max_items = 0
+        self.dropped_blobs: List[str] = []
 
 
 class ClipboardManager:
@@ -34,60 +149,749 @@ class ClipboardManager:
     def __init__(self):
         """Inicializa o gerenciador de clipboard"""
         self.history_lock = Lock()
-        self.clipboard_history: List[Dict[str, str]] = []
-        self._history_hash_counts: Dict[str, int] = {}
+        self.max_history_items = int(MAX_HISTORY_ITEMS)
+        # Valor pedido em set_max_history_items (o limite depende do motor)
+        self._requested_max_items = self.max_history_items
+        self.clipboard_history = HistoryBuffer(maxlen=self.max_history_items)
+        # Deduplicação indexada por `HistoryEntry.key` (o próprio texto): o dict
+        # usa o hash nativo de str (calculado uma vez por item) e compara o texto
+        # só quando há colisão. Itens em blob usam o digest do conteúdo.
+        self._history_key_counts: Dict[Hashable, int] = {}
+        self._items_by_key: Dict[Hashable, HistoryEntry] = {}
+        self._search_index = TrigramIndex()
+        # Cópias repetidas de cada item presente (ordenação da busca aproximada;
+        # não persistido)
+        self._reuse_counts: Dict[Hashable, int] = {}
+        # Escolhe o item descartado com o histórico cheio (ver eviction.py)
+        self._eviction: EvictionPolicy = create_eviction_policy(EVICTION_FIFO)
         self.last_clipboard_content = ""
+        # Fingerprint de log do último conteúdo (o SHA-256 não fica em cache no str)
+        self._last_content_log_fp: Tuple[str, str] = ("", "vazio")
+        self.clipboard_backend: ClipboardBackend = get_default_clipboard_backend()
+        # Token da última mudança vista pelo monitor (None = comparar o texto)
+        self._last_change_token: Optional[int] = None
+        # Espera do monitor: acordada por Ctrl+C, pausa e encerramento
+        self._monitor_wakeup = threading.Event()
+        self._monitor_stop = threading.Event()
+        # Ingestão em lote (criada no primeiro enqueue_text)
+        self._ingest_lock = Lock()
+        self._ingest_queue: Optional[IngestQueue] = None
         self.paused = False
-        self._own_content_expiry: Dict[str, float] = {}
+        # Conteúdos colados pelo próprio app, por fingerprint (não retém o texto)
+        self._own_content = ExpiringSet()
+        # Expiração automática: prazo (epoch) de cada item num único heap,
+        # consumido por uma thread que dorme até o próximo vencimento
+        self.default_ttl_s = 0.0
+        self._expiry_rules: List[Tuple[Pattern[str], float]] = []
+        self._expiry = ExpiringSet(clock=time.time)
+        self._expiry_wakeup = threading.Event()
+        self._expiry_stop = threading.Event()
+        self._expiry_thread: Optional[threading.Thread] = None
+        self._on_items_removed: Optional[Callable[[List[HistoryEntry]], None]] = None
+
+        # Caminhos fixados na construção: uma gravação tardia (worker, journal)
+        # vai sempre para o mesmo lugar, mesmo que o módulo mude depois
+        self._history_file = HISTORY_FILE
+        self._data_dir = os.path.dirname(HISTORY_FILE)
 
         self._dpapi_entropy = b"DahoraApp-clipboard-history-v1"
         self._history_write_disabled = False
         self._history_write_disabled_reason = ""
         self._history_write_disabled_until: float = 0.0
-        self._save_timer: Optional[threading.Timer] = None
-        self._save_debounce_s: float = 0.75
-        self.max_history_items = int(MAX_HISTORY_ITEMS)
+        # Gravação em segundo plano: agrupa os avisos de _schedule_save_locked
+        self._persistence = PersistenceWorker(self.save_history)
+        # Serializa as gravações; a serialização e o I/O rodam fora do history_lock
+        self._write_lock = Lock()
+        # Incrementado quando o histórico é substituído (limpeza/carga)
+        self._write_epoch = 0
+        self._journal: Optional[HistoryJournal] = None
+        self._pending_journal: List[HistoryEntry] = []
+        self._pending_removed: List[HistoryEntry] = []
+        # Itens já gravados removidos explicitamente (registro "del" no journal)
+        self._pending_deleted: List[HistoryEntry] = []
+        self._snapshot_required = False
+        self._journal_compact_threshold = 256
+        self._crypto_backend: Optional[EncryptionBackend] = None
+        self._envelope: Optional[EnvelopeCipher] = None
+        self._wrapped_key = ""
+        self._sealed_cache: Dict[Hashable, str] = {}
+        self._blob_store: Optional[BlobStore] = None
+        # Blobs já gravados cujo item ainda não entrou no histórico
+        self._blobs_in_flight: Set[str] = set()
+        self.inline_limit_chars = DEFAULT_INLINE_LIMIT_CHARS
+        self.max_history_chars = DEFAULT_MAX_HISTORY_CHARS
+        self.max_entry_chars = DEFAULT_MAX_ENTRY_CHARS
+        # Soma de `size` dos itens no histórico, mantida a cada inclusão/descarte
+        self._history_chars = 0
+        # Carga tardia: itens antigos ainda não materializados (ver load_history)
+        self.history_ready = threading.Event()
+        self.history_ready.set()
+        self._load_generation = 0
+        self._deferred_loading = False
+        self._deferred_sealed: List[str] = []
+        # Digests com registro "del" no journal: os itens adiados (mais antigos
+        # que o journal) com esses digests foram removidos e não voltam
+        self._deleted_on_replay: Set[str] = set()
+        self.storage_engine = STORAGE_ENGINE_JSON
+        self._sqlite_store: Optional[SqliteHistoryStore] = None
+        # Gravação SQLite em andamento (a busca desconta o que ainda não está no banco)
+        self._sqlite_writing: Optional[_WritePlan] = None
+        # O limite de itens mudou: a próxima gravação corta o banco
+        self._trim_required = False
         self.clipboard_monitor_interval_s = float(CLIPBOARD_MONITOR_INTERVAL)
         self.clipboard_idle_threshold_s = float(CLIPBOARD_IDLE_THRESHOLD)
-
-    def _calc_text_hash(self, text: str) -> str:
-        return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+        self.polling_policy = PollingPolicy(
+            self.clipboard_monitor_interval_s, self.clipboard_idle_threshold_s
+        )
 
     def _rebuild_history_index_locked(self) -> None:
-        counts: Dict[str, int] = {}
+        counts: Dict[Hashable, int] = {}
+        by_key: Dict[Hashable, HistoryEntry] = {}
+        total_chars = 0
+        self._search_index.clear()
         for item in self.clipboard_history:
-            text = item.get("text", "") or ""
-            if not text:
+            total_chars += item.size
+            if not item.text:
+                continue
+            key = item.key
+            counts[key] = counts.get(key, 0) + 1
+            by_key[key] = item
+            # Itens em blob são buscáveis pela prévia
+            self._search_index.add(key, item.text, item.search_key)
+        self._history_key_counts = counts
+        self._items_by_key = by_key
+        self._reuse_counts = {
+            k: n for k, n in self._reuse_counts.items() if k in by_key
+        }
+        self._history_chars = total_chars
+        self._eviction.rebuild(
+            item.key for item in self.clipboard_history if item.text
+        )
+
+    def _forget_items_locked(
+        self, removed: List[HistoryEntry], persist: bool = True
+    ) -> None:
+        """
+        Atualiza contagens e índices apenas para os itens descartados
+
+        Args:
+            persist: False quando o item só sai da memória e continua gravado
+                (modo paginado do SQLite)
+        """
+        for item in removed:
+            self._history_chars -= item.size
+            if not item.text:
                 continue
-            h = self._calc_text_hash(text)
-            counts[h] = counts.get(h, 0) + 1
-        self._history_hash_counts = counts
-
-    def _cancel_pending_save_locked(self) -> None:
-        timer = self._save_timer
-        self._save_timer = None
-        if timer is None:
+            key = item.key
+            if persist:
+                self._pending_removed.append(item)
+            current = self._history_key_counts.get(key, 0)
+            if current <= 1:
+                self._history_key_counts.pop(key, None)
+                self._items_by_key.pop(key, None)
+                self._reuse_counts.pop(key, None)
+                self._search_index.remove(key)
+                self._expiry.discard(key)
+                self._eviction.remove(key)
+            else:
+                self._history_key_counts[key] = current - 1
+
+    def _evict_locked(self, protect: Optional[HistoryEntry] = None) -> HistoryEntry:
+        """
+        Descarta o item escolhido pela política de descarte
+
+        Args:
+            protect: Item que não pode sair (o mais recente, no limite por
+                tamanho); se a política o escolher, sai o mais antigo
+
+        Returns:
+            Item descartado (índices já atualizados)
+        """
+        oldest = self.clipboard_history[0]
+        if self._is_paged():
+            # O banco guarda mais itens que a memória: o mais antigo só sai da
+            # memória e continua buscável; o banco é cortado por `trim`
+            self.clipboard_history.remove_items([oldest])
+            self._forget_items_locked([oldest], persist=False)
+            return oldest
+        key = self._eviction.victim()
+        item = self._items_by_key.get(key) if key is not None else None
+        if item is None or item is protect:
+            item = oldest
+        self.clipboard_history.remove_items([item])
+        self._forget_items_locked([item])
+        if item is not oldest and not self._drop_unsaved_locked(item):
+            # Na carga, snapshot + journal são cortados pelos mais antigos: um
+            # descarte fora dessa ordem (LFU) precisa do seu registro "del"
+            self._pending_deleted.append(item)
+        return item
+
+    def _drop_unsaved_locked(self, item: HistoryEntry) -> bool:
+        """Tira da fila do journal um item ainda não gravado; False se já foi gravado"""
+        unsaved = self._pending_journal
+        for index in range(len(unsaved) - 1, -1, -1):
+            if unsaved[index] is item:
+                del unsaved[index]
+                return True
+        return False
+
+    def _enforce_size_budget_locked(self) -> int:
+        """
+        Descarta itens (pela política de descarte) até o total caber em
+        `max_history_chars`
+
+        O item mais recente é sempre mantido (o limite por item é aplicado na
+        inclusão).
+
+        Returns:
+            Número de itens descartados
+        """
+        excess = self._history_chars - self.max_history_chars
+        if excess <= 0 or len(self.clipboard_history) <= 1:
+            return 0
+        newest = self.clipboard_history[-1]
+        removed = 0
+        while excess > 0 and len(self.clipboard_history) > 1:
+            excess -= self._evict_locked(protect=newest).size
+            removed += 1
+        return removed
+
+    def _replace_item_locked(self, old: HistoryEntry, new: HistoryEntry) -> None:
+        """
+        Troca um item pela sua cópia repetida, que vai para o topo (LRU/LFU)
+
+        A contagem de uso da política é mantida. Na persistência a cópia antiga
+        sai (ou nem chega ao disco, se ainda não foi gravada) e a nova entra.
+        """
+        key = new.key
+        self.clipboard_history.remove_items([old])
+        self.clipboard_history.append(new)
+        self._items_by_key[key] = new
+        # Remove e inclui de novo para a busca refletir a nova recência
+        self._search_index.remove(key)
+        self._search_index.add(key, new.text, new.search_key)
+        self._history_chars += new.size - old.size
+        self._eviction.hit(key)
+        if not self._drop_unsaved_locked(old):
+            self._pending_deleted.append(old)
+            self._pending_removed.append(old)
+        self._pending_journal.append(new)
+
+    def set_eviction_policy(self, name: str) -> None:
+        """
+        Define a política de descarte do histórico
+
+        Args:
+            name: "fifo" (padrão: descarta o mais antigo e ignora cópias
+                repetidas), "lru" (cópia repetida volta ao topo) ou "lfu"
+                (descarta o menos reutilizado)
+        """
+        try:
+            policy = create_eviction_policy(name)
+        except ValueError as e:
+            logging.warning(f"{e}; mantendo {self._eviction.name}")
+            return
+        with self.history_lock:
+            if policy.name == self._eviction.name:
+                return
+            policy.rebuild(item.key for item in self.clipboard_history if item.text)
+            self._eviction = policy
+
+    def _remove_items_locked(self, items: List[HistoryEntry]) -> List[HistoryEntry]:
+        """
+        Remove itens em qualquer posição do histórico
+
+        Atualiza só os índices dos itens removidos. Itens ainda não gravados
+        apenas saem da fila do journal; os demais viram registros "del" (JSON)
+        ou remoções de linhas (SQLite), sem regravar o histórico.
+
+        Returns:
+            Itens removidos
+        """
+        removed = self.clipboard_history.remove_items(items)
+        if not removed:
+            return removed
+        self._forget_items_locked(removed)
+        unsaved = {id(i) for i in self._pending_journal}
+        removed_ids = {id(i) for i in removed}
+        if unsaved & removed_ids:
+            self._pending_journal = [
+                i for i in self._pending_journal if id(i) not in removed_ids
+            ]
+        self._pending_deleted.extend(i for i in removed if id(i) not in unsaved)
+        self._schedule_save_locked()
+        return removed
+
+    def set_on_items_removed_callback(
+        self, callback: Optional[Callable[[List[HistoryEntry]], None]]
+    ) -> None:
+        """Define callback chamado (fora do lock) quando itens expiram ou são removidos"""
+        self._on_items_removed = callback
+
+    def _notify_items_removed(self, removed: List[HistoryEntry]) -> None:
+        callback = self._on_items_removed
+        if callback is None:
             return
         try:
-            timer.cancel()
-        except Exception:
-            pass
+            callback(removed)
+        except Exception as e:
+            logging.warning(f"Falha no callback de itens removidos: {e}")
 
-    def _schedule_save_locked(self) -> None:
-        if self._save_timer is not None:
+    def remove(self, entry_ids: Iterable[Hashable]) -> int:
+        """
+        Remove itens do histórico pelo id (`HistoryEntry.key`)
+
+        Custo proporcional aos itens removidos; a persistência é incremental
+        (registros "del" no journal ou DELETE no SQLite, sem snapshot).
+
+        No modo paginado do SQLite, ids que não estão em memória são removidos
+        direto do banco (ex.: resultados antigos da janela de busca).
+
+        Args:
+            entry_ids: Chaves dos itens (ids desconhecidos são ignorados)
+
+        Returns:
+            Número de itens removidos
+        """
+        stored: List[Hashable] = []
+        with self.history_lock:
+            items = []
+            for key in set(entry_ids):
+                item = self._items_by_key.get(key)
+                if item is not None:
+                    items.append(item)
+                elif self._is_paged():
+                    stored.append(key)
+            removed = self._remove_items_locked(items)
+        total = len(removed)
+        if stored:
+            try:
+                total += self._remove_stored(stored)
+            except Exception as e:
+                logging.warning(f"Falha ao remover itens do banco do histórico: {e}")
+        if total:
+            logging.info(f"Itens removidos do histórico: {total}")
+        if removed:
+            self._notify_items_removed(removed)
+        return total
+
+    def _remove_stored(self, keys: List[Hashable]) -> int:
+        """Remove do banco (e da fila de gravação) itens que não estão em memória"""
+        key_set = set(keys)
+        blobs = [k[1] for k in keys if isinstance(k, tuple)]
+        hashes = [HistoryEntry(k, None).digest for k in keys if isinstance(k, str)]
+        # Sob o _write_lock: uma gravação em andamento não reinsere o item depois
+        with self._write_lock:
+            with self.history_lock:
+                store = self._get_sqlite_store_locked()
+                pending = len(self._pending_journal)
+                self._pending_journal = [
+                    i for i in self._pending_journal if i.key not in key_set
+                ]
+                unsaved = pending - len(self._pending_journal)
+            total = store.remove_hashes(hashes) + store.remove_blobs(blobs)
+        with self.history_lock:
+            self._remove_blobs_locked(blobs)
+        return total + unsaved
+
+    def remove_where(self, predicate: Callable[[HistoryEntry], bool]) -> int:
+        """
+        Remove os itens para os quais `predicate(item)` é verdadeiro
+
+        O predicado é avaliado sob o lock do histórico e não deve chamar o
+        `ClipboardManager`. Só a avaliação percorre o histórico; a remoção e a
+        persistência custam o mesmo que `remove`.
+
+        Returns:
+            Número de itens removidos
+        """
+        with self.history_lock:
+            items = [item for item in self.clipboard_history if predicate(item)]
+            removed = self._remove_items_locked(items)
+        if removed:
+            logging.info(f"Itens removidos do histórico: {len(removed)}")
+            self._notify_items_removed(removed)
+        return len(removed)
+
+    def set_expiry_policy(
+        self, default_ttl_s: float, rules: Sequence[Tuple[str, float]] = ()
+    ) -> None:
+        """
+        Define a expiração automática dos itens do histórico
+
+        Args:
+            default_ttl_s: Idade máxima de um item, em segundos (0 = não expira)
+            rules: Pares (regex, TTL em segundos) testados em ordem contra o
+                texto do item; o primeiro que casar substitui o padrão (TTL 0 =
+                o item nunca expira)
+        """
+        try:
+            default = max(0.0, float(default_ttl_s))
+        except Exception:
+            default = 0.0
+        compiled: List[Tuple[Pattern[str], float]] = []
+        for pattern, ttl in rules or ():
+            try:
+                compiled.append((re.compile(pattern), max(0.0, float(ttl))))
+            except (re.error, TypeError, ValueError) as e:
+                logging.warning(f"Regra de expiração ignorada ({pattern!r}): {e}")
+        with self.history_lock:
+            self.default_ttl_s = default
+            self._expiry_rules = compiled
+            self._expiry.clear()
+            self._schedule_expiry_locked(self.clipboard_history)
+            if self._sqlite_store is not None:
+                self._sync_stored_expiry_locked(self._sqlite_store)
+        self._expiry_wakeup.set()
+
+    def _ttl_for(self, item: HistoryEntry) -> float:
+        for pattern, ttl in self._expiry_rules:
+            if pattern.search(item.text):
+                return ttl
+        return self.default_ttl_s
+
+    def _expires_at(self, item: HistoryEntry) -> float:
+        """Prazo de expiração do item (epoch; 0 = sem data ou sem TTL, não expira)"""
+        if item.created is None or not item.text:
+            return 0.0
+        ttl = self._ttl_for(item)
+        return item.created + ttl if ttl > 0 else 0.0
+
+    def _sync_stored_expiry_locked(self, store: SqliteHistoryStore) -> None:
+        """
+        Recalcula em segundo plano o prazo gravado no banco (`expires_at`) se
+        a política de expiração mudou desde o último cálculo
+        """
+        signature = json.dumps(
+            [self.default_ttl_s, [[p.pattern, ttl] for p, ttl in self._expiry_rules]]
+        )
+        try:
+            if store.get_meta("expiry_policy") == signature:
+                return
+        except Exception as e:
+            logging.warning(f"Falha ao ler a política de expiração do banco: {e}")
             return
 
-        def _flush() -> None:
+        def _run() -> None:
             try:
-                self.save_history()
-            finally:
-                with self.history_lock:
-                    self._save_timer = None
+                store.recompute_expiry(
+                    lambda item: self._expires_at(HistoryEntry.from_dict(item)),
+                    signature,
+                )
+            except Exception as e:
+                logging.warning(f"Falha ao recalcular a expiração no banco: {e}")
+
+        threading.Thread(target=_run, name="HistoryExpiryUpdate", daemon=True).start()
+
+    def _schedule_expiry_locked(self, items: Iterable[HistoryEntry]) -> None:
+        """Agenda o prazo dos itens (itens sem data ou sem TTL não expiram)"""
+        if not self.default_ttl_s and not self._expiry_rules:
+            return
+        head = self._expiry.next_expiry()
+        for item in items:
+            deadline = self._expires_at(item)
+            if deadline:
+                self._expiry.add_at(item.key, deadline)
+        deadline = self._expiry.next_expiry()
+        if deadline is None and not self._is_paged():
+            # No modo paginado a thread também consulta os prazos do banco
+            return
+        if self._expiry_thread is None:
+            self._expiry_thread = threading.Thread(
+                target=self._run_expiry, name="HistoryExpiry", daemon=True
+            )
+            self._expiry_thread.start()
+        elif deadline is not None and (head is None or deadline < head):
+            self._expiry_wakeup.set()
+
+    def _run_expiry(self) -> None:
+        next_stored_check = 0.0
+        while not self._expiry_stop.is_set():
+            if time.time() >= next_stored_check:
+                next_stored_check = time.time() + EXPIRY_MAX_WAIT_S
+                try:
+                    self.expire_stored()
+                except Exception as e:
+                    logging.warning(f"Falha ao expirar itens do banco: {e}")
+            with self.history_lock:
+                deadline = self._expiry.next_expiry()
+            timeout = (
+                EXPIRY_MAX_WAIT_S if deadline is None else deadline - time.time()
+            )
+            if timeout > 0:
+                self._expiry_wakeup.wait(min(timeout, EXPIRY_MAX_WAIT_S))
+                self._expiry_wakeup.clear()
+                continue
+            try:
+                self.expire_due()
+            except Exception as e:
+                logging.warning(f"Falha ao expirar itens do histórico: {e}")
+
+    def expire_due(self, now: Optional[float] = None) -> int:
+        """
+        Remove os itens cujo prazo de expiração venceu
+
+        Custo proporcional aos itens vencidos (o heap entrega só esses).
+
+        Args:
+            now: Instante de referência (epoch; padrão: agora)
+
+        Returns:
+            Número de itens removidos
+        """
+        if now is None:
+            now = time.time()
+        with self.history_lock:
+            keys = self._expiry.pop_expired(now)
+            items = [self._items_by_key[k] for k in keys if k in self._items_by_key]
+            removed = self._remove_items_locked(items)
+        if removed:
+            logging.info(f"Itens expirados removidos do histórico: {len(removed)}")
+            self._notify_items_removed(removed)
+        return len(removed)
+
+    def expire_stored(self, now: Optional[float] = None) -> int:
+        """
+        Remove do banco os itens vencidos (modo paginado do SQLite)
+
+        Os itens em memória expiram pelo heap (`expire_due`); os que só estão
+        no banco são apagados pela coluna `expires_at`, consultada pela thread
+        de expiração a cada `EXPIRY_MAX_WAIT_S`.
+
+        Returns:
+            Número de itens removidos do banco
+        """
+        if now is None:
+            now = time.time()
+        with self.history_lock:
+            if not self._is_paged() or not (self.default_ttl_s or self._expiry_rules):
+                return 0
+            store = self._get_sqlite_store_locked()
+        rows = store.remove_expired(now)
+        if not rows:
+            return 0
+        entries = [HistoryEntry.from_dict(r) for r in rows]
+        with self.history_lock:
+            in_memory = [
+                self._items_by_key[e.key] for e in entries if e.key in self._items_by_key
+            ]
+            removed = self._remove_items_locked(in_memory)
+            self._remove_blobs_locked([e.blob for e in entries if e.blob])
+        logging.info(f"Itens expirados removidos do banco do histórico: {len(rows)}")
+        if removed:
+            self._notify_items_removed(removed)
+        return len(rows)
+
+    def set_retention_limits(self, max_total_chars: int, max_entry_chars: int) -> None:
+        """
+        Define a retenção por tamanho, além do limite de itens
+
+        Args:
+            max_total_chars: Total de texto mantido no histórico (itens mais
+                antigos são descartados ao exceder)
+            max_entry_chars: Tamanho máximo de um item; textos maiores não
+                entram no histórico
+        """
+        try:
+            total = max(1024, int(max_total_chars))
+            entry = max(1024, int(max_entry_chars))
+        except Exception:
+            return
+        with self.history_lock:
+            changed = total != self.max_history_chars
+            self.max_history_chars = total
+            self.max_entry_chars = entry
+            # Itens descartados continuam no journal; o snapshot evita que
+            # voltem ao aumentar o limite depois (ver set_max_history_items)
+            if changed and self._get_journal().record_count:
+                self._snapshot_required = True
+                self._schedule_save_locked()
+            if self._enforce_size_budget_locked():
+                self._snapshot_required = True
+                self._schedule_save_locked()
+
+    def _get_journal(self) -> HistoryJournal:
+        path = self._history_file + ".journal"
+        if self._journal is None or self._journal.path != path:
+            self._journal = HistoryJournal(path)
+        return self._journal
+
+    def set_storage_engine(self, engine: str) -> None:
+        """
+        Define o motor de armazenamento do histórico (antes de load_history)
+
+        Args:
+            engine: "json" (padrão, criptografado) ou "sqlite" (índice FTS5)
+        """
+        engine = (engine or "").strip().lower()
+        if engine not in STORAGE_ENGINES:
+            logging.warning(f"Motor de histórico desconhecido: {engine!r}; usando json")
+            engine = STORAGE_ENGINE_JSON
+        with self.history_lock:
+            if engine == self.storage_engine:
+                return
+            if self._sqlite_store is not None:
+                self._sqlite_store.close()
+                self._sqlite_store = None
+            self.storage_engine = engine
+        # O limite de itens depende do motor
+        self.set_max_history_items(self._requested_max_items)
+
+    def _is_paged(self) -> bool:
+        """SQLite com limite maior que a janela em memória: os itens antigos
+        ficam só no banco (buscáveis por `search`)"""
+        return (
+            self.storage_engine == STORAGE_ENGINE_SQLITE
+            and self.max_history_items > SQLITE_MEMORY_ITEMS
+        )
 
-        timer = threading.Timer(self._save_debounce_s, _flush)
-        timer.daemon = True
-        self._save_timer = timer
-        timer.start()
+    def _memory_limit(self) -> int:
+        """Itens mantidos em memória (menu, busca aproximada, expiração exata)"""
+        if self.storage_engine == STORAGE_ENGINE_SQLITE:
+            return min(self.max_history_items, SQLITE_MEMORY_ITEMS)
+        return self.max_history_items
+
+    def _get_sqlite_store_locked(self) -> SqliteHistoryStore:
+        if self._sqlite_store is None:
+            db_path = os.path.join(
+                self._data_dir, "clipboard_history.db"
+            )
+            store = SqliteHistoryStore(db_path)
+            store.open()
+            self._sqlite_store = store
+        return self._sqlite_store
+
+    def _migrate_json_to_sqlite_locked(self, store: SqliteHistoryStore) -> None:
+        """Importa clipboard_history.json (+ journal) para um banco vazio, uma única vez"""
+        if store.count() > 0:
+            return
+        if not os.path.exists(self._history_file) and not os.path.exists(
+            self._history_file + ".journal"
+        ):
+            return
+
+        raw = self._try_load_raw_history_data()
+        items = self._parse_json(raw) if raw is not None else []
+        if self._replay_journal(items):
+            raise RuntimeError("journal ilegível; migração para SQLite adiada")
+        store.add_many((i, i.digest) for i in items)
+
+        for path in (self._history_file, self._history_file + ".journal"):
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+        logging.info(f"Histórico migrado para SQLite: {len(items)} itens")
+
+    def set_encryption_backend(self, backend: EncryptionBackend) -> None:
+        """Define o backend que protege a chave de dados (antes de load_history)"""
+        with self.history_lock:
+            self._crypto_backend = backend
+            self._envelope = None
+            self._wrapped_key = ""
+            self._sealed_cache = {}
+
+    def _get_backend(self) -> EncryptionBackend:
+        if self._crypto_backend is None:
+            key_path = os.path.join(self._data_dir, "history.key")
+            self._crypto_backend = get_default_backend(self._dpapi_entropy, key_path)
+        return self._crypto_backend
+
+    def _get_blob_store_locked(self) -> BlobStore:
+        directory = os.path.join(self._data_dir, "history_blobs")
+        if self._blob_store is None or self._blob_store.directory != directory:
+            self._blob_store = BlobStore(directory, self._get_backend())
+        return self._blob_store
+
+    def _collect_blobs_locked(self) -> None:
+        """Apaga blobs que nenhum item do histórico referencia mais"""
+        store = self._get_blob_store_locked()
+        if not os.path.isdir(store.directory):
+            return
+        live = self._live_blobs_locked()
+        if self.storage_engine == STORAGE_ENGINE_SQLITE:
+            # Itens fora da memória (modo paginado) também referenciam blobs
+            live |= self._get_sqlite_store_locked().blob_ids()
+        removed = store.collect(live)
+        if removed:
+            logging.info(f"Blobs do histórico removidos: {removed}")
+
+    def _live_blobs_locked(self) -> Set[str]:
+        """Blobs referenciados em memória (histórico, gravações pendentes)"""
+        live = {i.blob for i in self.clipboard_history if i.blob}
+        live.update(i.blob for i in self._pending_journal if i.blob)
+        live |= self._blobs_in_flight
+        return live
+
+    def _remove_blobs_locked(self, blob_ids: Iterable[str]) -> None:
+        """Apaga blobs de itens que saíram do disco, se nada mais os referencia"""
+        blob_ids = list(blob_ids)
+        if not blob_ids:
+            return
+        live = self._live_blobs_locked()
+        store = self._get_blob_store_locked()
+        for blob in blob_ids:
+            if blob not in live:
+                store.remove(blob)
+
+    def set_inline_limit(self, max_chars: int) -> None:
+        """Define o tamanho a partir do qual o texto vai para um blob"""
+        try:
+            v = int(max_chars)
+        except Exception:
+            return
+        self.inline_limit_chars = max(BLOB_PREVIEW_CHARS, v)
+
+    def load_text(self, item: Any) -> str:
+        """
+        Retorna o texto completo de um item (lendo o blob, se houver)
+
+        Args:
+            item: HistoryEntry ou texto
+        """
+        if not isinstance(item, HistoryEntry):
+            return item
+        if not item.blob:
+            return item.text
+        with self.history_lock:
+            store = self._get_blob_store_locked()
+        try:
+            return store.read(item.blob)
+        except Exception as e:
+            logging.warning(f"Falha ao ler blob do histórico: {e}")
+            return item.text
+
+    def _get_envelope_locked(self) -> EnvelopeCipher:
+        if self._envelope is None:
+            envelope = EnvelopeCipher.generate()
+            self._wrapped_key = b64encode_bytes(envelope.wrap(self._get_backend()))
+            self._envelope = envelope
+            self._sealed_cache = {}
+            # A chave nova precisa estar no snapshot antes de qualquer registro do journal
+            self._snapshot_required = True
+        return self._envelope
+
+    def _open_item(self, sealed: str) -> Any:
+        """Decripta um único item selado com a chave de dados"""
+        if self._envelope is None:
+            raise RuntimeError("Chave de dados do histórico indisponível")
+        return json.loads(self._envelope.open(b64decode_str(sealed)).decode("utf-8"))
+
+    def _schedule_save_locked(self) -> None:
+        self._persistence.notify()
+
+    def set_persistence_config(self, max_latency_ms: int, max_pending: int) -> None:
+        """
+        Configura a gravação em segundo plano do histórico
+
+        Args:
+            max_latency_ms: Atraso máximo entre a alteração e a gravação (50-10000)
+            max_pending: Alterações acumuladas que disparam a gravação (1-4096)
+        """
+        try:
+            latency = min(max(int(max_latency_ms), 50), 10000)
+            pending = min(max(int(max_pending), 1), 4096)
+        except Exception:
+            return
+        self._persistence.configure(latency / 1000.0, pending)
 
     def set_max_history_items(self, max_items: int) -> None:
         try:
@@ -95,26 +899,65 @@ class ClipboardManager:
         except Exception:
             return
 
+        self._requested_max_items = v
+        # O JSON mantém tudo em memória; o SQLite guarda o excedente só no banco
+        if self.storage_engine == STORAGE_ENGINE_SQLITE:
+            cap = MAX_HISTORY_ITEMS_SQLITE
+        else:
+            cap = MAX_HISTORY_ITEMS_JSON
         if v < 10:
             v = 10
-        if v > 1000:
-            v = 1000
+        if v > cap:
+            v = cap
 
+        changed = v != self.max_history_items
         self.max_history_items = v
         try:
             with self.history_lock:
-                if len(self.clipboard_history) > self.max_history_items:
-                    self.clipboard_history = self.clipboard_history[
-                        -self.max_history_items :
-                    ]
-                    self._rebuild_history_index_locked()
+                if changed and self.storage_engine == STORAGE_ENGINE_SQLITE:
+                    # O banco pode ter mais itens que a memória: corta pelo novo limite
+                    self._trim_required = True
+                    self._schedule_save_locked()
+                elif changed and self._get_journal().record_count:
+                    # Itens já descartados continuam no journal; o snapshot
+                    # evita que voltem ao aumentar o limite depois.
+                    self._snapshot_required = True
+                    self._schedule_save_locked()
+                limit = self._memory_limit()
+                removed = 0
+                while len(self.clipboard_history) > limit:
+                    self._evict_locked()
+                    removed += 1
+                self.clipboard_history.resize(limit)
+                if removed:
+                    self._snapshot_required = True
                     self._schedule_save_locked()
         except Exception:
             pass
 
     def set_monitoring_config(
-        self, monitor_interval_s: float, idle_threshold_s: float
+        self,
+        monitor_interval_s: float,
+        idle_threshold_s: float,
+        burst_interval_s: Optional[float] = None,
+        burst_window_s: Optional[float] = None,
+        idle_ceiling_s: Optional[float] = None,
+        jitter: Optional[float] = None,
     ) -> None:
+        """
+        Configura a curva de polling do monitor (ver `PollingPolicy`)
+
+        Args:
+            monitor_interval_s: Intervalo ativo (0.5-60s)
+            idle_threshold_s: Meia-vida da aproximação ao teto ocioso (5-300s)
+            burst_interval_s: Intervalo no burst após cada mudança (0.05s até o ativo)
+            burst_window_s: Duração do burst (0-30s)
+            idle_ceiling_s: Intervalo máximo ocioso (do ativo até 120s)
+            jitter: Variação relativa aleatória (0-0.5)
+
+        Parâmetros omitidos mantêm o valor atual da curva.
+        """
+        current = self.polling_policy
         try:
             monitor = float(monitor_interval_s)
         except Exception:
@@ -134,76 +977,270 @@ class ClipboardManager:
         if idle > 300.0:
             idle = 300.0
 
+        def _clamped(value, default, low, high):
+            if value is None:
+                return default
+            try:
+                return min(max(float(value), low), high)
+            except Exception:
+                return default
+
         self.clipboard_monitor_interval_s = monitor
         self.clipboard_idle_threshold_s = idle
+        self.polling_policy = PollingPolicy(
+            monitor,
+            idle,
+            burst_interval_s=_clamped(
+                burst_interval_s, current.burst_interval_s, 0.05, monitor
+            ),
+            burst_window_s=_clamped(burst_window_s, current.burst_window_s, 0.0, 30.0),
+            idle_ceiling_s=_clamped(
+                idle_ceiling_s, current.idle_ceiling_s, monitor, 120.0
+            ),
+            jitter=_clamped(jitter, current.jitter, 0.0, 0.5),
+        )
 
     def mark_own_content(self, text: str, ttl_seconds: float = 2.0) -> None:
         if not text:
             return
 
-        now = time.time()
+        fingerprint = fingerprint_text(text)
         with self.history_lock:
-            self._own_content_expiry[text] = now + float(ttl_seconds)
-            expired_keys = [k for k, v in self._own_content_expiry.items() if v <= now]
-            for k in expired_keys:
-                self._own_content_expiry.pop(k, None)
+            self._own_content.add(fingerprint, ttl_seconds)
 
     def _is_own_content(self, text: str) -> bool:
         if not text:
             return False
 
-        now = time.time()
+        fingerprint = fingerprint_text(text)
         with self.history_lock:
-            expiry = self._own_content_expiry.get(text)
-            if expiry is None:
-                return False
-            if expiry <= now:
-                self._own_content_expiry.pop(text, None)
-                return False
-            return True
+            return fingerprint in self._own_content
 
-    def _write_history_locked(self, *, force: bool = False) -> None:
+    def _write_history(self, *, force: bool = False) -> None:
+        """
+        Grava o histórico (journal, snapshot ou SQLite)
+
+        Só a captura do estado (`_capture_write_locked`) e a conclusão rodam sob
+        o `history_lock`; selar, serializar e gravar acontecem fora dele, então
+        o menu do tray, o monitor e novas cópias não esperam pelo disco. Não
+        deve ser chamado com o `history_lock` adquirido.
+        """
+        with self._write_lock:
+            with self.history_lock:
+                plan = self._capture_write_locked(force)
+            if plan is None:
+                return
+            error: Optional[Exception] = None
+            try:
+                if plan.engine == STORAGE_ENGINE_SQLITE:
+                    self._execute_sqlite_write(plan)
+                else:
+                    self._execute_json_write(plan)
+            except Exception as e:
+                error = e
+            with self.history_lock:
+                self._finish_write_locked(plan, error)
+
+    def _capture_write_locked(self, force: bool) -> Optional[_WritePlan]:
         now = time.time()
         if self._history_write_disabled and not force:
-            return
+            return None
         if (
             self._history_write_disabled_until
             and self._history_write_disabled_until > now
             and not force
         ):
-            return
+            return None
+        # Tudo que foi avisado até aqui entra nesta gravação
+        self._persistence.discard()
+        plan = _WritePlan(self.storage_engine, force, self._write_epoch)
         try:
-            plain = json.dumps(self.clipboard_history, ensure_ascii=False).encode(
-                "utf-8"
-            )
-            blob = dpapi_encrypt_bytes(plain, self._dpapi_entropy)
-            payload = {
-                "dpapi": 1,
-                "blob": b64encode_bytes(blob),
-            }
-            if os.path.exists(HISTORY_FILE):
-                try:
-                    shutil.copy2(HISTORY_FILE, HISTORY_FILE + ".bak")
-                except Exception:
-                    pass
-            atomic_write_json(HISTORY_FILE, payload)
+            if plan.engine == STORAGE_ENGINE_SQLITE:
+                plan.store = self._get_sqlite_store_locked()
+                plan.snapshot = force and not self.clipboard_history
+                if self._trim_required or self._pending_journal:
+                    plan.max_items = self.max_history_items
+                    self._trim_required = False
+            else:
+                journal = self._get_journal()
+                plan.journal_file = journal
+                plan.envelope = self._get_envelope_locked()
+                plan.sealed_cache = self._sealed_cache
+                snapshot_due = (
+                    force
+                    or self._snapshot_required
+                    or journal.record_count + len(self._pending_journal)
+                    > self._journal_compact_threshold
+                )
+                if snapshot_due and self._deferred_loading and not force:
+                    # Um snapshot agora perderia os itens antigos ainda não carregados:
+                    # anexa ao journal e compacta depois da carga tardia
+                    snapshot_due = False
+                    self._snapshot_required = True
+                if snapshot_due:
+                    plan.snapshot = True
+                    plan.items = list(self.clipboard_history)
+                    plan.payload_meta = {
+                        "version": HISTORY_FORMAT_VERSION,
+                        "backend": self._get_backend().name,
+                        "key": self._wrapped_key,
+                    }
+                    self._snapshot_required = False
+        except Exception as e:
+            self._disable_writes_locked(e, now)
+            return None
+        plan.journal = self._pending_journal
+        plan.removed = self._pending_removed
+        plan.deleted = self._pending_deleted
+        self._pending_journal = []
+        self._pending_removed = []
+        self._pending_deleted = []
+        if (
+            not plan.snapshot
+            and not plan.journal
+            and not plan.removed
+            and not plan.deleted
+            and not plan.max_items
+        ):
+            # Nada a gravar; ainda assim limpa um bloqueio temporário expirado
             self._history_write_disabled = False
             self._history_write_disabled_reason = ""
             self._history_write_disabled_until = 0.0
-        except Exception as e:
-            if force and not self.clipboard_history and os.path.exists(HISTORY_FILE):
-                try:
-                    os.remove(HISTORY_FILE)
-                    self._history_write_disabled = False
-                    self._history_write_disabled_reason = ""
-                    self._history_write_disabled_until = 0.0
-                    return
-                except Exception:
-                    pass
+            return None
+        if plan.engine == STORAGE_ENGINE_SQLITE:
+            self._sqlite_writing = plan
+        return plan
+
+    @staticmethod
+    def _seal_for_plan(plan: _WritePlan, item: HistoryEntry) -> str:
+        h = _seal_key(item)
+        sealed = plan.sealed_cache.get(h)
+        if sealed is None:
+            assert plan.envelope is not None  # plano JSON (_capture_write_locked)
+            plain = json.dumps(item.to_dict(), ensure_ascii=False).encode("utf-8")
+            sealed = b64encode_bytes(plan.envelope.seal(plain))
+            plan.sealed_cache[h] = sealed
+        return sealed
+
+    @staticmethod
+    def _seal_removal(plan: _WritePlan, item: HistoryEntry) -> str:
+        """Registro de remoção selado: só o digest, que não sai do envelope"""
+        assert plan.envelope is not None  # plano JSON (_capture_write_locked)
+        plain = json.dumps({"digest": item.digest}).encode("utf-8")
+        return b64encode_bytes(plan.envelope.seal(plain))
+
+    def _execute_json_write(self, plan: _WritePlan) -> None:
+        """Sela e grava fora do `history_lock` (sob `_write_lock`)"""
+        journal = plan.journal_file
+        assert journal is not None  # plano JSON (_capture_write_locked)
+        try:
+            if plan.snapshot:
+                sealed_items = [self._seal_for_plan(plan, i) for i in plan.items]
+                payload = dict(plan.payload_meta, items=sealed_items)
+                if os.path.exists(self._history_file):
+                    try:
+                        shutil.copy2(self._history_file, self._history_file + ".bak")
+                    except Exception:
+                        pass
+                atomic_write_json(self._history_file, payload)
+                journal.reset()
+                live = set(sealed_items)
+                # Substitui o cache só na conclusão (ver _finish_write_locked)
+                plan.sealed_cache = {
+                    h: v for h, v in plan.sealed_cache.items() if v in live
+                }
+            elif plan.journal or plan.deleted:
+                # Remoções antes das inclusões: um texto removido e copiado de
+                # novo na mesma janela volta a existir
+                records = [
+                    {"op": "del", "blob": self._seal_removal(plan, i)}
+                    for i in plan.deleted
+                ]
+                records.extend(
+                    {"op": "add", "blob": self._seal_for_plan(plan, i)}
+                    for i in plan.journal
+                )
+                journal.append(records)
+        except Exception:
+            if not (plan.force and not plan.items and os.path.exists(self._history_file)):
+                raise
+            # Limpeza com snapshot ilegível: remove o arquivo em vez de regravar
+            os.remove(self._history_file)
+            journal.reset()
+
+    def _execute_sqlite_write(self, plan: _WritePlan) -> None:
+        store = plan.store
+        assert store is not None  # plano SQLite (_capture_write_locked)
+        if plan.snapshot:
+            store.clear()
+        else:
+            # Itens incluídos e descartados na mesma janela não tocam o banco;
+            # os demais descartes saem antes das inclusões (texto copiado de novo)
+            added = {id(i) for i in plan.journal}
+            dropped = {id(i) for i in plan.removed}
+            store.remove_hashes(i.digest for i in plan.removed if id(i) not in added)
+            store.add_many(
+                ((i, i.digest) for i in plan.journal if id(i) not in dropped),
+                self._expires_at,
+            )
+            if plan.max_items:
+                plan.dropped_blobs = store.trim(plan.max_items)
 
-            self._history_write_disabled = True
-            self._history_write_disabled_reason = str(e)
-            self._history_write_disabled_until = now + 30.0
+    def _finish_write_locked(
+        self, plan: _WritePlan, error: Optional[Exception]
+    ) -> None:
+        if self._sqlite_writing is plan:
+            self._sqlite_writing = None
+        if error is not None:
+            if plan.epoch == self._write_epoch:
+                # Devolve o que não foi gravado para a próxima tentativa; itens
+                # removidos durante a gravação nunca chegaram ao disco
+                deleted = {id(i) for i in self._pending_deleted}
+                lost = {id(i) for i in plan.journal} & deleted
+                if lost:
+                    self._pending_deleted = [
+                        i for i in self._pending_deleted if id(i) not in lost
+                    ]
+                self._pending_journal = [
+                    i for i in plan.journal if id(i) not in lost
+                ] + self._pending_journal
+                self._pending_removed = plan.removed + self._pending_removed
+                self._pending_deleted = plan.deleted + self._pending_deleted
+                if plan.snapshot and plan.engine == STORAGE_ENGINE_JSON:
+                    self._snapshot_required = True
+                if plan.max_items:
+                    self._trim_required = True
+            self._disable_writes_locked(error, time.time())
+            return
+        if plan.snapshot and plan.engine == STORAGE_ENGINE_JSON:
+            if self._envelope is plan.envelope:
+                self._sealed_cache = plan.sealed_cache
+        self._history_write_disabled = False
+        self._history_write_disabled_reason = ""
+        self._history_write_disabled_until = 0.0
+        # Blobs são apagados sob o lock: um blob pode voltar a ser referenciado
+        # (`_blobs_in_flight`) entre a listagem e a remoção
+        if plan.engine == STORAGE_ENGINE_SQLITE:
+            if plan.snapshot:
+                self._collect_blobs_locked()
+            else:
+                # Linhas removidas ou cortadas pelo limite: o banco não tem
+                # outra linha com o mesmo blob (hash do texto é único)
+                self._remove_blobs_locked(
+                    [i.blob for i in plan.removed if i.blob] + plan.dropped_blobs
+                )
+        elif plan.snapshot:
+            # Sem journal, só o snapshot referencia blobs
+            self._collect_blobs_locked()
+        else:
+            # A remoção já está no journal: o blob do item removido pode sair
+            self._remove_blobs_locked([i.blob for i in plan.deleted if i.blob])
+
+    def _disable_writes_locked(self, error: Exception, now: float) -> None:
+        logging.warning(f"Falha ao gravar histórico: {error}")
+        self._history_write_disabled = True
+        self._history_write_disabled_reason = str(error)
+        self._history_write_disabled_until = now + 30.0
 
     def toggle_pause(self) -> bool:
         """Alterna estado de pausa do monitoramento"""
@@ -211,15 +1248,36 @@ class ClipboardManager:
         logging.info(
             f"Monitoramento de clipboard {'pausado' if self.paused else 'retomado'}"
         )
+        self._monitor_wakeup.set()
         return self.paused
 
+    def notify_clipboard_changed(self) -> None:
+        """Acorda o monitor para verificar o clipboard imediatamente"""
+        self._monitor_wakeup.set()
+
+    def stop_monitoring(self) -> None:
+        """Encerra o loop do monitor (acorda a espera em andamento)"""
+        self._monitor_stop.set()
+        self._monitor_wakeup.set()
+
+    def _wait_for_next_poll(self, timeout: float) -> bool:
+        """
+        Aguarda o próximo tick do monitor
+
+        Returns:
+            True se a espera foi interrompida por um aviso (e não pelo timeout)
+        """
+        woken = self._monitor_wakeup.wait(timeout)
+        self._monitor_wakeup.clear()
+        return woken
+
     def _load_from_file(self) -> Any:
         """Carrega dados brutos do arquivo"""
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        with open(self._history_file, "r", encoding="utf-8") as f:
             return json.load(f)
 
     def _load_from_backup_file(self) -> Any:
-        with open(HISTORY_FILE + ".bak", "r", encoding="utf-8") as f:
+        with open(self._history_file + ".bak", "r", encoding="utf-8") as f:
             return json.load(f)
 
     def _try_load_raw_history_data(self) -> Any:
@@ -237,18 +1295,18 @@ class ClipboardManager:
             except Exception:
                 return None
 
-    def _decrypt_data(self, blob_str: str) -> List:
+    def _decrypt_data(self, blob_str: str) -> Any:
         """Decripta dados DPAPI"""
         decrypted = dpapi_decrypt_bytes(
             b64decode_str(blob_str), self._dpapi_entropy
         )
         return json.loads(decrypted.decode("utf-8"))
 
-    def _sanitize_history_items(self, items: Any) -> List[Dict[str, str]]:
+    def _sanitize_history_items(self, items: Any) -> List[HistoryEntry]:
         if not isinstance(items, list):
             return []
 
-        sanitized: List[Dict[str, str]] = []
+        sanitized: List[HistoryEntry] = []
         for item in items:
             if not isinstance(item, dict):
                 continue
@@ -259,19 +1317,34 @@ class ClipboardManager:
 
             timestamp = item.get("timestamp")
             app = item.get("app")
+            clean: Dict[str, Any] = {
+                "text": text,
+                "timestamp": timestamp if isinstance(timestamp, str) else "",
+                "app": app if isinstance(app, str) else "",
+            }
 
-            sanitized.append(
-                {
-                    "text": text,
-                    "timestamp": timestamp if isinstance(timestamp, str) else "",
-                    "app": app if isinstance(app, str) else "",
-                }
-            )
+            blob = item.get("blob")
+            if blob is not None:
+                size = item.get("size")
+                if not _is_blob_id(blob) or not isinstance(size, int) or size <= 0:
+                    continue
+                clean["blob"] = blob
+                clean["size"] = size
+
+            sanitized.append(HistoryEntry.from_dict(clean))
 
         return sanitized
 
-    def _parse_json(self, raw_data: Any) -> List[Dict[str, str]]:
+    def _parse_json(
+        self, raw_data: Any, tail_items: Optional[int] = None
+    ) -> List[HistoryEntry]:
         """Processa os dados carregados do JSON"""
+        if (
+            isinstance(raw_data, dict)
+            and raw_data.get("version") == HISTORY_FORMAT_VERSION
+        ):
+            return self._parse_envelope_snapshot(raw_data, tail_items)
+
         if isinstance(raw_data, dict) and raw_data.get("dpapi") == 1:
             blob_str = raw_data.get("blob")
             if isinstance(blob_str, str):
@@ -286,50 +1359,305 @@ class ClipboardManager:
             
         return []
 
-    def load_history(self) -> None:
-        """Carrega o histórico do arquivo ou inicia com lista vazia"""
+    def _parse_envelope_snapshot(
+        self, raw_data: Dict[str, Any], tail_items: Optional[int] = None
+    ) -> List[HistoryEntry]:
+        """
+        Abre os itens de um snapshot v2
+
+        Args:
+            raw_data: Snapshot lido do arquivo
+            tail_items: Se informado, abre só os N itens mais recentes; os demais
+                ficam em `_deferred_sealed` para a carga em segundo plano
+        """
+        backend = self._get_backend()
+        backend_name = raw_data.get("backend")
+        if backend_name != backend.name:
+            raise RuntimeError(
+                f"Histórico protegido com backend '{backend_name}', ativo: '{backend.name}'"
+            )
+        wrapped = raw_data.get("key")
+        items = raw_data.get("items")
+        if not isinstance(wrapped, str) or not isinstance(items, list):
+            return []
+
+        self._envelope = EnvelopeCipher.unwrap(backend, b64decode_str(wrapped))
+        self._wrapped_key = wrapped
+        self._sealed_cache = {}
+
+        items = [sealed for sealed in items if isinstance(sealed, str)]
+        if tail_items is not None and len(items) > tail_items:
+            split = len(items) - max(0, tail_items)
+            self._deferred_sealed = items[:split]
+            items = items[split:]
+
+        opened = []
+        for sealed in items:
+            for item in self._sanitize_history_items([self._open_item(sealed)]):
+                self._sealed_cache[_seal_key(item)] = sealed
+                opened.append(item)
+        return opened
+
+    def _open_deferred(self, sealed_items: List[str]) -> List[Any]:
+        """Abre itens adiados (fora do lock); retorna pares (item, selado)"""
+        pairs = []
+        for sealed in sealed_items:
+            for item in self._sanitize_history_items([self._open_item(sealed)]):
+                _ = item.search_key  # normaliza para a busca fora do lock
+                pairs.append((item, sealed))
+        return pairs
+
+    def _merge_older_locked(self, pairs: List[Any]) -> None:
+        """Insere itens antigos carregados em segundo plano antes dos atuais"""
+        deleted = self._deleted_on_replay
+        self._deleted_on_replay = set()
+        present = set(self._history_key_counts)
+        fresh = []
+        for item, sealed in pairs:
+            key = item.key
+            if key in present or (deleted and item.digest in deleted):
+                continue
+            present.add(key)
+            fresh.append((item, sealed))
+
+        room = self.clipboard_history.maxlen - len(self.clipboard_history)
+        fresh = fresh[-room:] if room > 0 else []
+        if not fresh:
+            return
+        self.clipboard_history.prepend([item for item, _ in fresh])
+        for item, sealed in fresh:
+            if sealed:
+                self._sealed_cache[_seal_key(item)] = sealed
+        # Reconstrói para manter a ordem de recência do índice de busca
+        self._rebuild_history_index_locked()
+        self._schedule_expiry_locked(item for item, _ in fresh)
+        if self._enforce_size_budget_locked():
+            self._snapshot_required = True
+            self._schedule_save_locked()
+
+    def _load_older_in_background(self, generation: int, loader) -> None:
+        """Executa `loader` numa thread e mescla o resultado ao histórico"""
+
+        def _run() -> None:
+            started = time.perf_counter()
+            try:
+                try:
+                    pairs = loader()
+                    error = ""
+                except Exception as e:
+                    pairs = []
+                    error = str(e)
+                with self.history_lock:
+                    if generation != self._load_generation:
+                        return
+                    self._deferred_loading = False
+                    if error:
+                        # Snapshot agora perderia os itens que não abriram
+                        logging.warning(f"Falha na carga tardia do histórico: {error}")
+                        self._history_write_disabled = True
+                        self._history_write_disabled_reason = error
+                        return
+                    self._merge_older_locked(pairs)
+                    if self._snapshot_required or self._pending_journal:
+                        self._schedule_save_locked()
+                logging.info(
+                    f"Histórico completo carregado em segundo plano: {len(pairs)} itens antigos em {(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            finally:
+                self.history_ready.set()
+
+        threading.Thread(target=_run, name="HistoryLoader", daemon=True).start()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda a carga tardia do histórico terminar
+
+        Returns:
+            True se o histórico está completo
+        """
+        return self.history_ready.wait(timeout)
+
+    def _replay_journal(
+        self, items: List[HistoryEntry], deleted_digests: Optional[Set[str]] = None
+    ) -> int:
+        """
+        Aplica os registros do journal sobre o snapshot carregado
+
+        Args:
+            items: Itens do snapshot (modificados no lugar)
+            deleted_digests: Recebe o digest de cada registro "del" (com carga
+                tardia, a remoção pode ser de um item ainda não carregado)
+
+        Returns:
+            Número de registros que não puderam ser decriptados
+        """
+        records = self._get_journal().read()
+        if not records:
+            return 0
+
+        seen = {i.key for i in items}
+        # Índice por digest, montado só se houver registros de remoção
+        by_digest: Optional[Dict[str, HistoryEntry]] = None
+        deleted: Set[int] = set()
+        failed = 0
+        for record in records:
+            op = record.get("op")
+            if op not in ("add", "del"):
+                continue
+            blob_str = record.get("blob")
+            if not isinstance(blob_str, str):
+                continue
+            try:
+                entry = self._open_item(blob_str)
+            except Exception:
+                failed += 1
+                continue
+            if op == "del":
+                if by_digest is None:
+                    by_digest = {
+                        i.digest: i for i in items if id(i) not in deleted
+                    }
+                digest = entry.get("digest") if isinstance(entry, dict) else None
+                if not isinstance(digest, str):
+                    continue
+                if deleted_digests is not None:
+                    deleted_digests.add(digest)
+                target = by_digest.pop(digest, None)
+                if target is not None:
+                    deleted.add(id(target))
+                    seen.discard(target.key)
+                    self._sealed_cache.pop(_seal_key(target), None)
+                continue
+            for item in self._sanitize_history_items([entry]):
+                h = item.key
+                if h in seen:
+                    continue
+                seen.add(h)
+                self._sealed_cache[_seal_key(item)] = blob_str
+                items.append(item)
+                if by_digest is not None:
+                    by_digest[item.digest] = item
+
+        if deleted:
+            items[:] = [i for i in items if id(i) not in deleted]
+        return failed
+
+    def load_history(self, tail_items: Optional[int] = None) -> None:
+        """
+        Carrega o histórico do arquivo ou inicia com lista vazia
+
+        Args:
+            tail_items: Se informado, materializa só os N itens mais recentes
+                (ex.: os do menu do tray) e carrega o restante numa thread em
+                segundo plano; `history_ready`/`wait_until_loaded` sinalizam o
+                fim. None carrega tudo de forma síncrona.
+        """
         needs_migration = False
+        deferred_loader: Optional[Callable[[], List[Any]]] = None
         try:
             with self.history_lock:
                 history_write_disabled = False
                 history_write_disabled_reason = ""
-                
+                self._load_generation += 1
+                generation = self._load_generation
+                self._write_epoch += 1
+                self._deferred_sealed = []
+                self._deleted_on_replay = set()
+                self.history_ready.clear()
+
                 try:
-                    raw = self._try_load_raw_history_data()
-                    if raw is None:
-                        loaded = []
+                    if self.storage_engine == STORAGE_ENGINE_SQLITE:
+                        store = self._get_sqlite_store_locked()
+                        self._migrate_json_to_sqlite_locked(store)
+                        self._sync_stored_expiry_locked(store)
+                        # O limite pode ter diminuído desde a última execução
+                        self._trim_required = True
+                        self._schedule_save_locked()
+                        # Só a janela mais recente vai para a memória
+                        memory_limit = self._memory_limit()
+                        limit = memory_limit
+                        if tail_items is not None and tail_items < limit:
+                            limit = tail_items
+
+                            def load_window() -> List[Any]:
+                                return [
+                                    (HistoryEntry.from_dict(i), None)
+                                    for i in store.load_recent(memory_limit)
+                                ]
+
+                            deferred_loader = load_window
+
+                        loaded = [
+                            HistoryEntry.from_dict(i) for i in store.load_recent(limit)
+                        ]
                     else:
-                        loaded = self._parse_json(raw)
-                    
-                    # Verifica se precisa migrar (era legado e agora carregou como lista)
-                    if isinstance(raw, list):
-                        needs_migration = True
-                        
+                        raw = self._try_load_raw_history_data()
+                        loaded = (
+                            self._parse_json(raw, tail_items) if raw is not None else []
+                        )
+                        if self._deferred_sealed:
+                            deferred_loader = functools.partial(
+                                self._open_deferred, self._deferred_sealed
+                            )
+                            self._deferred_sealed = []
+                        deleted_digests: Set[str] = set()
+                        journal_failed = self._replay_journal(loaded, deleted_digests)
+                        if deferred_loader is not None:
+                            self._deleted_on_replay = deleted_digests
+                        if journal_failed:
+                            # Mantém o journal intacto: compactar agora perderia os registros
+                            logging.warning(
+                                f"Falha ao decriptar {journal_failed} registro(s) do journal do histórico"
+                            )
+                            history_write_disabled = True
+                            history_write_disabled_reason = "journal ilegível"
+
+                        # Verifica se precisa migrar (lista plana ou blob DPAPI único)
+                        if isinstance(raw, list) or (
+                            isinstance(raw, dict) and raw.get("dpapi") == 1
+                        ):
+                            needs_migration = True
+                            self._snapshot_required = True
+
                 except Exception as e:
                     # Erro genérico na leitura/parse (ex: permissão, decriptação)
                     logging.warning(f"Erro ao processar histórico: {e}")
                     loaded = []
+                    deferred_loader = None
                     history_write_disabled = True
                     history_write_disabled_reason = str(e)
                     # Tenta backup de segurança
                     try:
-                        shutil.copy2(HISTORY_FILE, HISTORY_FILE + ".bak")
+                        shutil.copy2(self._history_file, self._history_file + ".bak")
                     except Exception:
                         pass
 
-                self.clipboard_history = loaded if isinstance(loaded, list) else []
-                if len(self.clipboard_history) > self.max_history_items:
-                    self.clipboard_history = self.clipboard_history[
-                        -self.max_history_items :
-                    ]
+                self.clipboard_history = HistoryBuffer(
+                    loaded if isinstance(loaded, list) else [],
+                    self._memory_limit(),
+                )
                 self._rebuild_history_index_locked()
+                if self._enforce_size_budget_locked():
+                    self._snapshot_required = True
+                    self._schedule_save_locked()
+                self._pending_deleted = []
+                self._expiry.clear()
+                self._schedule_expiry_locked(self.clipboard_history)
                 self._history_write_disabled = history_write_disabled
                 self._history_write_disabled_reason = history_write_disabled_reason
+                self._deferred_loading = deferred_loader is not None
 
         except Exception as e:
             logging.error(f"Erro crítico em load_history: {e}")
-            self.clipboard_history = []
-            
+            self.clipboard_history = HistoryBuffer(maxlen=self._memory_limit())
+            deferred_loader = None
+            self._deferred_loading = False
+
+        if deferred_loader is not None:
+            self._load_older_in_background(generation, deferred_loader)
+        else:
+            self.history_ready.set()
+
         if needs_migration and not self._history_write_disabled:
             try:
                 self.save_history()
@@ -339,69 +1667,176 @@ class ClipboardManager:
     def save_history(self) -> None:
         """Salva o histórico no arquivo"""
         try:
-            with self.history_lock:
-                self._cancel_pending_save_locked()
-                self._write_history_locked()
+            self._write_history()
         except Exception as e:
             logging.warning(f"Falha ao salvar histórico: {e}")
 
     def flush_history(self) -> None:
+        """Grava agora tudo que estiver pendente (na thread de quem chama)"""
+        self.flush_ingest(timeout=2.0)
         try:
-            with self.history_lock:
-                self._cancel_pending_save_locked()
-                self._write_history_locked()
+            self._write_history()
         except Exception as e:
             logging.warning(f"Falha ao flush do histórico: {e}")
 
-    def add_to_history(self, text: str) -> None:
+    def close_history(self, timeout: Optional[float] = 2.0) -> bool:
+        """
+        Encerra a persistência para o shutdown
+
+        Para a expiração automática, entrega a fila de ingestão, grava o que
+        estiver pendente pela thread de persistência e a encerra. Alterações posteriores não são mais gravadas.
+
+        Returns:
+            True se tudo foi gravado dentro do timeout
+        """
+        self._expiry_stop.set()
+        self._expiry_wakeup.set()
+        self.flush_ingest(timeout)
+        flushed = self._persistence.flush(timeout)
+        stopped = self._persistence.stop(timeout)
+        if not (flushed and stopped):
+            logging.warning("Persistência do histórico não terminou no tempo limite")
+        return flushed and stopped
+
+    def add_to_history(self, text: str) -> Optional[HistoryEntry]:
         """
         Adiciona um item ao histórico
 
+        Textos maiores que `inline_limit_chars` são gravados em blob (ver
+        `_spill_to_blob`) e o item guarda só a prévia.
+
         Args:
             text: Texto a ser adicionado
+
+        Returns:
+            Item criado (com fingerprint já calculado), ou None se vazio/duplicado
         """
-        if not text or not text.strip():
-            return
+        added = self.add_many([text])
+        return added[0] if added else None
 
-        with self.history_lock:
+    def add_many(self, texts: List[str]) -> List[HistoryEntry]:
+        """
+        Adiciona vários itens ao histórico de uma vez
+
+        Lock, deduplicação, descarte, agendamento do save e log acontecem uma
+        única vez por lote. Duplicados (no histórico ou dentro do próprio lote)
+        são ignorados.
+
+        Args:
+            texts: Textos na ordem em que foram copiados
+
+        Returns:
+            Itens criados, na mesma ordem
+        """
+        entries: List[HistoryEntry] = []
+        for text in texts:
+            if not text:
+                continue
             text = text.strip()
-            text_hash_full = self._calc_text_hash(text)
-            if self._history_hash_counts.get(text_hash_full, 0) > 0:
-                return
+            if not text:
+                continue
+            if len(text) > self.max_entry_chars:
+                logging.info(
+                    f"Item ignorado por exceder o limite por item: len={len(text)}"
+                )
+                continue
+            if len(text) > self.inline_limit_chars:
+                entry = self._spill_to_blob(text)
+                if entry is None:
+                    continue
+            else:
+                entry = HistoryEntry.now(text, "Dahora App")
+            # Normalização para a busca calculada aqui, fora do lock
+            _ = entry.search_key
+            entries.append(entry)
+        if not entries:
+            return []
 
-            # Adiciona novo item
-            new_item = {
-                "text": text,
-                "timestamp": datetime.now().isoformat(),
-                "app": "Dahora App",
-            }
-            self.clipboard_history.append(new_item)
-            self._history_hash_counts[text_hash_full] = (
-                self._history_hash_counts.get(text_hash_full, 0) + 1
-            )
+        with self.history_lock:
+            added: List[HistoryEntry] = []
+            for new_item in entries:
+                self._blobs_in_flight.discard(new_item.blob)
+                key = new_item.key
+                if self._history_key_counts.get(key, 0) > 0:
+                    self._reuse_counts[key] = self._reuse_counts.get(key, 0) + 1
+                    existing = self._items_by_key.get(key)
+                    if existing is not None and self._eviction.promote_on_hit:
+                        self._replace_item_locked(existing, new_item)
+                        added.append(new_item)
+                    continue
 
-            # Mantém tamanho máximo
-            if len(self.clipboard_history) > self.max_history_items:
-                overflow = len(self.clipboard_history) - self.max_history_items
-                removed = self.clipboard_history[:overflow]
-                self.clipboard_history = self.clipboard_history[overflow:]
-                for item in removed:
-                    removed_text = item.get("text", "") or ""
-                    if not removed_text:
-                        continue
-                    h = self._calc_text_hash(removed_text)
-                    current = self._history_hash_counts.get(h, 0)
-                    if current <= 1:
-                        self._history_hash_counts.pop(h, None)
-                    else:
-                        self._history_hash_counts[h] = current - 1
+                if len(self.clipboard_history) >= self.clipboard_history.maxlen:
+                    self._evict_locked()
+                self.clipboard_history.append(new_item)
+                self._pending_journal.append(new_item)
+                self._history_key_counts[key] = 1
+                self._items_by_key[key] = new_item
+                self._search_index.add(key, new_item.text, new_item.search_key)
+                self._history_chars += new_item.size
+                self._eviction.insert(key)
+                added.append(new_item)
+
+            if not added:
+                return added
+            self._enforce_size_budget_locked()
+            self._schedule_expiry_locked(
+                i for i in added if self._items_by_key.get(i.key) is i
+            )
 
             self._schedule_save_locked()
-            text_len = len(text)
-            text_hash = text_hash_full[:12] if text_len else "vazio"
+            last = added[-1]
             logging.info(
-                f"Histórico atualizado: total={len(self.clipboard_history)}; last_len={text_len}, last_sha256={text_hash}"
+                f"Histórico atualizado: total={len(self.clipboard_history)}; chars={self._history_chars}; added={len(added)}; last_len={last.size}, last_fp={last.log_fingerprint}"
             )
+            return added
+
+    def enqueue_text(self, text: str) -> None:
+        """
+        Enfileira um texto para ingestão em lote (não bloqueia)
+
+        Textos que chegam em poucos milissegundos são agrupados num único
+        `add_many` (ver `IngestQueue`). Use `flush_ingest` para aguardar.
+        """
+        with self._ingest_lock:
+            if self._ingest_queue is None:
+                self._ingest_queue = IngestQueue(self.add_many)
+            queue = self._ingest_queue
+        queue.put(text)
+
+    def flush_ingest(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda a ingestão dos textos enfileirados até agora"""
+        queue = self._ingest_queue
+        if queue is None:
+            return True
+        return queue.flush(timeout)
+
+    def _spill_to_blob(self, text: str) -> Optional[HistoryEntry]:
+        """
+        Grava um texto grande em blob e cria o item só com a prévia
+
+        O hash e a criptografia são feitos em blocos e fora do lock do histórico.
+
+        Returns:
+            Item com `blob`/`size`, ou None se já estiver no histórico ou se a
+            gravação falhar
+        """
+        digest = stream_digest(text)
+        with self.history_lock:
+            if self._history_key_counts.get(blob_key(digest), 0) > 0:
+                return None
+            store = self._get_blob_store_locked()
+            self._blobs_in_flight.add(digest)
+        try:
+            store.write(digest, text)
+        except Exception as e:
+            logging.warning(f"Falha ao gravar blob do histórico: {e}")
+            with self.history_lock:
+                self._blobs_in_flight.discard(digest)
+            return None
+        logging.info(f"Conteúdo grande movido para blob: len={len(text)}")
+        return HistoryEntry.now(
+            text[:BLOB_PREVIEW_CHARS], "Dahora App", blob=digest, size=len(text)
+        )
 
     def clear_history(self) -> int:
         """
@@ -413,20 +1848,31 @@ class ClipboardManager:
         logging.info("Iniciando limpeza do histórico de clipboard")
         with self.history_lock:
             total_items = len(self.clipboard_history)
-            self.clipboard_history = []
-            self._history_hash_counts = {}
-            try:
-                self._cancel_pending_save_locked()
-                self._write_history_locked(force=True)
-                logging.info(
-                    f"Histórico limpo com sucesso! {total_items} itens removidos"
-                )
-            except Exception as e:
-                logging.error(f"Falha ao salvar histórico limpo: {e}")
+            self.clipboard_history.clear()
+            # Descarta a carga tardia em andamento
+            self._load_generation += 1
+            self._deferred_loading = False
+            self.history_ready.set()
+            self._history_key_counts = {}
+            self._items_by_key = {}
+            self._reuse_counts = {}
+            self._history_chars = 0
+            self._search_index.clear()
+            self._eviction.clear()
+            self._pending_journal = []
+            self._pending_removed = []
+            self._pending_deleted = []
+            self._expiry.clear()
+            self._write_epoch += 1
+        try:
+            self._write_history(force=True)
+            logging.info(f"Histórico limpo com sucesso! {total_items} itens removidos")
+        except Exception as e:
+            logging.error(f"Falha ao salvar histórico limpo: {e}")
 
         return total_items
 
-    def get_recent_items(self, limit: int = 10) -> List[Dict[str, str]]:
+    def get_recent_items(self, limit: int = 10) -> List[HistoryEntry]:
         """
         Retorna os itens mais recentes do histórico
 
@@ -437,13 +1883,132 @@ class ClipboardManager:
             Lista com itens mais recentes
         """
         with self.history_lock:
-            return (
-                self.clipboard_history[-limit:].copy() if self.clipboard_history else []
-            )
+            return self.clipboard_history.recent(limit)
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        fuzzy: bool = False,
+        offset: int = 0,
+    ) -> List[HistoryEntry]:
+        """
+        Busca itens do histórico que contêm todos os termos (sem diferenciar
+        maiúsculas nem acentos)
+
+        Args:
+            query: Termos separados por espaço (vazio retorna todo o histórico)
+            limit: Número máximo de resultados (None = todos)
+            fuzzy: Tolera erros de digitação (`TrigramIndex.fuzzy_search`,
+                sempre no índice em memória; com o motor SQLite cobre só a
+                janela de itens mantida em memória)
+            offset: Resultados a pular (paginação: próxima página com
+                `offset` = resultados já exibidos)
+
+        Returns:
+            Itens do mais recente para o mais antigo; com `fuzzy`, do mais
+            relevante (semelhança, recência e reuso) para o menos relevante
+        """
+        q = (query or "").strip()
+        offset = max(0, int(offset or 0))
+        # O índice em memória não pagina: busca até o fim da página e corta
+        end = None if limit is None else offset + limit
+        if fuzzy:
+            with self.history_lock:
+                ranked = self._search_index.fuzzy_search(
+                    q, end, lambda key: self._reuse_counts.get(key, 0)
+                )
+                return [
+                    self._items_by_key[k] for k, _ in ranked if k in self._items_by_key
+                ][offset:]
+        if self.storage_engine == STORAGE_ENGINE_SQLITE:
+            try:
+                return self._search_sqlite(q, limit, offset)
+            except Exception as e:
+                logging.warning(f"Falha na busca SQLite, usando índice em memória: {e}")
+
+        with self.history_lock:
+            keys = self._search_index.search(q, end)
+            return [self._items_by_key[k] for k in keys if k in self._items_by_key][
+                offset:
+            ]
+
+    def _search_sqlite(
+        self, query: str, limit: Optional[int], offset: int
+    ) -> List[HistoryEntry]:
+        """
+        Busca no banco sem esperar nem forçar uma gravação
+
+        O banco pode estar atrás da memória. Itens ainda não gravados (na fila
+        ou na gravação em andamento) vêm primeiro, do mais recente para o mais
+        antigo, e saem da consulta ao banco junto com os itens já descartados,
+        que o banco ainda pode ter. O resultado é o mesmo antes, durante e
+        depois da gravação.
+        """
+        with self.history_lock:
+            store = self._get_sqlite_store_locked()
+            writing = self._sqlite_writing
+            unsaved: List[HistoryEntry] = []
+            dropped: List[HistoryEntry] = []
+            cleared = False
+            if writing is not None:
+                # Uma limpeza em andamento: nada do banco vale mais
+                cleared = writing.snapshot
+                unsaved.extend(writing.journal)
+                dropped.extend(writing.removed)
+            unsaved.extend(self._pending_journal)
+            dropped.extend(self._pending_removed)
+
+        terms = split_terms(query)
+        dropped_ids = {id(i) for i in dropped}
+        seen: Set[Hashable] = set()
+        matches: List[HistoryEntry] = []
+        for item in reversed(unsaved):
+            if id(item) in dropped_ids or item.key in seen:
+                continue
+            seen.add(item.key)
+            if all(t in item.search_key for t in terms):
+                matches.append(item)
+
+        skip = min(offset, len(matches))
+        results = matches[skip:]
+        if limit is not None:
+            results = results[:limit]
+        if cleared or (limit is not None and len(results) >= limit):
+            return results
+        excluded = {i.digest for i in unsaved}
+        excluded.update(i.digest for i in dropped)
+        rows = store.search(
+            query,
+            None if limit is None else limit - len(results),
+            offset - skip,
+            excluded,
+        )
+        results.extend(HistoryEntry.from_dict(r) for r in rows)
+        return results
+
+    @property
+    def history_version(self) -> int:
+        """Muda a cada inclusão/remoção no histórico (ver `IncrementalSearch`)"""
+        return self._search_index.version
 
     def get_history_size(self) -> int:
-        """Retorna o número de itens no histórico"""
-        return len(self.clipboard_history)
+        """Retorna o número de itens no histórico (no modo paginado, os do banco)"""
+        with self.history_lock:
+            if not self._is_paged():
+                return len(self.clipboard_history)
+            store = self._get_sqlite_store_locked()
+            unsaved = len(self._pending_journal)
+        try:
+            return store.count() + unsaved
+        except Exception as e:
+            logging.warning(f"Falha ao contar itens do banco do histórico: {e}")
+            return len(self.clipboard_history)
+
+    def set_clipboard_backend(self, backend: ClipboardBackend) -> None:
+        """Define o backend de acesso ao clipboard (antes de iniciar o monitor)"""
+        self.clipboard_backend = backend
+        self._last_change_token = None
 
     def copy_text(self, text: str) -> None:
         """
@@ -453,7 +2018,7 @@ class ClipboardManager:
             text: Texto a ser copiado
         """
         try:
-            pyperclip.copy(text)
+            self.clipboard_backend.write_text(text)
         except Exception as e:
             logging.error(f"Erro ao copiar para clipboard: {e}")
 
@@ -472,8 +2037,7 @@ class ClipboardManager:
             Texto da clipboard
         """
         try:
-            text = pyperclip.paste()
-            return text if text is not None else ""
+            return self.clipboard_backend.read_text()
         except Exception as e:
             logging.warning(f"Erro ao obter clipboard: {e}")
             return ""
@@ -488,30 +2052,85 @@ class ClipboardManager:
     def initialize_last_content(self) -> None:
         """Inicializa o último conteúdo da clipboard"""
         try:
-            self.last_clipboard_content = pyperclip.paste()
+            self._last_change_token = self.clipboard_backend.change_token()
+            self.last_clipboard_content = self.clipboard_backend.read_text()
             content_len = (
                 len(self.last_clipboard_content) if self.last_clipboard_content else 0
             )
-            content_hash = (
-                hashlib.sha256(
-                    self.last_clipboard_content.encode("utf-8", errors="replace")
-                ).hexdigest()[:12]
-                if content_len
-                else "vazio"
-            )
-            logging.info(
-                f"Clipboard inicializado: len={content_len}, sha256={content_hash}"
-            )
+            content_fp = self._content_log_fingerprint(self.last_clipboard_content)
+            logging.info(f"Clipboard inicializado: len={content_len}, fp={content_fp}")
         except Exception as e:
             logging.warning(f"Erro ao inicializar clipboard: {e}")
             self.last_clipboard_content = ""
 
-    def monitor_clipboard_smart(self, on_change_callback=None) -> None:
+    def _content_log_fingerprint(self, text: Optional[str]) -> str:
+        """Fingerprint de log do conteúdo do clipboard, reaproveitando o último"""
+        if not text:
+            return "vazio"
+        cached_text, cached_fp = self._last_content_log_fp
+        if text is cached_text:
+            return cached_fp
+        fp = log_fingerprint(text)
+        self._last_content_log_fp = (text, fp)
+        return fp
+
+    def _poll_clipboard_once(self) -> bool:
+        """
+        Verifica o clipboard uma vez
+
+        Lê o texto só quando o token de mudança do backend mudou (ou quando o
+        backend não oferece token). Com o monitoramento pausado, apenas
+        atualiza o último conteúdo visto.
+
+        Returns:
+            True se um novo conteúdo foi processado
+        """
+        backend = self.clipboard_backend
+        token = backend.change_token()
+        if token is not None and token == self._last_change_token:
+            return False
+        current_content = backend.read_text()
+        self._last_change_token = token
+
+        if self.paused:
+            self.last_clipboard_content = current_content
+            return False
+
+        if not current_content or not current_content.strip():
+            return False
+        if current_content == self.last_clipboard_content:
+            return False
+
+        old_len = len(self.last_clipboard_content) if self.last_clipboard_content else 0
+        new_len = len(current_content)
+        # O conteúdo anterior já teve o fingerprint calculado (em cache)
+        old_fp = self._content_log_fingerprint(self.last_clipboard_content)
+        new_fp = self._content_log_fingerprint(current_content)
+        logging.info(
+            f"Clipboard mudou: old_len={old_len}, old_fp={old_fp}, new_len={new_len}, new_fp={new_fp}"
+        )
+        if not self._is_own_content(current_content):
+            # Em lote (IngestQueue): o monitor não espera o lock do histórico
+            # nem a gravação de blob; `flush_ingest` aguarda a inclusão
+            self.enqueue_text(current_content)
+        self.last_clipboard_content = current_content
+        logging.info(f"Clipboard atualizado: len={new_len}, fp={new_fp}")
+        return True
+
+    def monitor_clipboard_smart(
+        self,
+        on_change_callback: Optional[Callable[[], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> None:
         """
         Monitora inteligentemente o clipboard com polling adaptativo
 
+        Entre os ticks o loop espera num Event, e não num sleep: Ctrl+C
+        (`notify_clipboard_changed`), pausa e `stop_monitoring` o acordam na hora.
+
         Args:
             on_change_callback: Função a chamar quando clipboard mudar
+            should_stop: Função consultada a cada tick; True encerra o loop
         """
         logging.info("Monitor inteligente de clipboard iniciado")
 
@@ -521,74 +2140,37 @@ class ClipboardManager:
         attempt = 0
         last_activity_time = time.time()
 
-        while True:
+        while not self._monitor_stop.is_set():
+            if should_stop is not None and should_stop():
+                break
             attempt += 1
             current_time = time.time()
 
             try:
-                current_content = pyperclip.paste()
-
                 if attempt % 120 == 0:
                     time_idle = current_time - last_activity_time
                     logging.debug(
                         f"Monitor clipboard ativo (ocioso há {time_idle:.1f}s)"
                     )
 
-                # Se pausado, apenas atualiza last_content para evitar flood quando despausar
+                # Se pausado, apenas acompanha o clipboard para evitar flood quando despausar
                 if self.paused:
-                    self.last_clipboard_content = current_content
-                    time.sleep(1.0)
+                    self._poll_clipboard_once()
+                    self._wait_for_next_poll(1.0)
                     continue
 
-                # Verifica mudança
-                if current_content and current_content.strip():
-                    if current_content != self.last_clipboard_content:
-                        old_len = (
-                            len(self.last_clipboard_content)
-                            if self.last_clipboard_content
-                            else 0
-                        )
-                        new_len = len(current_content)
-                        old_hash = (
-                            hashlib.sha256(
-                                self.last_clipboard_content.encode(
-                                    "utf-8", errors="replace"
-                                )
-                            ).hexdigest()[:12]
-                            if old_len
-                            else "vazio"
-                        )
-                        new_hash = hashlib.sha256(
-                            current_content.encode("utf-8", errors="replace")
-                        ).hexdigest()[:12]
-                        logging.info(
-                            f"Clipboard mudou: old_len={old_len}, old_sha256={old_hash}, new_len={new_len}, new_sha256={new_hash}"
-                        )
-                        if not self._is_own_content(current_content):
-                            self.add_to_history(current_content)
-                        self.last_clipboard_content = current_content
-                        last_activity_time = current_time
-
-                        # Callback opcional
-                        if on_change_callback:
-                            on_change_callback()
+                if self._poll_clipboard_once():
+                    last_activity_time = current_time
 
-                        logging.info(
-                            f"Clipboard atualizado: len={new_len}, sha256={new_hash}"
-                        )
+                    # Callback opcional (vê o histórico já com o novo item)
+                    if on_change_callback:
+                        self.flush_ingest(1.0)
+                        on_change_callback()
 
-                # Polling adaptativo
-                time_idle = current_time - last_activity_time
-                monitor_interval = float(
-                    self.clipboard_monitor_interval_s or CLIPBOARD_MONITOR_INTERVAL
+                # Polling adaptativo (burst -> ativo -> teto ocioso)
+                sleep_time = self.polling_policy.interval(
+                    current_time - last_activity_time
                 )
-                idle_threshold = float(
-                    self.clipboard_idle_threshold_s or CLIPBOARD_IDLE_THRESHOLD
-                )
-                if time_idle < idle_threshold:
-                    sleep_time = monitor_interval
-                else:
-                    sleep_time = max(5.0, monitor_interval)
 
             except Exception as e:
                 logging.warning(f"Erro ao monitorar clipboard: {e}")
@@ -599,4 +2181,9 @@ class ClipboardManager:
                 except Exception:
                     sleep_time = CLIPBOARD_MONITOR_INTERVAL
 
-            time.sleep(sleep_time)
+            if self._wait_for_next_poll(sleep_time):
+                # Aviso de cópia: entra em burst, já que o conteúdo pode
+                # chegar logo depois do atalho
+                last_activity_time = time.time()
+
+        logging.info("Monitor de clipboard encerrado")
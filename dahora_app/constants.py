@@ -34,6 +34,13 @@ PRIVACY_MARKER_FILE = os.path.join(DATA_DIR, ".privacy_accepted")
 # Configurações de histórico
 MAX_HISTORY_ITEMS = 100
 DEFAULT_MAX_HISTORY_ITEMS = 100
+# Limite configurável por motor: o JSON mantém e regrava tudo em memória; o
+# SQLite mantém em memória só os itens mais recentes e busca o resto no banco
+MAX_HISTORY_ITEMS_JSON = 1000
+MAX_HISTORY_ITEMS_SQLITE = 1_000_000
+SQLITE_MEMORY_ITEMS = 1000
+# Resultados por página da busca (a janela moderna pede a próxima ao rolar)
+SEARCH_RESULTS_LIMIT = 500
 
 # Configurações de hotkeys
 HOTKEY_COPY_DATETIME = "ctrl+shift+q"
@@ -0,0 +1,216 @@
+"""
+Políticas de descarte do histórico do clipboard
+
+Com o histórico cheio, o item descartado era sempre o mais antigo e uma cópia
+repetida de um item existente era simplesmente ignorada. `EvictionPolicy`
+separa essa decisão do `ClipboardManager`:
+
+- FIFO: comportamento anterior (descarta o mais antigo; repetição ignorada)
+- LRU: a cópia repetida volta ao topo e o descartado é o usado há mais tempo
+- LFU: descarta o menos reutilizado (empate: o mais antigo), preservando
+  trechos colados com frequência
+
+As políticas só acompanham as chaves de deduplicação (`HistoryEntry.key`) e
+fazem a contabilidade em O(1) por operação com `OrderedDict`.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional
+
+EVICTION_FIFO = "fifo"
+EVICTION_LRU = "lru"
+EVICTION_LFU = "lfu"
+
+
+class EvictionPolicy:
+    """Acompanha as chaves do histórico e escolhe a próxima a sair (não thread-safe)"""
+
+    name = ""
+    # Se uma cópia repetida substitui o item existente, que volta ao topo
+    promote_on_hit = False
+
+    def insert(self, key: Hashable) -> None:
+        """Registra uma chave nova (uma chave já presente conta como `hit`)"""
+        raise NotImplementedError
+
+    def hit(self, key: Hashable) -> None:
+        """Registra a cópia repetida de uma chave presente"""
+        raise NotImplementedError
+
+    def remove(self, key: Hashable) -> None:
+        """Esquece a chave (descarte, expiração ou remoção explícita)"""
+        raise NotImplementedError
+
+    def victim(self) -> Optional[Hashable]:
+        """Próxima chave a descartar, ou None se vazio (não remove)"""
+        raise NotImplementedError
+
+    def rebuild(self, keys: Iterable[Hashable]) -> None:
+        """Recria o estado a partir das chaves do histórico, da mais antiga à mais recente"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, key: object) -> bool:
+        raise NotImplementedError
+
+
+class FifoPolicy(EvictionPolicy):
+    """Descarta na ordem de inclusão"""
+
+    name = EVICTION_FIFO
+
+    def __init__(self) -> None:
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def insert(self, key: Hashable) -> None:
+        if key in self._order:
+            self.hit(key)
+            return
+        self._order[key] = None
+
+    def hit(self, key: Hashable) -> None:
+        pass
+
+    def remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[Hashable]:
+        return next(iter(self._order), None)
+
+    def rebuild(self, keys: Iterable[Hashable]) -> None:
+        self._order = OrderedDict.fromkeys(keys)
+
+    def clear(self) -> None:
+        self._order.clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._order
+
+
+class LruPolicy(FifoPolicy):
+    """Descarta o usado há mais tempo; a cópia repetida volta ao fim da fila"""
+
+    name = EVICTION_LRU
+    promote_on_hit = True
+
+    def hit(self, key: Hashable) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+
+class LfuPolicy(EvictionPolicy):
+    """
+    Descarta a chave menos reutilizada; no empate, a mais antiga
+
+    Uma `OrderedDict` por frequência guarda as chaves na ordem de chegada
+    àquela frequência. Inclusão, repetição e descarte são O(1); uma remoção
+    fora da ordem (expiração) que esvazie a menor frequência só marca o mínimo
+    como desconhecido, recalculado no próximo `victim` em tempo proporcional
+    ao número de frequências distintas.
+    """
+
+    name = EVICTION_LFU
+    promote_on_hit = True
+
+    def __init__(self) -> None:
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        # Menor frequência presente (0 = desconhecida)
+        self._min_freq = 0
+
+    def _link(self, key: Hashable, freq: int) -> None:
+        self._freq[key] = freq
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+        bucket[key] = None
+
+    def _unlink(self, key: Hashable) -> int:
+        freq = self._freq.pop(key)
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+        return freq
+
+    def insert(self, key: Hashable) -> None:
+        if key in self._freq:
+            self.hit(key)
+            return
+        self._link(key, 1)
+        self._min_freq = 1
+
+    def hit(self, key: Hashable) -> None:
+        if key not in self._freq:
+            return
+        freq = self._unlink(key)
+        if freq == self._min_freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+        self._link(key, freq + 1)
+
+    def frequency(self, key: Hashable) -> int:
+        """Número de cópias registradas da chave (0 se ausente)"""
+        return self._freq.get(key, 0)
+
+    def remove(self, key: Hashable) -> None:
+        if key not in self._freq:
+            return
+        freq = self._unlink(key)
+        if freq == self._min_freq and freq not in self._buckets:
+            self._min_freq = 0
+
+    def victim(self) -> Optional[Hashable]:
+        if not self._freq:
+            return None
+        if self._min_freq not in self._buckets:
+            self._min_freq = min(self._buckets)
+        return next(iter(self._buckets[self._min_freq]))
+
+    def rebuild(self, keys: Iterable[Hashable]) -> None:
+        # Frequências não são persistidas; as já conhecidas são mantidas
+        previous = self._freq
+        self._freq = {}
+        self._buckets = {}
+        for key in keys:
+            if key not in self._freq:
+                self._link(key, previous.get(key, 1))
+        self._min_freq = 0
+
+    def clear(self) -> None:
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._freq)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._freq
+
+
+EVICTION_POLICIES = {
+    EVICTION_FIFO: FifoPolicy,
+    EVICTION_LRU: LruPolicy,
+    EVICTION_LFU: LfuPolicy,
+}
+
+
+def create_eviction_policy(name: str) -> EvictionPolicy:
+    """
+    Cria a política pelo nome
+
+    Raises:
+        ValueError: Nome desconhecido
+    """
+    policy = EVICTION_POLICIES.get((name or "").strip().lower())
+    if policy is None:
+        raise ValueError(f"Política de descarte desconhecida: {name!r}")
+    return policy()
@@ -0,0 +1,104 @@
+"""
+Conjunto com expiração por chave
+
+Usado para reconhecer conteúdos colados pelo próprio app (`mark_own_content`).
+O dict antigo era indexado pelo texto inteiro (retendo uma cópia de cada
+conteúdo) e varrido por completo a cada inclusão para remover os expirados.
+Aqui as chaves são fingerprints, os prazos ficam num min-heap (inclusão e
+expiração em O(log n) amortizado) e a consulta é um acesso O(1) ao dict.
+
+O mesmo heap agenda a expiração dos itens do histórico (`ClipboardManager`),
+com prazos absolutos (`add_at`) e a retirada das chaves vencidas em lote
+(`pop_expired`).
+"""
+
+import heapq
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class ExpiringSet:
+    """Chaves que deixam de pertencer ao conjunto após um prazo (não thread-safe)"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o conjunto
+
+        Args:
+            clock: Relógio monotônico em segundos (injetável nos testes)
+        """
+        self._clock = clock
+        # Chave -> (prazo, sequência da entrada válida no heap)
+        self._expiry: Dict[Hashable, Tuple[float, int]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._seq = 0
+
+    def add(self, key: Hashable, ttl_s: float) -> None:
+        """Inclui (ou renova) a chave por `ttl_s` segundos"""
+        now = self._clock()
+        self.expire(now)
+        self.add_at(key, now + float(ttl_s))
+
+    def add_at(self, key: Hashable, expiry: float) -> None:
+        """Inclui (ou renova) a chave até o instante `expiry` do relógio"""
+        self._seq += 1
+        self._expiry[key] = (expiry, self._seq)
+        heapq.heappush(self._heap, (expiry, self._seq, key))
+        # Renovações deixam entradas antigas no heap; compacta se dominarem
+        if len(self._heap) > 2 * len(self._expiry) + 16:
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: Tuple[float, int, Hashable]) -> bool:
+        current = self._expiry.get(entry[2])
+        return current is not None and current[1] == entry[1]
+
+    def discard(self, key: Hashable) -> None:
+        """Remove a chave (a entrada do heap é descartada ao expirar)"""
+        self._expiry.pop(key, None)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Remove as chaves vencidas
+
+        Returns:
+            Número de chaves removidas
+        """
+        return len(self.pop_expired(now))
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Hashable]:
+        """
+        Remove e retorna as chaves vencidas, da que venceu primeiro à última
+
+        Custo proporcional às chaves vencidas (mais as renovações descartadas).
+        """
+        if now is None:
+            now = self._clock()
+        removed: List[Hashable] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            # Só remove se a chave não foi renovada depois desta entrada
+            if self._is_current(entry):
+                del self._expiry[entry[2]]
+                removed.append(entry[2])
+        return removed
+
+    def next_expiry(self) -> Optional[float]:
+        """Próximo prazo, ou None se o conjunto estiver vazio"""
+        heap = self._heap
+        # Descarta do topo entradas renovadas ou removidas
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        current = self._expiry.get(key)
+        return current is not None and current[0] > self._clock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def clear(self) -> None:
+        self._expiry.clear()
+        self._heap.clear()
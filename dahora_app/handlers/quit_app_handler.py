@@ -61,7 +61,12 @@ class QuitAppHandler(CallbackHandler):
             logger.info("Encerrando Dahora App...")
 
             try:
-                self.app.clipboard_manager.flush_history()
+                self.app.clipboard_manager.stop_monitoring()
+            except Exception:
+                pass
+
+            try:
+                self.app.clipboard_manager.close_history(timeout=2.0)
             except Exception:
                 pass
 
@@ -0,0 +1,187 @@
+"""
+Armazenamento de conteúdos grandes do histórico fora do snapshot
+
+Textos acima do limite inline não entram no snapshot/journal: são gravados em
+arquivos próprios, endereçados pelo SHA-256 do conteúdo (calculado em blocos),
+e selados bloco a bloco com uma chave de dados própria do diretório de blobs.
+O item do histórico guarda só uma prévia e o id do blob; o texto completo é
+lido sob demanda (ao copiar o item).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from typing import Iterable, Iterator, Optional, Set
+
+from dahora_app.history_crypto import EncryptionBackend, EnvelopeCipher
+from dahora_app.utils import atomic_write_json, b64decode_str, b64encode_bytes
+
+# Tamanho (em caracteres) de cada bloco hasheado/selado
+CHUNK_CHARS = 1024 * 1024
+
+_MAGIC = b"DHB1"
+_HEADER = struct.Struct(">4sI")
+_CHUNK_LEN = struct.Struct(">I")
+_KEY_FILE = "key.json"
+
+
+def iter_text_chunks(text: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[bytes]:
+    """Codifica o texto em UTF-8 bloco a bloco (sem materializar tudo em bytes)"""
+    for start in range(0, len(text), chunk_chars):
+        yield text[start : start + chunk_chars].encode("utf-8", errors="replace")
+
+
+def stream_digest(text: str, chunk_chars: int = CHUNK_CHARS) -> str:
+    """SHA-256 do texto em UTF-8, calculado em blocos"""
+    digest = hashlib.sha256()
+    for chunk in iter_text_chunks(text, chunk_chars):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _chunk_aad(blob_id: str, index: int, count: int) -> bytes:
+    # Liga cada bloco ao blob, à posição e ao total (impede troca/truncamento)
+    return blob_id.encode("ascii") + struct.pack(">II", index, count)
+
+
+class BlobStore:
+    """Diretório de blobs selados, um arquivo por conteúdo"""
+
+    def __init__(self, directory: str, backend: EncryptionBackend):
+        """
+        Inicializa o store (o diretório é criado no primeiro uso)
+
+        Args:
+            directory: Diretório dos blobs
+            backend: Backend que protege a chave de dados dos blobs
+        """
+        self.directory = directory
+        self.backend = backend
+        self._envelope: Optional[EnvelopeCipher] = None
+        self._key_lock = threading.Lock()
+
+    def _get_envelope(self) -> EnvelopeCipher:
+        envelope = self._envelope
+        if envelope is not None:
+            return envelope
+        # Duas gravações simultâneas não podem criar chaves diferentes: os
+        # blobs selados com a chave sobrescrita ficariam ilegíveis
+        with self._key_lock:
+            if self._envelope is None:
+                self._envelope = self._load_or_create_envelope()
+            return self._envelope
+
+    def _load_or_create_envelope(self) -> EnvelopeCipher:
+        key_path = os.path.join(self.directory, _KEY_FILE)
+        if os.path.exists(key_path):
+            with open(key_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("backend") != self.backend.name:
+                raise RuntimeError(
+                    f"Blobs protegidos com backend '{meta.get('backend')}', ativo: '{self.backend.name}'"
+                )
+            return EnvelopeCipher.unwrap(
+                self.backend, b64decode_str(meta.get("key", ""))
+            )
+        os.makedirs(self.directory, exist_ok=True)
+        envelope = EnvelopeCipher.generate()
+        atomic_write_json(
+            key_path,
+            {
+                "backend": self.backend.name,
+                "key": b64encode_bytes(envelope.wrap(self.backend)),
+            },
+        )
+        return envelope
+
+    def path_for(self, blob_id: str) -> str:
+        return os.path.join(self.directory, blob_id + ".blob")
+
+    def exists(self, blob_id: str) -> bool:
+        return os.path.exists(self.path_for(blob_id))
+
+    def write(self, blob_id: str, text: str, chunk_chars: int = CHUNK_CHARS) -> None:
+        """
+        Grava o texto selado em blocos (não faz nada se o blob já existir)
+
+        Args:
+            blob_id: SHA-256 do texto (ver `stream_digest`)
+            text: Conteúdo completo
+        """
+        path = self.path_for(blob_id)
+        if os.path.exists(path):
+            return
+        envelope = self._get_envelope()
+        count = (len(text) + chunk_chars - 1) // chunk_chars
+        # Nome temporário único: duas threads podem gravar o mesmo conteúdo
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, count))
+            for index, chunk in enumerate(iter_text_chunks(text, chunk_chars)):
+                sealed = envelope.seal(chunk, _chunk_aad(blob_id, index, count))
+                f.write(_CHUNK_LEN.pack(len(sealed)))
+                f.write(sealed)
+        os.replace(tmp_path, path)
+
+    def read(self, blob_id: str) -> str:
+        """
+        Lê e decripta um blob
+
+        Raises:
+            ValueError: Se o arquivo estiver corrompido ou adulterado
+            OSError: Se o blob não existir
+        """
+        envelope = self._get_envelope()
+        parts = []
+        with open(self.path_for(blob_id), "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("Blob truncado")
+            magic, count = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError("Formato de blob desconhecido")
+            for index in range(count):
+                raw_len = f.read(_CHUNK_LEN.size)
+                if len(raw_len) != _CHUNK_LEN.size:
+                    raise ValueError("Blob truncado")
+                (length,) = _CHUNK_LEN.unpack(raw_len)
+                sealed = f.read(length)
+                if len(sealed) != length:
+                    raise ValueError("Blob truncado")
+                parts.append(
+                    envelope.open(sealed, _chunk_aad(blob_id, index, count)).decode(
+                        "utf-8"
+                    )
+                )
+        return "".join(parts)
+
+    def remove(self, blob_id: str) -> None:
+        try:
+            os.remove(self.path_for(blob_id))
+        except FileNotFoundError:
+            pass
+
+    def ids(self) -> Set[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return set()
+        return {name[: -len(".blob")] for name in names if name.endswith(".blob")}
+
+    def collect(self, live_ids: Iterable[str]) -> int:
+        """
+        Remove blobs que não são mais referenciados pelo histórico
+
+        Returns:
+            Número de blobs removidos
+        """
+        stale = self.ids() - set(live_ids)
+        for blob_id in stale:
+            try:
+                self.remove(blob_id)
+            except OSError as e:
+                logging.warning(f"Falha ao remover blob do histórico: {e}")
+        return len(stale)
@@ -0,0 +1,156 @@
+"""
+Buffer circular do histórico do clipboard
+
+Substitui a lista usada antes: com o histórico cheio, cada inclusão descartava
+o item mais antigo recriando a lista inteira (`lista[overflow:]`). Aqui o
+descarte é O(1) e o item descartado é devolvido para que o chamador atualize
+apenas os índices afetados.
+
+Os itens ficam numa `OrderedDict` indexada pela identidade do objeto: além do
+descarte do mais antigo, remover um item em qualquer posição ou levá-lo ao
+topo (política LRU/LFU, ver `eviction.py`) também custa O(1). Cada objeto
+aparece no máximo uma vez.
+"""
+
+from collections import OrderedDict
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from dahora_app.history_entry import HistoryEntry
+
+
+class HistoryBuffer:
+    """Sequência limitada do mais antigo para o mais recente"""
+
+    def __init__(self, items: Iterable[HistoryEntry] = (), maxlen: int = 100):
+        """
+        Inicializa o buffer
+
+        Args:
+            items: Itens iniciais (do mais antigo para o mais recente); se
+                excederem `maxlen`, só os mais recentes são mantidos
+            maxlen: Capacidade máxima
+        """
+        self._maxlen = max(1, int(maxlen))
+        self._items: "OrderedDict[int, HistoryEntry]" = OrderedDict(
+            (id(item), item) for item in items
+        )
+        while len(self._items) > self._maxlen:
+            self._items.popitem(last=False)
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    def append(self, item: HistoryEntry) -> Optional[HistoryEntry]:
+        """
+        Adiciona um item como o mais recente
+
+        Returns:
+            Item mais antigo descartado por falta de espaço, ou None
+        """
+        self._items[id(item)] = item
+        if len(self._items) > self._maxlen:
+            return self._items.popitem(last=False)[1]
+        return None
+
+    def popleft(self) -> HistoryEntry:
+        """Remove e retorna o item mais antigo (IndexError se vazio)"""
+        if not self._items:
+            raise IndexError("popleft de HistoryBuffer vazio")
+        return self._items.popitem(last=False)[1]
+
+    def remove_items(self, items: Iterable[HistoryEntry]) -> List[HistoryEntry]:
+        """
+        Remove itens específicos (por identidade) em qualquer posição
+
+        Custo proporcional ao número de itens pedidos, não ao tamanho do buffer.
+
+        Returns:
+            Itens removidos, na ordem em que foram pedidos (ausentes são ignorados)
+        """
+        removed: List[HistoryEntry] = []
+        for item in items:
+            if self._items.pop(id(item), None) is not None:
+                removed.append(item)
+        return removed
+
+    def move_to_end(self, item: HistoryEntry) -> None:
+        """Leva um item presente ao topo (mais recente) em O(1)"""
+        self._items.move_to_end(id(item))
+
+    def prepend(self, items: List[HistoryEntry]) -> None:
+        """
+        Insere itens mais antigos que os atuais (carga tardia do histórico)
+
+        Só ocupa o espaço livre: se `items` não couber, os mais antigos dele
+        são ignorados.
+        """
+        room = self._maxlen - len(self._items)
+        if room <= 0 or not items:
+            return
+        for item in reversed(items[-room:]):
+            key = id(item)
+            if key in self._items:
+                continue
+            self._items[key] = item
+            self._items.move_to_end(key, last=False)
+
+    def resize(self, maxlen: int) -> List[HistoryEntry]:
+        """
+        Altera a capacidade; custo proporcional aos itens descartados
+
+        Returns:
+            Itens descartados (do mais antigo para o mais recente)
+        """
+        self._maxlen = max(1, int(maxlen))
+        removed: List[HistoryEntry] = []
+        while len(self._items) > self._maxlen:
+            removed.append(self._items.popitem(last=False)[1])
+        return removed
+
+    def recent(self, k: int) -> List[HistoryEntry]:
+        """Retorna os `k` itens mais recentes (do mais antigo para o mais recente) em O(k)"""
+        if k <= 0:
+            return []
+        items = list(islice(reversed(self._items.values()), k))
+        items.reverse()
+        return items
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        return iter(self._items.values())
+
+    def __reversed__(self) -> Iterator[HistoryEntry]:
+        return reversed(self._items.values())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items.values())[index]
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("índice fora do HistoryBuffer")
+        # Percorre a partir da ponta mais próxima
+        if index < size // 2:
+            return next(islice(self._items.values(), index, None))
+        return next(islice(reversed(self._items.values()), size - 1 - index, None))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HistoryBuffer):
+            return list(self) == list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HistoryBuffer({list(self)!r}, maxlen={self._maxlen})"
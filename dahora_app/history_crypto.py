@@ -0,0 +1,169 @@
+"""
+Criptografia do histórico do clipboard
+
+Usa envelope encryption: uma chave de dados aleatória é protegida uma única vez
+pelo backend (DPAPI no Windows, arquivo de chave local nos demais sistemas) e
+cada item do histórico é selado separadamente com ela (AES-GCM, pacote
+`cryptography`). Assim, salvar ou ler um item não exige decriptar o histórico
+inteiro.
+"""
+
+import os
+import sys
+from typing import Optional
+
+from dahora_app.utils import dpapi_encrypt_bytes, dpapi_decrypt_bytes
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError as e:  # pragma: no cover - depende do ambiente
+    raise ImportError(
+        "O histórico criptografado requer o pacote 'cryptography' "
+        "(pip install -r requirements.txt)"
+    ) from e
+
+
+KEY_SIZE = 32
+
+# Primeiro byte de cada blob selado identifica o algoritmo usado
+_ALG_AES_GCM = 1
+
+_GCM_NONCE_SIZE = 12
+
+
+def seal(key: bytes, plaintext: bytes, aad: bytes = b"") -> bytes:
+    """
+    Cifra e autentica dados com AES-GCM
+
+    Args:
+        key: Chave de 32 bytes
+        plaintext: Dados em claro
+        aad: Dados associados autenticados (não cifrados)
+
+    Returns:
+        Blob selado (algoritmo + nonce + cifra + tag)
+    """
+    nonce = os.urandom(_GCM_NONCE_SIZE)
+    return bytes([_ALG_AES_GCM]) + nonce + AESGCM(key).encrypt(nonce, plaintext, aad)
+
+
+def open_sealed(key: bytes, blob: bytes, aad: bytes = b"") -> bytes:
+    """
+    Abre um blob produzido por `seal`
+
+    Raises:
+        ValueError: Se o blob estiver corrompido, adulterado ou usar um
+            algoritmo desconhecido
+    """
+    if not blob:
+        raise ValueError("Blob vazio")
+
+    alg = blob[0]
+    if alg != _ALG_AES_GCM:
+        raise ValueError(f"Algoritmo de blob desconhecido: {alg}")
+    nonce = blob[1 : 1 + _GCM_NONCE_SIZE]
+    try:
+        return AESGCM(key).decrypt(nonce, blob[1 + _GCM_NONCE_SIZE :], aad)
+    except Exception as e:
+        raise ValueError("Falha na autenticação do blob") from e
+
+
+class EncryptionBackend:
+    """Interface para proteger a chave de dados do histórico"""
+
+    name = ""
+
+    def protect(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def unprotect(self, blob: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class DpapiBackend(EncryptionBackend):
+    """Protege a chave com DPAPI (vinculada ao usuário do Windows)"""
+
+    name = "dpapi"
+
+    def __init__(self, entropy: bytes):
+        self.entropy = entropy
+
+    def protect(self, data: bytes) -> bytes:
+        return dpapi_encrypt_bytes(data, self.entropy)
+
+    def unprotect(self, blob: bytes) -> bytes:
+        return dpapi_decrypt_bytes(blob, self.entropy)
+
+
+class PortableBackend(EncryptionBackend):
+    """
+    Protege a chave com uma chave mestra guardada em arquivo local
+
+    Não depende de APIs do sistema operacional; a proteção equivale à permissão
+    do arquivo de chave (criado com modo 0600). O arquivo (`history.key`) fica
+    no mesmo diretório dos dados que protege: quem consegue ler esse diretório
+    (outro usuário com acesso, um backup ou uma sincronização da pasta) lê o
+    histórico. Protege contra a leitura isolada dos arquivos do histórico, não
+    contra o acesso à pasta inteira.
+    """
+
+    name = "portable"
+
+    def __init__(self, key_path: str):
+        self.key_path = key_path
+        self._master_key: Optional[bytes] = None
+
+    def _get_master_key(self) -> bytes:
+        if self._master_key is not None:
+            return self._master_key
+        try:
+            with open(self.key_path, "rb") as f:
+                key = f.read()
+            if len(key) != KEY_SIZE:
+                raise ValueError(f"Arquivo de chave inválido: {self.key_path}")
+        except FileNotFoundError:
+            key = os.urandom(KEY_SIZE)
+            fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(key)
+        self._master_key = key
+        return key
+
+    def protect(self, data: bytes) -> bytes:
+        return seal(self._get_master_key(), data, b"dahora-data-key")
+
+    def unprotect(self, blob: bytes) -> bytes:
+        return open_sealed(self._get_master_key(), blob, b"dahora-data-key")
+
+
+def get_default_backend(entropy: bytes, key_path: str) -> EncryptionBackend:
+    """Retorna DPAPI no Windows e o backend portátil nos demais sistemas"""
+    if sys.platform == "win32":
+        return DpapiBackend(entropy)
+    return PortableBackend(key_path)
+
+
+class EnvelopeCipher:
+    """Chave de dados do histórico, usada para selar cada item separadamente"""
+
+    def __init__(self, data_key: bytes):
+        if len(data_key) != KEY_SIZE:
+            raise ValueError("Chave de dados deve ter 32 bytes")
+        self._data_key = data_key
+
+    @classmethod
+    def generate(cls) -> "EnvelopeCipher":
+        return cls(os.urandom(KEY_SIZE))
+
+    @classmethod
+    def unwrap(cls, backend: EncryptionBackend, wrapped: bytes) -> "EnvelopeCipher":
+        return cls(backend.unprotect(wrapped))
+
+    def wrap(self, backend: EncryptionBackend) -> bytes:
+        return backend.protect(self._data_key)
+
+    def seal(self, plaintext: bytes, aad: bytes = b"") -> bytes:
+        return seal(self._data_key, plaintext, aad)
+
+    def open(self, blob: bytes, aad: bytes = b"") -> bytes:
+        return open_sealed(self._data_key, blob, aad)
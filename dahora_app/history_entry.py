@@ -0,0 +1,223 @@
+"""
+Representação compacta de um item do histórico
+
+Cada item era um dict de três chaves com a string "Dahora App" repetida e o
+timestamp em ISO. `HistoryEntry` usa `__slots__`, guarda o timestamp como float
+(epoch), interna o nome do app e calcula o fingerprint do texto uma única vez,
+na criação, reduzindo a memória residente com históricos grandes. Continua
+compatível com o acesso por chave (`item["text"]`, `item.get("timestamp")`)
+usado pela UI e converte sem perdas para o formato JSON.
+
+Conteúdos grandes ficam fora do item (ver `history_blobs.py`): `text` guarda
+só uma prévia, `blob` o SHA-256 do conteúdo completo e `size` seu tamanho.
+"""
+
+import hashlib
+import sys
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional
+
+from dahora_app.history_index import normalize_text
+
+_FIELDS = ("text", "timestamp", "app")
+
+# Dígitos hex do SHA-256 mostrados nos logs
+_LOG_FINGERPRINT_CHARS = 12
+
+# Marca das chaves de deduplicação de itens em blob (tupla nunca é igual a str)
+_BLOB_KEY = "blob"
+
+
+def blob_key(blob_id: str) -> Hashable:
+    """Chave de deduplicação de um item cujo texto está no blob `blob_id`"""
+    return (_BLOB_KEY, blob_id)
+
+
+def fingerprint_text(text: str) -> int:
+    """
+    Fingerprint rápido (não criptográfico) do texto
+
+    Usa o hash nativo de `str`, que o CPython calcula uma vez e guarda no
+    próprio objeto. Só é estável dentro do processo (o hash de str é salgado
+    por execução): serve para deduplicação em memória, nunca para logs ou
+    dados persistidos (ver `log_fingerprint` e `HistoryEntry.digest`).
+    """
+    return hash(text)
+
+
+def log_fingerprint(text: str) -> str:
+    """
+    Fingerprint para logs (12 dígitos hex, sem expor o texto)
+
+    Início do SHA-256 do texto: a mesma cópia tem o mesmo fingerprint em
+    execuções diferentes e bate com o início de `HistoryEntry.digest`.
+    """
+    digest = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+    return digest[:_LOG_FINGERPRINT_CHARS]
+
+
+def _parse_timestamp(timestamp: str) -> Optional[float]:
+    """Converte ISO para epoch, ou None se a volta não reproduzir a string exata"""
+    if not timestamp:
+        return None
+    try:
+        created = datetime.fromisoformat(timestamp).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return None
+    try:
+        if datetime.fromtimestamp(created).isoformat() != timestamp:
+            return None
+    except (ValueError, OverflowError, OSError):
+        return None
+    return created
+
+
+class HistoryEntry:
+    """Item do histórico com `__slots__` e acesso compatível com dict"""
+
+    __slots__ = (
+        "text",
+        "created",
+        "app",
+        "fingerprint",
+        "blob",
+        "size",
+        "_raw_timestamp",
+        "_digest",
+        "_search_key",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        created: Optional[float] = None,
+        app: str = "",
+        raw_timestamp: Optional[str] = None,
+        blob: Optional[str] = None,
+        size: int = 0,
+    ):
+        """
+        Inicializa o item
+
+        Args:
+            text: Texto copiado
+            created: Momento da cópia (epoch); None quando desconhecido
+            app: Origem do item (internado)
+            raw_timestamp: Timestamp original, guardado apenas quando não pode
+                ser reconstruído a partir de `created`
+            blob: Id do blob com o texto completo (None = texto inline)
+            size: Tamanho do texto completo, em caracteres (só para blobs)
+        """
+        self.text = text
+        self.created = created
+        self.app = sys.intern(app) if app else ""
+        self.fingerprint = fingerprint_text(text)
+        self.blob = blob
+        self.size = size if blob else len(text)
+        self._raw_timestamp = raw_timestamp
+        self._digest: Optional[str] = blob
+        self._search_key: Optional[str] = None
+
+    @classmethod
+    def now(
+        cls, text: str, app: str, blob: Optional[str] = None, size: int = 0
+    ) -> "HistoryEntry":
+        return cls(text, datetime.now().timestamp(), app, None, blob, size)
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "HistoryEntry":
+        """Cria a partir de um item já sanitizado (`text`, `timestamp`, `app`
+        e, para blobs, `blob`/`size`)"""
+        timestamp = item.get("timestamp") or ""
+        created = _parse_timestamp(timestamp)
+        return cls(
+            item["text"],
+            created,
+            item.get("app") or "",
+            timestamp if created is None else None,
+            item.get("blob") or None,
+            int(item.get("size") or 0),
+        )
+
+    @property
+    def key(self) -> Hashable:
+        """Chave de deduplicação: o texto, ou o digest do conteúdo para blobs"""
+        if self.blob:
+            return blob_key(self.blob)
+        return self.text
+
+    @property
+    def timestamp(self) -> str:
+        """Timestamp em ISO (mesmo valor lido do JSON)"""
+        if self._raw_timestamp is not None:
+            return self._raw_timestamp
+        if self.created is None:
+            return ""
+        return datetime.fromtimestamp(self.created).isoformat()
+
+    @property
+    def search_key(self) -> str:
+        """Texto normalizado para busca (`normalize_text`), calculado uma vez
+
+        O ClipboardManager o calcula na inclusão, ao indexar o item. Quando a
+        normalização não altera o texto, reaproveita a própria string.
+        """
+        if self._search_key is None:
+            key = normalize_text(self.text)
+            self._search_key = self.text if key == self.text else key
+        return self._search_key
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 do texto completo, estável entre execuções (calculado sob demanda, uma vez)"""
+        if self._digest is None:
+            self._digest = hashlib.sha256(
+                self.text.encode("utf-8", errors="replace")
+            ).hexdigest()
+        return self._digest
+
+    @property
+    def log_fingerprint(self) -> str:
+        """Fingerprint do texto completo para logs (ver `log_fingerprint`)"""
+        return self.digest[:_LOG_FINGERPRINT_CHARS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "text": self.text,
+            "timestamp": self.timestamp,
+            "app": self.app,
+        }
+        if self.blob:
+            item["blob"] = self.blob
+            item["size"] = self.size
+        return item
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELDS
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HistoryEntry):
+            return (
+                self.text == other.text
+                and self.timestamp == other.timestamp
+                and self.app == other.app
+                and self.blob == other.blob
+            )
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"HistoryEntry({self.to_dict()!r})"
@@ -0,0 +1,505 @@
+"""
+Índice invertido de trigramas para busca no histórico
+
+Mantido incrementalmente pelo ClipboardManager: cada item entra no índice ao ser
+adicionado e sai ao ser descartado. A busca intersecta as listas de postings
+dos trigramas de cada termo e só verifica (substring) os candidatos restantes.
+
+Textos e consultas são comparados na forma normalizada (`normalize_text`):
+`casefold()` + NFKD sem marcas combinantes, de modo que "acao" encontra "Ação".
+O texto normalizado de cada item é calculado uma vez, na inclusão.
+
+`IncrementalSearch` atende a digitação: quando a nova consulta só estreita a
+anterior ("relat" -> "relato"), filtra o resultado anterior em vez de buscar
+de novo no histórico inteiro.
+
+`TrigramIndex.fuzzy_search` tolera erros de digitação: os trigramas da consulta
+podam os candidatos (filtro de contagem de q-gramas) e só eles passam pela
+distância de edição limitada (`substring_distance`); o resultado é ordenado
+pela semelhança combinada com recência e frequência de reuso.
+"""
+
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+NGRAM_SIZE = 3
+
+# Textos maiores que isso não são indexados; entram sempre como candidatos
+DEFAULT_MAX_INDEXED_CHARS = 64 * 1024
+
+# Acima de 1/_SCAN_RATIO dos documentos, o menor posting é percorrido em ordem
+# de recência em vez de ordenado
+_SCAN_RATIO = 8
+
+# Busca aproximada: candidatos verificados no máximo (os que compartilham mais
+# trigramas com a consulta primeiro) e pesos da ordenação
+FUZZY_MAX_CANDIDATES = 5000
+FUZZY_RECENCY_WEIGHT = 0.2
+FUZZY_FREQUENCY_WEIGHT = 0.2
+
+
+def normalize_text(text: str) -> str:
+    """
+    Forma de busca do texto: sem diferenciar maiúsculas nem acentos
+
+    Aplica `casefold()` e decompõe (NFKD) removendo as marcas combinantes.
+    Textos ASCII só passam por `lower()` (equivalente a `casefold()` nesse caso).
+    """
+    if not text:
+        return ""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def search_text_of(item: Any) -> str:
+    """Texto normalizado de um item (`HistoryEntry.search_key` ou calculado de `text`)"""
+    search_key = getattr(item, "search_key", None)
+    if search_key is None:
+        search_key = normalize_text(item.get("text", "") or "")
+    return search_key
+
+
+def split_terms(query: str) -> List[str]:
+    """Divide a consulta em termos (normalizados, sem vazios)"""
+    return normalize_text(query or "").split()
+
+
+def find_term(text: str, term: str, start: int = 0) -> Tuple[int, int]:
+    """
+    Localiza um termo já normalizado no texto original
+
+    A normalização pode mudar o comprimento ("ß" vira "ss", "ç" vira "c" +
+    marca removida), por isso a posição é mapeada de volta caractere a
+    caractere. Usado só em prévias e destaques, nunca no histórico inteiro.
+
+    Returns:
+        (início, fim) no texto original, ou (-1, -1) se não encontrado
+    """
+    if not term:
+        return -1, -1
+    if text.isascii():
+        # Normalização caractere a caractere: posições coincidem
+        pos = text.lower().find(term, start)
+        return (pos, pos + len(term)) if pos != -1 else (-1, -1)
+    chars: List[str] = []
+    offsets: List[int] = []
+    for i in range(start, len(text)):
+        folded = normalize_text(text[i])
+        chars.append(folded)
+        offsets.extend([i] * len(folded))
+    pos = "".join(chars).find(term)
+    if pos == -1:
+        return -1, -1
+    return offsets[pos], offsets[pos + len(term) - 1] + 1
+
+
+def refines(previous: List[str], terms: List[str]) -> bool:
+    """
+    Se a consulta `terms` só pode casar itens que `previous` também casa
+
+    Vale quando cada termo anterior está contido em algum termo novo (o termo
+    foi estendido ou outro termo foi acrescentado). Termos já normalizados.
+    """
+    return all(any(old in new for new in terms) for old in previous)
+
+
+def max_typos(term: str) -> int:
+    """Erros tolerados num termo da busca aproximada (termos curtos: nenhum)"""
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 7:
+        return 1
+    return 2
+
+
+def _pattern_bits(term: str) -> Dict[str, int]:
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(term):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def substring_distance(
+    term: str,
+    text: str,
+    max_distance: int,
+    _peq: Optional[Dict[str, int]] = None,
+) -> Optional[int]:
+    """
+    Menor distância de edição entre `term` e algum trecho de `text`
+
+    Inserção, remoção, troca e inversão de duas letras vizinhas ("cleinte")
+    custam 1 cada. Algoritmo bit-paralelo de Myers com a extensão de Hyyrö
+    para inversões: uma passada pelo texto, com as colunas da matriz de
+    programação dinâmica em inteiros. Para assim que encontra uma ocorrência
+    exata.
+
+    Returns:
+        A distância, ou None se for maior que `max_distance`
+    """
+    m = len(term)
+    if m == 0:
+        return 0
+    peq = _peq if _peq is not None else _pattern_bits(term)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best = m
+    d0, prev_eq = mask, 0
+    for c in text:
+        eq = peq.get(c, 0)
+        # Inversão: a letra atual casa uma posição acima e a anterior, esta
+        tr = ((~d0 & eq) << 1) & prev_eq
+        xv = eq | mv
+        d0 = ((((xv & pv) + pv) ^ pv) | xv | tr) & mask
+        ph = mv | (~(d0 | pv) & mask)
+        mh = pv & d0
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # O início do trecho é livre: nada entra pela linha 0
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(d0 | ph) & mask)
+        mv = ph & d0
+        prev_eq = eq
+        if score < best:
+            best = score
+            if best == 0:
+                break
+    return best if best <= max_distance else None
+
+
+def _closest_word(
+    text: str,
+    term: str,
+    allowed: int,
+    peq: Dict[str, int],
+    cache: Dict[str, Optional[int]],
+) -> Optional[int]:
+    """Menor `substring_distance` de `term` às palavras de `text` (None = nenhuma)"""
+    best: Optional[int] = None
+    shortest = len(term) - allowed
+    for word in text.split():
+        if len(word) < shortest:
+            continue
+        if word in cache:
+            distance = cache[word]
+        else:
+            distance = cache[word] = substring_distance(term, word, allowed, peq)
+        if distance is not None and (best is None or distance < best):
+            best = distance
+    return best
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """Índice de trigramas com consultas AND de múltiplos termos"""
+
+    def __init__(self, max_indexed_chars: int = DEFAULT_MAX_INDEXED_CHARS):
+        self.max_indexed_chars = max_indexed_chars
+        self._next_doc = 0
+        self._doc_by_key: Dict[Hashable, int] = {}
+        self._key_by_doc: Dict[int, Hashable] = {}
+        self._text_by_doc: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._unindexed: Set[int] = set()
+        # Incrementada a cada alteração (invalida resultados reaproveitados)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_by_key)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._doc_by_key.clear()
+        self._key_by_doc.clear()
+        self._text_by_doc.clear()
+        self._postings.clear()
+        self._unindexed.clear()
+
+    def add(self, key: Hashable, text: str, search_text: Optional[str] = None) -> None:
+        """
+        Indexa um texto
+
+        Documentos adicionados depois são considerados mais recentes.
+
+        Args:
+            key: Identificador único do item
+            text: Texto do item
+            search_text: `normalize_text(text)` já calculado (evita recalcular)
+        """
+        if key in self._doc_by_key:
+            self.remove(key)
+
+        self.version += 1
+        doc = self._next_doc
+        self._next_doc += 1
+        lowered = normalize_text(text) if search_text is None else search_text
+        self._doc_by_key[key] = doc
+        self._key_by_doc[doc] = key
+        self._text_by_doc[doc] = lowered
+
+        if len(lowered) > self.max_indexed_chars:
+            self._unindexed.add(doc)
+            return
+        for gram in _ngrams(lowered):
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = {doc}
+            else:
+                posting.add(doc)
+
+    def remove(self, key: Hashable) -> None:
+        doc = self._doc_by_key.pop(key, None)
+        if doc is None:
+            return
+        self.version += 1
+        del self._key_by_doc[doc]
+        lowered = self._text_by_doc.pop(doc)
+
+        if doc in self._unindexed:
+            self._unindexed.discard(doc)
+            return
+        for gram in _ngrams(lowered):
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(doc)
+            if not posting:
+                del self._postings[gram]
+
+    def _postings_for(self, terms: List[str]) -> Optional[List[Set[int]]]:
+        """Postings dos trigramas da consulta, do menor para o maior
+
+        Retorna None quando nenhum termo tem trigramas (não há como podar).
+        """
+        grams: Set[str] = set()
+        for term in terms:
+            grams |= _ngrams(term)
+        if not grams:
+            return None
+        postings = [self._postings.get(gram) or set() for gram in grams]
+        postings.sort(key=len)
+        return postings
+
+    def _ordered_docs(self, postings: Optional[List[Set[int]]]) -> Iterable[int]:
+        """Documentos candidatos, do mais recente para o mais antigo"""
+        if postings is None:
+            # Dict preserva a ordem de inserção (docs crescentes)
+            return reversed(self._key_by_doc)
+
+        smallest = postings[0]
+        others = postings[1:]
+        if len(smallest) * _SCAN_RATIO < len(self._key_by_doc):
+            # Consulta seletiva: ordena só o menor posting
+            docs: Iterable[int] = sorted(smallest | self._unindexed, reverse=True)
+        else:
+            # Termos muito comuns: percorre em ordem de recência e para no limite,
+            # evitando ordenar (ou copiar) postings enormes; a verificação por
+            # substring em `search` já é o filtro mais barato aqui
+            return reversed(self._key_by_doc)
+        unindexed = self._unindexed
+        return (
+            doc
+            for doc in docs
+            if doc in unindexed or all(doc in posting for posting in others)
+        )
+
+    def fuzzy_search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        frequency: Optional[Callable[[Hashable], int]] = None,
+        max_candidates: int = FUZZY_MAX_CANDIDATES,
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Busca aproximada: cada termo pode aparecer com até `max_typos` erros
+
+        Poda: um trecho a distância k de um termo de m caracteres compartilha
+        pelo menos (m - 2) - 3k trigramas com ele; exige-se ao menos um. Só os
+        candidatos restantes (até `max_candidates`, os que compartilham mais
+        trigramas primeiro) são verificados: termos que não aparecem exatos
+        são comparados palavra a palavra com `substring_distance`, com cache
+        por palavra. Documentos não indexados (textos enormes) só casam termos
+        exatos.
+
+        Pontuação: semelhança (1 - erros / caracteres dos termos) somada à
+        recência e à frequência de reuso, ambas normalizadas em [0, 1).
+
+        Args:
+            query: Termos separados por espaço
+            limit: Número máximo de resultados (None = todos)
+            frequency: Número de reusos de uma chave (None = não pondera)
+            max_candidates: Limite de candidatos verificados
+
+        Returns:
+            Pares (chave, pontuação), da maior pontuação para a menor
+        """
+        terms = split_terms(query)
+        if not self._key_by_doc:
+            return []
+
+        # Candidatos: interseção do filtro de contagem de cada termo
+        candidates: Optional[Set[int]] = None
+        shared: Counter = Counter()
+        for term in terms:
+            grams = _ngrams(term)
+            if not grams:
+                continue
+            counts: Counter = Counter()
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting:
+                    counts.update(posting)
+            need = max(1, len(grams) - NGRAM_SIZE * max_typos(term))
+            matched = {doc for doc, n in counts.items() if n >= need}
+            candidates = matched if candidates is None else candidates & matched
+            shared.update(counts)
+        if candidates is None:
+            # Só termos curtos: sem poda, todos os documentos (mais recentes primeiro)
+            ordered: List[int] = list(reversed(self._key_by_doc))
+        else:
+            # Mais trigramas em comum primeiro; empate: mais recente (ordenação estável)
+            ordered = sorted(candidates | self._unindexed, reverse=True)
+            ordered.sort(key=shared.__getitem__, reverse=True)
+        ordered = ordered[:max_candidates]
+
+        total_chars = sum(len(term) for term in terms) or 1
+        oldest = next(iter(self._key_by_doc))
+        span = max(1, self._next_doc - 1 - oldest)
+        # Distância por palavra, em cache: palavras se repetem entre itens
+        fuzzy_terms: List[Tuple[str, int, Dict[str, int], Dict[str, Optional[int]]]] = [
+            (term, max_typos(term), _pattern_bits(term), {}) for term in terms
+        ]
+        scored: List[Tuple[float, int]] = []
+        for doc in ordered:
+            text = self._text_by_doc[doc]
+            errors = 0
+            for term, allowed, peq, cache in fuzzy_terms:
+                if term in text:
+                    continue
+                distance = None
+                if allowed and doc not in self._unindexed:
+                    distance = _closest_word(text, term, allowed, peq, cache)
+                if distance is None:
+                    break
+                errors += distance
+            else:
+                score = 1.0 - errors / total_chars
+                score += FUZZY_RECENCY_WEIGHT * (doc - oldest) / span
+                if frequency is not None:
+                    uses = frequency(self._key_by_doc[doc])
+                    score += FUZZY_FREQUENCY_WEIGHT * (1.0 - 1.0 / (1 + uses))
+                scored.append((score, doc))
+
+        scored.sort(reverse=True)
+        if limit is not None:
+            scored = scored[:limit]
+        return [(self._key_by_doc[doc], score) for score, doc in scored]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Busca itens que contêm todos os termos da consulta
+
+        Args:
+            query: Termos separados por espaço (sem diferenciar maiúsculas nem acentos)
+            limit: Número máximo de resultados (None = todos)
+
+        Returns:
+            Chaves dos itens, do mais recente para o mais antigo
+        """
+        terms = split_terms(query)
+        results: List[Hashable] = []
+        for doc in self._ordered_docs(self._postings_for(terms)):
+            if terms:
+                text = self._text_by_doc[doc]
+                if not all(term in text for term in terms):
+                    continue
+            results.append(self._key_by_doc[doc])
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+class IncrementalSearch:
+    """
+    Busca que reaproveita o resultado da consulta anterior
+
+    Se a nova consulta refina a anterior (`refines`) e o histórico não mudou
+    (`version`), só os itens do resultado anterior são verificados, pelo texto
+    normalizado já calculado (`search_text_of`); a cada caractere digitado o
+    conjunto fica menor. Apagar ou editar a consulta, qualquer alteração no
+    histórico ou um resultado anterior truncado em `limit` volta à busca
+    completa.
+
+    Pensada para uma única thread de busca; `invalidate` pode ser chamado de
+    qualquer thread.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[str], List[Any]],
+        version: Optional[Callable[[], Hashable]] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Inicializa a busca
+
+        Args:
+            search: Busca completa: (consulta) -> itens do mais recente ao
+                mais antigo, no máximo `limit`
+            version: Versão do histórico (muda a cada inclusão/remoção); sem
+                ela, o resultado anterior vale até `invalidate`
+            limit: Limite de resultados de `search` (None = sem limite); um
+                resultado com `limit` itens pode ter deixado itens de fora e
+                não é refinado
+        """
+        self._search = search
+        self._version = version
+        self._limit = limit
+        self._terms: Optional[List[str]] = None
+        self._results: List[Any] = []
+        self._results_version: Hashable = None
+        self._invalidated = False
+        # Última busca reaproveitou o resultado anterior (diagnóstico/testes)
+        self.last_refined = False
+
+    def invalidate(self) -> None:
+        """Força a próxima consulta a buscar no histórico inteiro"""
+        self._invalidated = True
+
+    def search(self, query: str) -> List[Any]:
+        terms = split_terms(query)
+        version = self._version() if self._version is not None else None
+        previous = self._terms
+        if self._invalidated:
+            self._invalidated = False
+            previous = None
+
+        # Consulta vazia anterior = histórico inteiro: o índice é mais barato
+        self.last_refined = bool(
+            previous
+            and version == self._results_version
+            and refines(previous, terms)
+            and (self._limit is None or len(self._results) < self._limit)
+        )
+        if self.last_refined:
+            if terms != previous:
+                self._results = [
+                    item
+                    for item in self._results
+                    if all(t in search_text_of(item) for t in terms)
+                ]
+        else:
+            self._results = list(self._search(query))
+        self._terms = terms
+        self._results_version = version
+        return list(self._results)
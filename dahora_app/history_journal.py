@@ -0,0 +1,82 @@
+"""
+Journal append-only do histórico do clipboard
+
+Cada alteração do histórico vira uma linha JSON anexada ao journal, em vez de
+reescrever o arquivo inteiro. O ClipboardManager compacta o journal
+periodicamente gravando um snapshot completo e truncando este arquivo.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List
+
+
+class HistoryJournal:
+    """Arquivo JSONL com um registro por alteração do histórico"""
+
+    def __init__(self, path: str):
+        """
+        Inicializa o journal
+
+        Args:
+            path: Caminho do arquivo de journal
+        """
+        self.path = path
+        self.record_count = 0
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Anexa registros ao final do journal
+
+        Args:
+            records: Registros serializáveis em JSON
+        """
+        if not records:
+            return
+        data = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+        self.record_count += len(records)
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Lê todos os registros válidos do journal
+
+        Uma linha final truncada (queda durante a escrita) é ignorada.
+
+        Returns:
+            Lista de registros na ordem em que foram gravados
+        """
+        records: List[Dict[str, Any]] = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(
+                            f"Journal do histórico: linha {line_no} inválida ignorada"
+                        )
+                        continue
+                    if isinstance(record, dict):
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        self.record_count = len(records)
+        return records
+
+    def reset(self) -> None:
+        """Remove o journal (após compactação em snapshot)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.record_count = 0
@@ -0,0 +1,446 @@
+"""
+Armazenamento do histórico em SQLite (opcional)
+
+Motor alternativo ao JSON criptografado: cada item é uma linha de uma tabela
+SQLite em modo WAL, com índice FTS5 (tokenizer trigram) sobre o texto. Inserções
+e remoções são O(log n) e a busca por substring consulta o índice em vez de
+percorrer o histórico em Python.
+
+O índice cobre a coluna `search_text` (texto normalizado por `normalize_text`,
+gravado junto com o item), para a busca não diferenciar maiúsculas nem acentos.
+
+O banco pode guardar muito mais itens que a memória: `trim` corta os mais
+antigos pelo limite configurado, `remove_expired` apaga os vencidos pela coluna
+`expires_at` e `search` pagina os resultados com `limit`/`offset`.
+
+Atenção: o texto fica em claro no banco (o índice de busca precisa dele), por
+isso este motor só é usado quando escolhido explicitamente nas configurações.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from dahora_app.history_index import normalize_text, split_terms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL DEFAULT '',
+    app TEXT NOT NULL DEFAULT '',
+    text_hash TEXT NOT NULL UNIQUE,
+    blob TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0,
+    search_text TEXT NOT NULL DEFAULT '',
+    expires_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Criados depois da migração de colunas (bancos antigos não têm `expires_at`)
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries(expires_at)
+    WHERE expires_at > 0;
+CREATE INDEX IF NOT EXISTS entries_blob ON entries(blob) WHERE blob != '';
+"""
+
+# Colunas adicionadas depois da primeira versão do schema
+_MIGRATED_COLUMNS = {
+    "blob": "TEXT NOT NULL DEFAULT ''",
+    "size": "INTEGER NOT NULL DEFAULT 0",
+    "search_text": "TEXT NOT NULL DEFAULT ''",
+    "expires_at": "REAL NOT NULL DEFAULT 0",
+}
+
+_FTS_TABLE = "entries_search_fts"
+
+# A primeira versão indexava `text` em `entries_fts`; é substituída pelo
+# índice sobre o texto normalizado
+_FTS_SCHEMA = """
+DROP TRIGGER IF EXISTS entries_ai;
+DROP TRIGGER IF EXISTS entries_ad;
+DROP TABLE IF EXISTS entries_fts;
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_search_fts USING fts5(
+    search_text, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_search_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_search_fts(rowid, search_text)
+    VALUES (new.id, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_search_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_search_fts(entries_search_fts, rowid, search_text)
+    VALUES ('delete', old.id, old.search_text);
+END;
+"""
+
+_INSERT = (
+    "INSERT OR IGNORE INTO entries(text, timestamp, app, text_hash, blob, size, "
+    "search_text, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_COLUMNS = "text, timestamp, app, blob, size"
+
+# Termos menores que um trigram não usam o índice FTS
+_MIN_FTS_TERM = 3
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SqliteHistoryStore:
+    """Histórico persistido em SQLite com índice FTS5"""
+
+    def __init__(self, path: str):
+        """
+        Inicializa o store (a conexão é aberta em `open`)
+
+        Args:
+            path: Caminho do arquivo .db
+        """
+        self.path = path
+        self.fts_enabled = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Linhas da tabela, mantido a cada escrita (COUNT(*) percorre a tabela)
+        self._rows = 0
+
+    def open(self) -> None:
+        """Abre a conexão e cria o schema se necessário"""
+        if self._conn is not None:
+            return
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        for column, decl in _MIGRATED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {decl}")
+        if "search_text" not in existing:
+            # Bancos anteriores: calcula o texto normalizado das linhas existentes
+            rows = conn.execute("SELECT id, text FROM entries").fetchall()
+            conn.executemany(
+                "UPDATE entries SET search_text = ? WHERE id = ?",
+                [(normalize_text(text), rowid) for rowid, text in rows],
+            )
+        conn.executescript(_INDEXES)
+        try:
+            created = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (_FTS_TABLE,)
+            ).fetchone()
+            conn.executescript(_FTS_SCHEMA)
+            if created:
+                conn.execute(
+                    f"INSERT INTO {_FTS_TABLE}({_FTS_TABLE}) VALUES ('rebuild')"
+                )
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite sem FTS5/trigram (< 3.34): busca cai para LIKE
+            logging.warning(f"FTS5 indisponível no SQLite, usando LIKE: {e}")
+            self.fts_enabled = False
+        conn.commit()
+        self._rows = int(conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                finally:
+                    self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("SqliteHistoryStore não foi aberto")
+        return self._conn
+
+    @staticmethod
+    def _row_to_item(row: Tuple) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"text": row[0], "timestamp": row[1], "app": row[2]}
+        if row[3]:
+            # Texto completo em blob; `text` guarda só a prévia
+            item["blob"] = row[3]
+            item["size"] = row[4]
+        return item
+
+    @staticmethod
+    def _item_to_row(item: Any, text_hash: str, expires_at: float = 0.0) -> Tuple:
+        # HistoryEntry já traz o texto normalizado calculado na inclusão
+        search_text = getattr(item, "search_key", None)
+        # HistoryEntry só expõe blob/size em to_dict
+        to_dict = getattr(item, "to_dict", None)
+        if to_dict is not None:
+            item = to_dict()
+        if search_text is None:
+            search_text = normalize_text(item["text"])
+        return (
+            item["text"],
+            item.get("timestamp", ""),
+            item.get("app", ""),
+            text_hash,
+            item.get("blob") or "",
+            item.get("size") or 0,
+            search_text,
+            expires_at,
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            self._db()
+            return self._rows
+
+    def add(self, item: Any, text_hash: str, expires_at: float = 0.0) -> None:
+        """Insere um item (um hash já existente vai para o topo)"""
+        self.add_many([(item, text_hash)], lambda _: expires_at)
+
+    def add_many(
+        self,
+        rows: Iterable[Tuple[Any, str]],
+        expires_at: Optional[Callable[[Any], float]] = None,
+    ) -> None:
+        """
+        Insere vários itens numa única transação
+
+        Um hash que já existe no banco é removido e inserido de novo, no topo
+        (cópia repetida de um item antigo que não está mais em memória).
+
+        Args:
+            rows: Pares (item, hash do texto), do mais antigo para o mais recente
+            expires_at: Prazo de expiração (epoch; 0 = não expira) de cada item
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            db = self._db()
+            # rowcount não conta as linhas alteradas pelos triggers do FTS
+            deleted = db.executemany(
+                "DELETE FROM entries WHERE text_hash = ?", ((h,) for _, h in rows)
+            ).rowcount
+            inserted = db.executemany(
+                _INSERT,
+                (
+                    self._item_to_row(i, h, expires_at(i) if expires_at else 0.0)
+                    for i, h in rows
+                ),
+            ).rowcount
+            db.commit()
+            self._rows += inserted - deleted
+
+    def remove_hashes(self, text_hashes: Iterable[str]) -> int:
+        """Remove itens pelo hash do texto; retorna o número de linhas removidas"""
+        hashes = [(h,) for h in text_hashes]
+        if not hashes:
+            return 0
+        with self._lock:
+            db = self._db()
+            removed = db.executemany(
+                "DELETE FROM entries WHERE text_hash = ?", hashes
+            ).rowcount
+            db.commit()
+            self._rows -= removed
+            return removed
+
+    def remove_blobs(self, blob_ids: Iterable[str]) -> int:
+        """Remove itens pelo id do blob; retorna o número de linhas removidas"""
+        ids = [(b,) for b in blob_ids]
+        if not ids:
+            return 0
+        with self._lock:
+            db = self._db()
+            removed = db.executemany("DELETE FROM entries WHERE blob = ?", ids).rowcount
+            db.commit()
+            self._rows -= removed
+            return removed
+
+    def trim(self, max_rows: int) -> List[str]:
+        """
+        Mantém só os `max_rows` itens mais recentes
+
+        Returns:
+            Ids dos blobs referenciados pelas linhas removidas
+        """
+        with self._lock:
+            db = self._db()
+            excess = self._rows - max(0, int(max_rows))
+            if excess <= 0:
+                return []
+            # Percorre só as linhas excedentes, a partir da mais antiga
+            row = db.execute(
+                "SELECT id FROM entries ORDER BY id LIMIT 1 OFFSET ?", (excess - 1,)
+            ).fetchone()
+            if row is None:
+                return []
+            blobs = [
+                b
+                for (b,) in db.execute(
+                    "SELECT blob FROM entries WHERE id <= ? AND blob != ''", row
+                )
+            ]
+            removed = db.execute("DELETE FROM entries WHERE id <= ?", row).rowcount
+            db.commit()
+            self._rows -= removed
+        return blobs
+
+    def remove_expired(self, now: float) -> List[Dict[str, Any]]:
+        """
+        Remove os itens cujo prazo (`expires_at`) venceu
+
+        Returns:
+            Itens removidos, do mais antigo para o mais recente
+        """
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                f"SELECT id, {_COLUMNS} FROM entries "
+                "WHERE expires_at > 0 AND expires_at <= ? ORDER BY id",
+                (float(now),),
+            ).fetchall()
+            if not rows:
+                return []
+            db.executemany(
+                "DELETE FROM entries WHERE id = ?", ((r[0],) for r in rows)
+            )
+            db.commit()
+            self._rows -= len(rows)
+        return [self._row_to_item(r[1:]) for r in rows]
+
+    def recompute_expiry(
+        self, expires_at: Callable[[Dict[str, Any]], float], signature: str
+    ) -> None:
+        """
+        Recalcula o prazo de todos os itens (a política de expiração mudou)
+
+        Args:
+            expires_at: Prazo (epoch; 0 = não expira) de um item
+            signature: Identifica a política; gravada em `meta` (ver
+                `get_meta("expiry_policy")`) na mesma transação
+        """
+
+        def _deadline(text, timestamp, app, blob, size):
+            try:
+                item = self._row_to_item((text, timestamp, app, blob, size))
+                return float(expires_at(item))
+            except Exception:
+                return 0.0
+
+        with self._lock:
+            db = self._db()
+            db.create_function("dahora_expires_at", 5, _deadline)
+            try:
+                db.execute(
+                    f"UPDATE entries SET expires_at = dahora_expires_at({_COLUMNS})"
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                    ("expiry_policy", signature),
+                )
+                db.commit()
+            finally:
+                db.create_function("dahora_expires_at", 5, None)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def blob_ids(self) -> Set[str]:
+        """Ids dos blobs referenciados por algum item do banco"""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT blob FROM entries WHERE blob != ''"
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM entries")
+            db.commit()
+            self._rows = 0
+
+    def load_recent(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Retorna os itens mais recentes
+
+        Returns:
+            Lista do mais antigo para o mais recente (mesma ordem do histórico)
+        """
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {_COLUMNS} FROM entries ORDER BY id DESC LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [self._row_to_item(r) for r in reversed(rows)]
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        exclude_hashes: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca itens que contêm todos os termos de `query` (sem diferenciar
+        maiúsculas nem acentos)
+
+        Args:
+            query: Termos separados por espaço (vazio retorna todos os itens)
+            limit: Número máximo de resultados (None = todos)
+            offset: Resultados a pular (paginação)
+            exclude_hashes: Hashes de texto que não entram no resultado
+
+        Returns:
+            Itens do mais recente para o mais antigo
+        """
+        terms = split_terms(query)
+        fts_terms = [t for t in terms if self.fts_enabled and len(t) >= _MIN_FTS_TERM]
+        like_terms = [t for t in terms if t not in fts_terms]
+
+        columns = ", ".join(f"entries.{c}" for c in _COLUMNS.split(", "))
+        clauses: List[str] = []
+        params: List = []
+        if fts_terms:
+            # Percorre o índice do mais recente para o mais antigo: com LIMIT, um
+            # termo presente em quase todo o histórico para nos primeiros itens
+            sql = (
+                f"SELECT {columns} FROM {_FTS_TABLE} "
+                f"JOIN entries ON entries.id = {_FTS_TABLE}.rowid"
+            )
+            clauses.append(f"{_FTS_TABLE} MATCH ?")
+            params.append(" AND ".join(_fts_phrase(t) for t in fts_terms))
+            order = f"{_FTS_TABLE}.rowid"
+        else:
+            sql = f"SELECT {columns} FROM entries"
+            order = "entries.id"
+        for term in like_terms:
+            clauses.append("entries.search_text LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(term))
+        excluded = list(exclude_hashes)
+        if excluded:
+            # Um único parâmetro: a lista pode passar do limite de variáveis
+            clauses.append("entries.text_hash NOT IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(excluded))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order} DESC"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else int(limit), max(0, int(offset))])
+        with self._lock:
+            rows = self._db().execute(sql, params).fetchall()
+        return [self._row_to_item(r) for r in rows]
@@ -0,0 +1,127 @@
+"""
+Fila de ingestão do histórico do clipboard
+
+Rajadas de cópias (scripts, Ctrl+C repetido) chamavam `add_to_history` uma vez
+por texto: cada chamada pegava o lock do histórico, atualizava os índices,
+registrava um log INFO e agendava um save. `IngestQueue` acumula os textos que
+chegam numa janela de poucos milissegundos e os entrega de uma vez a
+`ClipboardManager.add_many`, que faz tudo isso uma única vez por lote.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+DEFAULT_COALESCE_WINDOW_S = 0.005
+DEFAULT_MAX_BATCH = 256
+
+
+class IngestQueue:
+    """Fila com thread própria que entrega textos em lotes"""
+
+    def __init__(
+        self,
+        sink: Callable[[List[str]], Any],
+        window_s: float = DEFAULT_COALESCE_WINDOW_S,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        """
+        Inicializa a fila (a thread só é criada no primeiro `put`)
+
+        Args:
+            sink: Função que recebe cada lote (ex.: `ClipboardManager.add_many`)
+            window_s: Tempo de espera por mais textos após o primeiro do lote
+            max_batch: Tamanho máximo de um lote
+        """
+        self._sink = sink
+        self.window_s = max(0.0, float(window_s))
+        self.max_batch = max(1, int(max_batch))
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        # Textos entregues ao sink (inclui o lote em andamento)
+        self._submitted = 0
+        self._delivered = 0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, text: str) -> bool:
+        """
+        Enfileira um texto (não bloqueia)
+
+        Returns:
+            False se a fila já foi encerrada
+        """
+        with self._cond:
+            if self._stopped:
+                return False
+            self._pending.append(text)
+            self._submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="HistoryIngest", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda a entrega de tudo que foi enfileirado até agora
+
+        Returns:
+            True se tudo foi entregue dentro do timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            self._cond.notify_all()
+            while self._delivered < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Entrega o que estiver pendente e encerra a thread"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _next_batch(self) -> Optional[List[str]]:
+        with self._cond:
+            while not self._pending:
+                if self._stopped:
+                    return None
+                self._cond.wait()
+            # Janela de coalescência: espera mais textos até o lote encher
+            deadline = time.monotonic() + self.window_s
+            while len(self._pending) < self.max_batch and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._sink(batch)
+            except Exception as e:
+                logging.warning(f"Falha ao ingerir lote do clipboard: {e}")
+            with self._cond:
+                self._delivered += len(batch)
+                self._cond.notify_all()
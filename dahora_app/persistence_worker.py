@@ -0,0 +1,180 @@
+"""
+Thread de persistência do histórico
+
+Cada janela de debounce criava uma `threading.Timer` nova. `PersistenceWorker`
+é uma thread única e duradoura que recebe avisos de "histórico sujo" e os
+agrupa: grava no máximo `max_latency_s` depois do primeiro aviso pendente, ou
+antes, se `max_pending` avisos se acumularem. Também é o ponto único onde o
+custo das gravações é medido (`writes`, `total_write_s`, `last_write_s`).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_MAX_LATENCY_S = 0.75
+DEFAULT_MAX_PENDING = 64
+
+
+class PersistenceWorker:
+    """Thread que agrupa avisos de alteração e chama a função de gravação"""
+
+    def __init__(
+        self,
+        write: Callable[[], None],
+        max_latency_s: float = DEFAULT_MAX_LATENCY_S,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        name: str = "HistoryWriter",
+    ):
+        """
+        Inicializa o worker (a thread só é criada no primeiro aviso)
+
+        Args:
+            write: Grava tudo que estiver pendente (chamada na thread do worker)
+            max_latency_s: Atraso máximo entre o primeiro aviso e a gravação
+            max_pending: Avisos acumulados que disparam a gravação imediata
+            name: Nome da thread
+        """
+        self._write = write
+        self.name = name
+        self._cond = threading.Condition()
+        self.max_latency_s = DEFAULT_MAX_LATENCY_S
+        self.max_pending = DEFAULT_MAX_PENDING
+        self.configure(max_latency_s, max_pending)
+        # Avisos recebidos e avisos já cobertos por uma gravação
+        self._requested = 0
+        self._written = 0
+        self._dirty_since: Optional[float] = None
+        self._flush_requested = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0
+        self.total_write_s = 0.0
+        self.last_write_s = 0.0
+
+    def configure(self, max_latency_s: float, max_pending: int) -> None:
+        """Altera os limites (vale a partir do próximo aviso)"""
+        with self._cond:
+            self.max_latency_s = max(0.0, float(max_latency_s))
+            self.max_pending = max(1, int(max_pending))
+            self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        """Avisos ainda não cobertos por uma gravação"""
+        with self._cond:
+            return self._requested - self._written
+
+    def notify(self) -> None:
+        """Marca o histórico como alterado (não bloqueia)"""
+        with self._cond:
+            if self._stopped:
+                return
+            if self._requested == self._written:
+                self._dirty_since = time.monotonic()
+            self._requested += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def discard(self) -> None:
+        """
+        Dá os avisos pendentes por gravados
+
+        Para quem vai gravar de forma síncrona logo em seguida (sob o mesmo lock
+        que protege os avisos), evitando uma gravação repetida pelo worker.
+        """
+        with self._cond:
+            self._written = self._requested
+            self._dirty_since = None
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Grava agora o que estiver pendente e aguarda
+
+        Returns:
+            True se tudo que foi avisado até aqui foi gravado dentro do timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._requested
+            if self._written >= target:
+                return True
+            if self._thread is None or not self._thread.is_alive():
+                return False
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._written < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        Grava o que estiver pendente e encerra a thread
+
+        Returns:
+            True se a thread terminou dentro do timeout
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _wait_for_batch(self) -> Optional[int]:
+        """Bloqueia até a próxima gravação; retorna o aviso alvo ou None para encerrar"""
+        with self._cond:
+            while True:
+                pending = self._requested - self._written
+                if pending > 0:
+                    if self._stopped or self._flush_requested:
+                        break
+                    if pending >= self.max_pending:
+                        break
+                    since = self._dirty_since or time.monotonic()
+                    remaining = since + self.max_latency_s - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                elif self._stopped:
+                    return None
+                else:
+                    self._cond.wait()
+            self._flush_requested = False
+            self._dirty_since = None
+            return self._requested
+
+    def _run(self) -> None:
+        while True:
+            target = self._wait_for_batch()
+            if target is None:
+                return
+            start = time.perf_counter()
+            try:
+                self._write()
+            except Exception as e:
+                logging.warning(f"Falha na gravação em segundo plano ({self.name}): {e}")
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._written = max(self._written, target)
+                if self._requested > self._written:
+                    # Avisos que chegaram durante a gravação abrem nova janela
+                    self._dirty_since = time.monotonic()
+                self.writes += 1
+                self.last_write_s = elapsed
+                self.total_write_s += elapsed
+                self._cond.notify_all()
+            logging.debug(
+                f"[{self.name}] gravação {self.writes}: {elapsed * 1000:.1f} ms"
+            )
@@ -0,0 +1,76 @@
+"""
+Curva de polling do monitor de clipboard
+
+O monitor tinha dois estados: o intervalo configurado enquanto ativo e
+`max(5.0, intervalo)` depois do limiar de ociosidade. `PollingPolicy` troca
+isso por uma curva contínua: logo após cada mudança (ou aviso de Ctrl+C) o
+monitor entra num burst curto de polling rápido, volta ao intervalo ativo e,
+à medida que a ociosidade cresce, o intervalo se aproxima exponencialmente de
+um teto. Um jitter proporcional evita que o despertar fique sincronizado com
+outros timers do sistema.
+"""
+
+import random
+from typing import Callable, Optional
+
+DEFAULT_BURST_INTERVAL_S = 0.25
+DEFAULT_BURST_WINDOW_S = 2.0
+DEFAULT_IDLE_CEILING_S = 10.0
+DEFAULT_JITTER = 0.1
+
+
+class PollingPolicy:
+    """Intervalo entre ticks do monitor em função do tempo ocioso"""
+
+    def __init__(
+        self,
+        active_interval_s: float,
+        half_life_s: float,
+        burst_interval_s: float = DEFAULT_BURST_INTERVAL_S,
+        burst_window_s: float = DEFAULT_BURST_WINDOW_S,
+        idle_ceiling_s: float = DEFAULT_IDLE_CEILING_S,
+        jitter: float = DEFAULT_JITTER,
+        rng: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Inicializa a política (valores já validados pelo chamador)
+
+        Args:
+            active_interval_s: Intervalo logo após o burst
+            half_life_s: Tempo ocioso para o intervalo percorrer metade do
+                caminho entre o ativo e o teto
+            burst_interval_s: Intervalo durante o burst (limitado ao ativo)
+            burst_window_s: Duração do burst após cada mudança
+            idle_ceiling_s: Intervalo máximo com o clipboard ocioso (no mínimo
+                o ativo)
+            jitter: Variação relativa aleatória (0.1 = ±10%)
+            rng: Gerador uniforme em [0, 1) (padrão: `random.random`)
+        """
+        self.active_interval_s = float(active_interval_s)
+        self.half_life_s = max(0.001, float(half_life_s))
+        self.burst_interval_s = min(float(burst_interval_s), self.active_interval_s)
+        self.burst_window_s = max(0.0, float(burst_window_s))
+        self.idle_ceiling_s = max(float(idle_ceiling_s), self.active_interval_s)
+        self.jitter = min(max(0.0, float(jitter)), 0.5)
+        self._rng = rng or random.random
+
+    def base_interval(self, idle_s: float) -> float:
+        """Intervalo sem jitter para `idle_s` segundos desde a última mudança"""
+        if idle_s < self.burst_window_s:
+            return self.burst_interval_s
+        decay = 0.5 ** ((idle_s - self.burst_window_s) / self.half_life_s)
+        return self.idle_ceiling_s - (self.idle_ceiling_s - self.active_interval_s) * decay
+
+    def interval(self, idle_s: float) -> float:
+        """Intervalo até o próximo tick, com jitter, dentro de [burst, teto]"""
+        base = self.base_interval(idle_s)
+        if self.jitter:
+            base *= 1.0 + self.jitter * (2.0 * self._rng() - 1.0)
+        return min(max(base, self.burst_interval_s), self.idle_ceiling_s)
+
+    def __repr__(self) -> str:
+        return (
+            f"PollingPolicy(active={self.active_interval_s}, half_life={self.half_life_s}, "
+            f"burst={self.burst_interval_s}x{self.burst_window_s}s, "
+            f"ceiling={self.idle_ceiling_s}, jitter={self.jitter})"
+        )
@@ -3,9 +3,11 @@ Schemas de validação com Pydantic para Dahora App
 Define estruturas de dados seguras e validadas
 """
 
+import logging
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 import re
+from dahora_app.constants import MAX_HISTORY_ITEMS_JSON, MAX_HISTORY_ITEMS_SQLITE
 from dahora_app.hotkey_validator import HotkeyValidator
 
 
@@ -59,6 +61,35 @@ class CustomShortcutSchema(BaseModel):
         return v
 
 
+class ExpiryRuleSchema(BaseModel):
+    """Schema para uma regra de expiração do histórico"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    pattern: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="Expressão regular testada contra o texto copiado",
+    )
+    ttl_minutes: int = Field(
+        ...,
+        ge=0,
+        le=525600,
+        description="Idade máxima (min) dos itens que casam (0 = nunca expiram)",
+    )
+
+    @field_validator("pattern")
+    @classmethod
+    def validate_pattern(cls, v: str) -> str:
+        """Valida que a expressão regular compila"""
+        try:
+            re.compile(v)
+        except re.error as e:
+            raise ValueError(f"Expressão regular inválida: {e}")
+        return v
+
+
 class SettingsSchema(BaseModel):
     """Schema para configurações do aplicativo"""
 
@@ -85,7 +116,10 @@ class SettingsSchema(BaseModel):
 
     # Limites e intervalos
     max_history_items: int = Field(
-        default=100, ge=10, le=1000, description="Máximo de itens no histórico"
+        default=100,
+        ge=10,
+        le=MAX_HISTORY_ITEMS_SQLITE,
+        description="Máximo de itens no histórico (até 1000 com o motor json)",
     )
     clipboard_monitor_interval: float = Field(
         default=3.0,
@@ -118,6 +152,57 @@ class SettingsSchema(BaseModel):
     tray_menu_cache_window_ms: int = Field(
         default=200, ge=0, le=2000, description="Janela de cache do menu do tray (ms)"
     )
+    history_eviction_policy: str = Field(
+        default="fifo",
+        pattern=r"^(fifo|lru|lfu)$",
+        description="Descarte com o histórico cheio: fifo, lru (cópia repetida volta ao topo) ou lfu",
+    )
+    history_entry_ttl_minutes: int = Field(
+        default=0,
+        ge=0,
+        le=525600,
+        description="Idade máxima (min) dos itens do histórico; 0 = não expiram",
+    )
+    history_expiry_rules: List[ExpiryRuleSchema] = Field(
+        default_factory=list,
+        max_length=32,
+        description="Regras de expiração por padrão (a primeira que casar vale)",
+    )
+    history_max_total_kb: int = Field(
+        default=65536,
+        ge=1024,
+        le=1048576,
+        description="Total de texto (KB) mantido no histórico; os itens mais antigos são descartados",
+    )
+    history_max_entry_kb: int = Field(
+        default=16384,
+        ge=4,
+        le=1048576,
+        description="Tamanho máximo (KB de texto) de um item; textos maiores não entram no histórico",
+    )
+    history_flush_latency_ms: int = Field(
+        default=750,
+        ge=50,
+        le=10000,
+        description="Atraso máximo (ms) entre uma alteração do histórico e sua gravação",
+    )
+    history_flush_max_pending: int = Field(
+        default=64,
+        ge=1,
+        le=4096,
+        description="Alterações acumuladas que disparam a gravação imediata do histórico",
+    )
+    history_inline_limit_kb: int = Field(
+        default=256,
+        ge=4,
+        le=65536,
+        description="Tamanho (KB de texto) acima do qual o item do histórico vai para um blob",
+    )
+    history_storage_engine: str = Field(
+        default="json",
+        pattern=r"^(json|sqlite)$",
+        description="Motor do histórico: json (criptografado) ou sqlite (índice FTS5)",
+    )
 
     # Custom shortcuts
     custom_shortcuts: List[CustomShortcutSchema] = Field(
@@ -167,6 +252,25 @@ class SettingsSchema(BaseModel):
             raise ValueError("Brackets de abertura e fechamento devem ser diferentes")
         return self
 
+    @model_validator(mode="after")
+    def validate_max_history_for_engine(self) -> "SettingsSchema":
+        """
+        Limita max_history_items no motor json (mantém tudo em memória)
+
+        Um valor acima do limite (ex.: config salva no sqlite e depois trocada
+        para json) é reduzido em vez de invalidar as configurações inteiras.
+        """
+        if (
+            self.history_storage_engine == "json"
+            and self.max_history_items > MAX_HISTORY_ITEMS_JSON
+        ):
+            logging.info(
+                f"max_history_items {self.max_history_items} reduzido para "
+                f"{MAX_HISTORY_ITEMS_JSON} (motor json)"
+            )
+            self.max_history_items = MAX_HISTORY_ITEMS_JSON
+        return self
+
     @model_validator(mode="after")
     def validate_custom_shortcut_ids(self) -> "SettingsSchema":
         """Valida que IDs dos shortcuts são únicos e consistentes"""
@@ -0,0 +1,121 @@
+"""
+Busca em segundo plano com descarte de consultas superadas
+
+A janela de busca filtrava o histórico no thread do Tk a cada tecla: com
+históricos grandes a digitação travava. `SearchWorker` executa as consultas
+numa thread própria. Cada consulta recebe uma geração; só a mais recente fica
+na fila (as anteriores ainda não iniciadas são descartadas) e o resultado de
+uma consulta que foi superada durante a execução não é entregue.
+
+A entrega acontece na thread do worker: a UI deve repassá-la ao seu loop
+(ex.: `window.after(0, ...)`) e conferir `is_current(generation)` ao aplicar.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+
+class SearchWorker:
+    """Thread única que executa só a consulta mais recente"""
+
+    def __init__(
+        self,
+        search: Callable[[str], Any],
+        deliver: Callable[[int, str, Any], None],
+        name: str = "HistorySearch",
+    ):
+        """
+        Inicializa o worker (a thread só é criada no primeiro `submit`)
+
+        Args:
+            search: Executa a consulta e retorna o resultado (na thread do worker)
+            deliver: Recebe (geração, consulta, resultado) da consulta mais
+                recente, na thread do worker
+            name: Nome da thread
+        """
+        self._search = search
+        self._deliver = deliver
+        self._name = name
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._job: Optional[Tuple[int, str]] = None
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def generation(self) -> int:
+        """Geração da consulta mais recente"""
+        with self._cond:
+            return self._generation
+
+    def is_current(self, generation: int) -> bool:
+        """Se `generation` ainda é a consulta mais recente (não superada nem cancelada)"""
+        with self._cond:
+            return generation == self._generation
+
+    def submit(self, query: str) -> int:
+        """
+        Agenda uma consulta, substituindo a que ainda não começou
+
+        Returns:
+            Geração atribuída à consulta (0 se o worker foi encerrado)
+        """
+        with self._cond:
+            if self._stopped:
+                return 0
+            self._generation += 1
+            self._job = (self._generation, query)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+            return self._generation
+
+    def cancel(self) -> None:
+        """Descarta a consulta pendente e o resultado da que está em execução"""
+        with self._cond:
+            self._generation += 1
+            self._job = None
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Encerra a thread (a consulta em execução termina, mas não é entregue)"""
+        with self._cond:
+            self._stopped = True
+            self._generation += 1
+            self._job = None
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _next_job(self) -> Optional[Tuple[int, str]]:
+        with self._cond:
+            while self._job is None:
+                if self._stopped:
+                    return None
+                self._cond.wait()
+            job = self._job
+            self._job = None
+            return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            generation, query = job
+            try:
+                result = self._search(query)
+            except Exception as e:
+                logging.warning(f"Falha na busca em segundo plano: {e}")
+                continue
+            # Superada durante a execução: a próxima consulta já está na fila
+            if not self.is_current(generation):
+                continue
+            try:
+                self._deliver(generation, query, result)
+            except Exception as e:
+                logging.warning(f"Falha ao entregar resultado da busca: {e}")
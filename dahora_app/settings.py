@@ -10,9 +10,14 @@ import shutil
 from datetime import datetime
 from threading import RLock
 from typing import Dict, Any, List, Optional, Tuple
-from dahora_app.constants import SETTINGS_FILE, RESERVED_HOTKEYS_BASE
+from dahora_app.constants import (
+    MAX_HISTORY_ITEMS_JSON,
+    MAX_HISTORY_ITEMS_SQLITE,
+    SETTINGS_FILE,
+    RESERVED_HOTKEYS_BASE,
+)
 from dahora_app.utils import atomic_write_json
-from dahora_app.schemas import SettingsSchema
+from dahora_app.schemas import ExpiryRuleSchema, SettingsSchema
 from pydantic import ValidationError
 
 
@@ -51,6 +56,16 @@ class SettingsManager:
         self.log_backup_count = 1
         self.ui_prewarm_delay_ms = 700
         self.tray_menu_cache_window_ms = 200
+        self.history_eviction_policy = "fifo"
+        self.history_entry_ttl_minutes = 0
+        # Regras de expiração por padrão: {"pattern": regex, "ttl_minutes": int}
+        self.history_expiry_rules: List[Dict[str, Any]] = []
+        self.history_max_total_kb = 65536
+        self.history_max_entry_kb = 16384
+        self.history_flush_latency_ms = 750
+        self.history_flush_max_pending = 64
+        self.history_inline_limit_kb = 256
+        self.history_storage_engine = "json"
 
         # Caracteres de delimitação configuráveis
         self.bracket_open = "["
@@ -108,6 +123,15 @@ class SettingsManager:
                 tray_menu_cache_window_ms=settings_dict.get(
                     "tray_menu_cache_window_ms", 200
                 ),
+                history_eviction_policy=settings_dict.get("history_eviction_policy", "fifo"),
+                history_entry_ttl_minutes=settings_dict.get("history_entry_ttl_minutes", 0),
+                history_expiry_rules=settings_dict.get("history_expiry_rules", []),
+                history_max_total_kb=settings_dict.get("history_max_total_kb", 65536),
+                history_max_entry_kb=settings_dict.get("history_max_entry_kb", 16384),
+                history_flush_latency_ms=settings_dict.get("history_flush_latency_ms", 750),
+                history_flush_max_pending=settings_dict.get("history_flush_max_pending", 64),
+                history_inline_limit_kb=settings_dict.get("history_inline_limit_kb", 256),
+                history_storage_engine=settings_dict.get("history_storage_engine", "json"),
                 custom_shortcuts=settings_dict.get("custom_shortcuts", []),
                 default_shortcut_id=settings_dict.get("default_shortcut_id", None),
             )
@@ -128,6 +152,17 @@ class SettingsManager:
                 "log_backup_count": schema.log_backup_count,
                 "ui_prewarm_delay_ms": schema.ui_prewarm_delay_ms,
                 "tray_menu_cache_window_ms": schema.tray_menu_cache_window_ms,
+                "history_eviction_policy": schema.history_eviction_policy,
+                "history_entry_ttl_minutes": schema.history_entry_ttl_minutes,
+                "history_expiry_rules": [
+                    r.model_dump() for r in schema.history_expiry_rules
+                ],
+                "history_max_total_kb": schema.history_max_total_kb,
+                "history_max_entry_kb": schema.history_max_entry_kb,
+                "history_flush_latency_ms": schema.history_flush_latency_ms,
+                "history_flush_max_pending": schema.history_flush_max_pending,
+                "history_inline_limit_kb": schema.history_inline_limit_kb,
+                "history_storage_engine": schema.history_storage_engine,
                 "bracket_open": schema.bracket_open,
                 "bracket_close": schema.bracket_close,
                 "custom_shortcuts": [s.model_dump() for s in schema.custom_shortcuts],
@@ -166,6 +201,15 @@ class SettingsManager:
                     tray_menu_cache_window_ms=settings_dict.get(
                         "tray_menu_cache_window_ms", 200
                     ),
+                    history_eviction_policy=settings_dict.get("history_eviction_policy", "fifo"),
+                    history_entry_ttl_minutes=settings_dict.get("history_entry_ttl_minutes", 0),
+                    history_expiry_rules=[],
+                    history_max_total_kb=settings_dict.get("history_max_total_kb", 65536),
+                    history_max_entry_kb=settings_dict.get("history_max_entry_kb", 16384),
+                    history_flush_latency_ms=settings_dict.get("history_flush_latency_ms", 750),
+                    history_flush_max_pending=settings_dict.get("history_flush_max_pending", 64),
+                    history_inline_limit_kb=settings_dict.get("history_inline_limit_kb", 256),
+                    history_storage_engine=settings_dict.get("history_storage_engine", "json"),
                     custom_shortcuts=[],
                     default_shortcut_id=None,
                 )
@@ -185,6 +229,15 @@ class SettingsManager:
                     "log_backup_count": schema.log_backup_count,
                     "ui_prewarm_delay_ms": schema.ui_prewarm_delay_ms,
                     "tray_menu_cache_window_ms": schema.tray_menu_cache_window_ms,
+                    "history_eviction_policy": schema.history_eviction_policy,
+                    "history_entry_ttl_minutes": schema.history_entry_ttl_minutes,
+                    "history_expiry_rules": [],
+                    "history_max_total_kb": schema.history_max_total_kb,
+                    "history_max_entry_kb": schema.history_max_entry_kb,
+                    "history_flush_latency_ms": schema.history_flush_latency_ms,
+                    "history_flush_max_pending": schema.history_flush_max_pending,
+                    "history_inline_limit_kb": schema.history_inline_limit_kb,
+                    "history_storage_engine": schema.history_storage_engine,
                     "bracket_open": schema.bracket_open,
                     "bracket_close": schema.bracket_close,
                     "custom_shortcuts": [],
@@ -201,6 +254,9 @@ class SettingsManager:
 
             validated["custom_shortcuts"] = validated_shortcuts
 
+            raw_rules = settings_dict.get("history_expiry_rules", [])
+            validated["history_expiry_rules"] = self._validate_expiry_rules(raw_rules)
+
             raw_default_shortcut_id = _parse_int(settings_dict.get("default_shortcut_id"))
             if raw_default_shortcut_id is not None:
                 ids = {
@@ -235,6 +291,15 @@ class SettingsManager:
             "log_backup_count": 1,
             "ui_prewarm_delay_ms": 700,
             "tray_menu_cache_window_ms": 200,
+            "history_eviction_policy": "fifo",
+            "history_entry_ttl_minutes": 0,
+            "history_expiry_rules": [],
+            "history_max_total_kb": 65536,
+            "history_max_entry_kb": 16384,
+            "history_flush_latency_ms": 750,
+            "history_flush_max_pending": 64,
+            "history_inline_limit_kb": 256,
+            "history_storage_engine": "json",
             "bracket_open": "[",
             "bracket_close": "]",
             "custom_shortcuts": [],
@@ -272,6 +337,15 @@ class SettingsManager:
                 self.tray_menu_cache_window_ms = validated.get(
                     "tray_menu_cache_window_ms", 200
                 )
+                self.history_eviction_policy = validated.get("history_eviction_policy", "fifo")
+                self.history_entry_ttl_minutes = validated.get("history_entry_ttl_minutes", 0)
+                self.history_expiry_rules = validated.get("history_expiry_rules", [])
+                self.history_max_total_kb = validated.get("history_max_total_kb", 65536)
+                self.history_max_entry_kb = validated.get("history_max_entry_kb", 16384)
+                self.history_flush_latency_ms = validated.get("history_flush_latency_ms", 750)
+                self.history_flush_max_pending = validated.get("history_flush_max_pending", 64)
+                self.history_inline_limit_kb = validated.get("history_inline_limit_kb", 256)
+                self.history_storage_engine = validated.get("history_storage_engine", "json")
                 self.bracket_open = validated.get("bracket_open", "[")
                 self.bracket_close = validated.get("bracket_close", "]")
                 self.custom_shortcuts = validated.get("custom_shortcuts", [])
@@ -357,6 +431,15 @@ class SettingsManager:
                     self.tray_menu_cache_window_ms = validated.get(
                         "tray_menu_cache_window_ms", 200
                     )
+                    self.history_eviction_policy = validated.get("history_eviction_policy", "fifo")
+                    self.history_entry_ttl_minutes = validated.get("history_entry_ttl_minutes", 0)
+                    self.history_expiry_rules = validated.get("history_expiry_rules", [])
+                    self.history_max_total_kb = validated.get("history_max_total_kb", 65536)
+                    self.history_max_entry_kb = validated.get("history_max_entry_kb", 16384)
+                    self.history_flush_latency_ms = validated.get("history_flush_latency_ms", 750)
+                    self.history_flush_max_pending = validated.get("history_flush_max_pending", 64)
+                    self.history_inline_limit_kb = validated.get("history_inline_limit_kb", 256)
+                    self.history_storage_engine = validated.get("history_storage_engine", "json")
                     self.bracket_open = validated.get("bracket_open", "[")
                     self.bracket_close = validated.get("bracket_close", "]")
                     self.custom_shortcuts = validated.get("custom_shortcuts", [])
@@ -399,6 +482,15 @@ class SettingsManager:
                         "log_backup_count": self.log_backup_count,
                         "ui_prewarm_delay_ms": self.ui_prewarm_delay_ms,
                         "tray_menu_cache_window_ms": self.tray_menu_cache_window_ms,
+                        "history_eviction_policy": self.history_eviction_policy,
+                        "history_entry_ttl_minutes": self.history_entry_ttl_minutes,
+                        "history_expiry_rules": self.history_expiry_rules,
+                        "history_max_total_kb": self.history_max_total_kb,
+                        "history_max_entry_kb": self.history_max_entry_kb,
+                        "history_flush_latency_ms": self.history_flush_latency_ms,
+                        "history_flush_max_pending": self.history_flush_max_pending,
+                        "history_inline_limit_kb": self.history_inline_limit_kb,
+                        "history_storage_engine": self.history_storage_engine,
                         "custom_shortcuts": self.custom_shortcuts,
                         "default_shortcut_id": self.default_shortcut_id,
                     },
@@ -434,6 +526,15 @@ class SettingsManager:
             "log_backup_count": self.log_backup_count,
             "ui_prewarm_delay_ms": self.ui_prewarm_delay_ms,
             "tray_menu_cache_window_ms": self.tray_menu_cache_window_ms,
+            "history_eviction_policy": self.history_eviction_policy,
+            "history_entry_ttl_minutes": self.history_entry_ttl_minutes,
+            "history_expiry_rules": self.history_expiry_rules,
+            "history_max_total_kb": self.history_max_total_kb,
+            "history_max_entry_kb": self.history_max_entry_kb,
+            "history_flush_latency_ms": self.history_flush_latency_ms,
+            "history_flush_max_pending": self.history_flush_max_pending,
+            "history_inline_limit_kb": self.history_inline_limit_kb,
+            "history_storage_engine": self.history_storage_engine,
             "custom_shortcuts": self.custom_shortcuts,
             "default_shortcut_id": self.default_shortcut_id,
         }
@@ -453,8 +554,16 @@ class SettingsManager:
                 max_items = int(settings["max_history_items"])
                 if max_items < 10:
                     max_items = 10
-                if max_items > 1000:
-                    max_items = 1000
+                # O motor sqlite guarda o excedente só no banco
+                engine = str(
+                    settings.get("history_storage_engine", self.history_storage_engine)
+                ).strip().lower()
+                if engine == "sqlite":
+                    max_cap = MAX_HISTORY_ITEMS_SQLITE
+                else:
+                    max_cap = MAX_HISTORY_ITEMS_JSON
+                if max_items > max_cap:
+                    max_items = max_cap
                 self.max_history_items = max_items
             except Exception:
                 pass
@@ -562,6 +671,88 @@ class SettingsManager:
                 self.tray_menu_cache_window_ms = tray_menu_cache_window_ms
             except Exception:
                 pass
+        if "history_storage_engine" in settings:
+            engine = str(settings["history_storage_engine"]).strip().lower()
+            if engine in ("json", "sqlite"):
+                self.history_storage_engine = engine
+            # O motor json mantém tudo em memória: refaz o limite de itens
+            if (
+                self.history_storage_engine == "json"
+                and self.max_history_items > MAX_HISTORY_ITEMS_JSON
+            ):
+                logging.info(
+                    f"max_history_items {self.max_history_items} reduzido para "
+                    f"{MAX_HISTORY_ITEMS_JSON} (motor json)"
+                )
+                self.max_history_items = MAX_HISTORY_ITEMS_JSON
+        if "history_inline_limit_kb" in settings:
+            try:
+                history_inline_limit_kb = int(settings["history_inline_limit_kb"])
+                if history_inline_limit_kb < 4:
+                    history_inline_limit_kb = 4
+                if history_inline_limit_kb > 65536:
+                    history_inline_limit_kb = 65536
+                self.history_inline_limit_kb = history_inline_limit_kb
+            except Exception:
+                pass
+        if "history_flush_max_pending" in settings:
+            try:
+                history_flush_max_pending = int(settings["history_flush_max_pending"])
+                if history_flush_max_pending < 1:
+                    history_flush_max_pending = 1
+                if history_flush_max_pending > 4096:
+                    history_flush_max_pending = 4096
+                self.history_flush_max_pending = history_flush_max_pending
+            except Exception:
+                pass
+        if "history_flush_latency_ms" in settings:
+            try:
+                history_flush_latency_ms = int(settings["history_flush_latency_ms"])
+                if history_flush_latency_ms < 50:
+                    history_flush_latency_ms = 50
+                if history_flush_latency_ms > 10000:
+                    history_flush_latency_ms = 10000
+                self.history_flush_latency_ms = history_flush_latency_ms
+            except Exception:
+                pass
+        if "history_max_entry_kb" in settings:
+            try:
+                history_max_entry_kb = int(settings["history_max_entry_kb"])
+                if history_max_entry_kb < 4:
+                    history_max_entry_kb = 4
+                if history_max_entry_kb > 1048576:
+                    history_max_entry_kb = 1048576
+                self.history_max_entry_kb = history_max_entry_kb
+            except Exception:
+                pass
+        if "history_max_total_kb" in settings:
+            try:
+                history_max_total_kb = int(settings["history_max_total_kb"])
+                if history_max_total_kb < 1024:
+                    history_max_total_kb = 1024
+                if history_max_total_kb > 1048576:
+                    history_max_total_kb = 1048576
+                self.history_max_total_kb = history_max_total_kb
+            except Exception:
+                pass
+        if "history_expiry_rules" in settings:
+            self.history_expiry_rules = self._validate_expiry_rules(
+                settings["history_expiry_rules"]
+            )
+        if "history_entry_ttl_minutes" in settings:
+            try:
+                history_entry_ttl_minutes = int(settings["history_entry_ttl_minutes"])
+                if history_entry_ttl_minutes < 0:
+                    history_entry_ttl_minutes = 0
+                if history_entry_ttl_minutes > 525600:
+                    history_entry_ttl_minutes = 525600
+                self.history_entry_ttl_minutes = history_entry_ttl_minutes
+            except Exception:
+                pass
+        if "history_eviction_policy" in settings:
+            policy = str(settings["history_eviction_policy"]).strip().lower()
+            if policy in ("fifo", "lru", "lfu"):
+                self.history_eviction_policy = policy
         if "custom_shortcuts" in settings:
             self.custom_shortcuts = self._validate_custom_shortcuts(
                 settings["custom_shortcuts"]
@@ -640,6 +831,18 @@ class SettingsManager:
 
         return validated
 
+    def _validate_expiry_rules(self, rules: Any) -> List[Dict[str, Any]]:
+        """Valida as regras de expiração do histórico (regras inválidas são ignoradas)"""
+        if not isinstance(rules, list):
+            return []
+        validated = []
+        for rule in rules[:32]:
+            try:
+                validated.append(ExpiryRuleSchema(**rule).model_dump())
+            except Exception as e:
+                logging.warning(f"Regra de expiração ignorada: {e}")
+        return validated
+
     def _migrate_legacy_prefix_if_needed(self, data: Dict[str, Any]) -> None:
         """Migra prefixo legado para custom shortcuts se necessário"""
         try:
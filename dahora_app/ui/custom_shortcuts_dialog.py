@@ -6,7 +6,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 from dahora_app.utils import format_hotkey_display
-from dahora_app.constants import RESERVED_HOTKEYS_BASE
+from dahora_app.constants import (
+    MAX_HISTORY_ITEMS_JSON,
+    MAX_HISTORY_ITEMS_SQLITE,
+    RESERVED_HOTKEYS_BASE,
+)
 from typing import Callable, Optional, List, Dict, Any
 from datetime import datetime
 from dahora_app.ui.styles import Windows11Style
@@ -412,7 +416,15 @@ class CustomShortcutsDialog:
             value=self.current_settings.get("max_history_items", 100)
         )
         ttk.Spinbox(
-            content, from_=10, to=1000, textvariable=self.var_max_history, width=15
+            content,
+            from_=10,
+            to=(
+                MAX_HISTORY_ITEMS_SQLITE
+                if self.current_settings.get("history_storage_engine") == "sqlite"
+                else MAX_HISTORY_ITEMS_JSON
+            ),
+            textvariable=self.var_max_history,
+            width=15,
         ).pack(anchor="w", pady=(0, 16))
 
         ttk.Label(
@@ -721,8 +733,12 @@ class CustomShortcutsDialog:
                     max_history_items = 100
                 if max_history_items < 10:
                     max_history_items = 10
-                if max_history_items > 1000:
-                    max_history_items = 1000
+                if self.current_settings.get("history_storage_engine") == "sqlite":
+                    max_history_cap = MAX_HISTORY_ITEMS_SQLITE
+                else:
+                    max_history_cap = MAX_HISTORY_ITEMS_JSON
+                if max_history_items > max_history_cap:
+                    max_history_items = max_history_cap
                 if self.var_max_history:
                     self.var_max_history.set(max_history_items)
 
@@ -94,6 +94,11 @@ class MenuBuilder:
         """Define callback para verificar estado de pausa"""
         self.is_paused_callback = callback
 
+    def invalidate_cache(self) -> None:
+        """Descarta os itens em cache (ex.: itens removidos do histórico)"""
+        self._last_dynamic_items = None
+        self._last_dynamic_items_at = 0.0
+
     def _copy_datetime_wrapper(self, icon, item):
         """Wrapper para callback de copiar data/hora"""
         if self.copy_datetime_callback:
@@ -183,15 +188,16 @@ class MenuBuilder:
                     display_text = truncate_text(text, max_length=40)
                     display_text = sanitize_text_for_display(display_text)
 
-                    # Cria função para copiar item
-                    def make_copy_func(txt):
+                    # Cria função para copiar item (o texto completo de itens
+                    # em blob é lido só ao copiar)
+                    def make_copy_func(history_item):
                         return lambda icon, item: (
-                            self.copy_from_history_callback(txt)
+                            self.copy_from_history_callback(history_item)
                             if self.copy_from_history_callback
                             else None
                         )
 
-                    copy_func = make_copy_func(text)
+                    copy_func = make_copy_func(entry)
                     menu_items.append(
                         pystray.MenuItem(f"{idx}. {display_text}", copy_func)
                     )
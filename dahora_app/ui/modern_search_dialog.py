@@ -6,7 +6,7 @@ import customtkinter as ctk
 import threading
 import logging
 import time
-from typing import Optional, Callable, List, Dict, Any, cast
+from typing import Optional, Callable, List, Dict, Any, Set, Tuple
 from datetime import datetime
 import tkinter as tk
 
@@ -14,11 +14,52 @@ from dahora_app.ui.modern_styles import (
     ModernTheme,
     ModernLabel,
     ModernFrame,
-    ModernScrollableFrame,
     ModernEntry,
     ModernButton,
+    ModernCheckbox,
 )
 from dahora_app.ui.icon_manager import IconManager
+from dahora_app.history_index import (
+    IncrementalSearch,
+    find_term,
+    search_text_of,
+    split_terms,
+)
+from dahora_app.constants import SEARCH_RESULTS_LIMIT
+from dahora_app.search_worker import SearchWorker
+from dahora_app.ui.virtual_list import ListViewport
+
+# Linhas da lista de resultados: altura fixa e um conjunto fixo de widgets,
+# reaproveitados conforme a rolagem (suficiente para ~1150 px de altura)
+ROW_HEIGHT = 92
+ROW_PADY = 2
+ROW_PITCH = ROW_HEIGHT + 2 * ROW_PADY
+ROW_POOL_SIZE = 12
+
+
+class _ResultRow:
+    """Widgets de uma linha reaproveitada e o índice do resultado que mostra"""
+
+    __slots__ = (
+        "frame",
+        "inner",
+        "ts_label",
+        "preview_box",
+        "index",
+        "packed",
+        "selected",
+    )
+
+    def __init__(self, frame: Any, inner: Any, ts_label: Any, preview_box: Any):
+        self.frame = frame
+        self.inner = inner
+        self.ts_label = ts_label
+        self.preview_box = preview_box
+        # -1 = sem dados ligados (linha oculta ou dados trocados)
+        self.index = -1
+        self.packed = False
+        # Estado de seleção já pintado (None = cores ainda não aplicadas)
+        self.selected: Optional[bool] = None
 
 
 class ModernSearchDialog:
@@ -27,29 +68,73 @@ class ModernSearchDialog:
     def __init__(self, notification_callback: Optional[Callable] = None):
         self.notification_callback = notification_callback
         self.get_history_callback: Optional[Callable] = None
+        self.search_callback: Optional[Callable] = None
+        self.fuzzy_search_callback: Optional[Callable] = None
+        self.history_version_callback: Optional[Callable[[], int]] = None
         self.copy_callback: Optional[Callable] = None
+        self.delete_callback: Optional[Callable] = None
         self.window: Optional[ctk.CTkToplevel] = None
         self.parent: Optional[ctk.CTk] = None
         self.colors = ModernTheme.get_colors()
         self.filtered_results: List[Dict] = []
         self.selected_index = -1
-        self.result_buttons: List[ctk.CTkFrame] = []
+        # Seleção múltipla (Ctrl/Shift+clique) para exclusão em lote
+        self.selected_indices: Set[int] = set()
+        # Lista virtualizada: todos os resultados navegáveis com um conjunto
+        # fixo de linhas (ver `virtual_list.py`)
+        self._rows: List[_ResultRow] = []
+        self._viewport = ListViewport()
         self._results_container: Optional[Any] = None
+        self._scrollbar: Optional[Any] = None
+        self._query = ""
+        self._preview_cache: Dict[int, str] = {}
         self._search_after_id: Optional[str] = None
-        self.max_results_render: int = 200
+        # Filtragem fora do thread do Tk; só o resultado final volta à UI
+        self._incremental = IncrementalSearch(
+            self._full_query, self._history_version, SEARCH_RESULTS_LIMIT
+        )
+        self._search_worker = SearchWorker(self._run_query, self._post_results)
+        # Próximas páginas, pedidas quando a rolagem chega perto do fim
+        self._page_worker = SearchWorker(
+            self._run_page, self._post_page, name="HistorySearchPage"
+        )
+        self._page_offset = 0
+        self._has_more = False
+        self._loading_more = False
+        # Busca aproximada (lido pelo worker; alterado só pelo checkbox)
+        self._fuzzy = False
 
     def set_get_history_callback(self, callback: Callable) -> None:
         self.get_history_callback = callback
 
+    def set_search_callback(self, callback: Callable) -> None:
+        """Define callback de busca indexada: (query, limit, offset) -> itens do mais recente ao mais antigo"""
+        self.search_callback = callback
+
+    def set_fuzzy_search_callback(self, callback: Callable) -> None:
+        """Define callback de busca aproximada: (query, limit, offset) -> itens do mais relevante ao menos relevante"""
+        self.fuzzy_search_callback = callback
+
+    def set_history_version_callback(self, callback: Callable[[], int]) -> None:
+        """Define callback da versão do histórico (resultados reaproveitados
+        na digitação valem enquanto ela não mudar)"""
+        self.history_version_callback = callback
+
     def set_copy_callback(self, callback: Callable) -> None:
         self.copy_callback = callback
 
+    def set_delete_callback(self, callback: Callable) -> None:
+        """Define callback de exclusão: (itens) -> número de itens removidos"""
+        self.delete_callback = callback
+
     def set_parent(self, parent: ctk.CTk) -> None:
         self.parent = parent
 
     def show(self) -> None:
         """Mostra o diálogo"""
         start = time.perf_counter()
+        # O histórico pode ter mudado com a janela fechada
+        self._incremental.invalidate()
         if self.window is not None:
             try:
                 self.window.deiconify()
@@ -167,19 +252,38 @@ class ModernSearchDialog:
             command=self._perform_search,
         ).pack(side="left")
 
+        self._fuzzy_var = ctk.BooleanVar(value=self._fuzzy)
+        ModernCheckbox(
+            search_frame,
+            text="Aproximada",
+            variable=self._fuzzy_var,
+            command=self._on_fuzzy_toggle,
+        ).pack(side="left", padx=(8, 0))
+
         # Contador
         self.count_label = ModernLabel(top, text="", style="muted")
         self.count_label.pack(anchor="w", pady=(0, 8))
 
-        # Lista de resultados (sem padding horizontal externo)
-        self.results_frame = ModernScrollableFrame(outer)
+        # Lista de resultados (sem padding horizontal externo): linhas criadas
+        # uma única vez e religadas aos dados na rolagem
+        self.results_frame = ctk.CTkFrame(outer, fg_color=self.colors["bg"])
         self.results_frame.pack(fill="both", expand=True, padx=0, pady=(12, 12))
-        # CTkScrollableFrame usa um frame interno para os filhos.
-        # Usar esse container evita destruir canvas/scrollbar ao limpar resultados.
-        results_container = getattr(self.results_frame, "_scrollable_frame", None)
-        if results_container is None:
-            results_container = self.results_frame
+        self._scrollbar = ctk.CTkScrollbar(
+            self.results_frame,
+            command=self._on_scrollbar,
+            button_color=self.colors["bg_tertiary"],
+            button_hover_color=self.colors["surface"],
+        )
+        self._scrollbar.pack(side="right", fill="y")
+        results_container = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+        results_container.pack(side="left", fill="both", expand=True)
+        results_container.pack_propagate(False)
+        results_container.bind("<Configure>", self._on_results_resize)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            results_container.bind(sequence, self._on_mousewheel)
         self._results_container = results_container
+        self._rows = [self._create_row(results_container) for _ in range(ROW_POOL_SIZE)]
+        self._viewport = ListViewport(visible=ROW_POOL_SIZE)
 
         # Botões (padded)
         buttons = ctk.CTkFrame(outer, fg_color="transparent")
@@ -198,9 +302,16 @@ class ModernSearchDialog:
             width=160,
             command=self._on_copy,
         ).pack(side="right", padx=(0, 8))
+        ModernButton(
+            buttons,
+            text="Excluir Selecionados",
+            width=160,
+            command=self._on_delete,
+        ).pack(side="left")
 
         # Atalhos
         window.bind("<Escape>", lambda e: self._on_close())
+        window.bind("<Delete>", self._on_delete_key)
         window.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Não exibe aqui; show() chama _show_window() depois.
@@ -288,92 +399,154 @@ class ModernSearchDialog:
             self._perform_search()
 
     def _perform_search(self) -> None:
-        """Executa a busca"""
-        query = self.search_var.get().lower().strip()
-
-        # Limpa resultados
-        container = self._results_container or getattr(
-            self.results_frame, "_scrollable_frame", self.results_frame
-        )
-        for widget in cast(Any, container).winfo_children():
-            widget.destroy()
-        self.result_buttons.clear()
-        self.filtered_results.clear()
-        self.selected_index = -1
-
-        if not self.get_history_callback:
+        """Agenda a busca no worker (não bloqueia a digitação)"""
+        self._search_worker.submit(self.search_var.get().strip())
+
+    def _on_fuzzy_toggle(self) -> None:
+        """Alterna a busca aproximada e refaz a consulta"""
+        self._fuzzy = bool(self._fuzzy_var.get())
+        self._incremental.invalidate()
+        self._perform_search()
+
+    def _run_query(self, query: str) -> List[Dict]:
+        """Executa a consulta no modo atual (thread do worker)"""
+        if self._fuzzy and self.fuzzy_search_callback:
+            # Resultado já ordenado por relevância; não é refinável como o exato
+            return self.fuzzy_search_callback(query, SEARCH_RESULTS_LIMIT)
+        return self._incremental.search(query)
+
+    def _run_page(self, query: str) -> Tuple[int, List[Dict]]:
+        """Busca a página seguinte aos resultados exibidos (thread do worker)"""
+        offset = self._page_offset
+        if self._fuzzy and self.fuzzy_search_callback:
+            page = self.fuzzy_search_callback(query, SEARCH_RESULTS_LIMIT, offset)
+        elif self.search_callback:
+            page = self.search_callback(query, SEARCH_RESULTS_LIMIT, offset)
+        elif self.get_history_callback:
+            terms = split_terms(query)
+            page = [
+                item
+                for item in reversed(self.get_history_callback())
+                if all(t in search_text_of(item) for t in terms)
+            ][offset:offset + SEARCH_RESULTS_LIMIT]
+        else:
+            page = []
+        return offset, page
+
+    def _history_version(self) -> Optional[int]:
+        if self.history_version_callback:
+            return self.history_version_callback()
+        return None
+
+    def _full_query(self, query: str) -> List[Dict]:
+        """Filtra o histórico inteiro (thread do worker; ver `IncrementalSearch`)"""
+        if self.search_callback:
+            return self.search_callback(query, SEARCH_RESULTS_LIMIT)
+        if self.get_history_callback:
+            terms = split_terms(query)
+            return [
+                item
+                for item in reversed(self.get_history_callback())
+                if all(t in search_text_of(item) for t in terms)
+            ][:SEARCH_RESULTS_LIMIT]
+        return []
+
+    def _post_results(self, generation: int, query: str, matches: List[Dict]) -> None:
+        """Repassa o resultado ao loop do Tk (thread do worker)"""
+        window = self.window
+        if window is None:
             return
+        try:
+            window.after(0, lambda: self._apply_results(generation, query, matches))
+        except Exception as e:
+            logging.warning(f"Falha ao agendar resultado da busca: {e}")
 
-        history = self.get_history_callback()
-        total_matches = 0
-        rendered = 0
-
-        for item in reversed(history):
-            text = item.get("text", "")
-            if query and query not in text.lower():
-                continue
-
-            total_matches += 1
-            if rendered < self.max_results_render:
-                self.filtered_results.append(item)
-                self._create_result_item(
-                    item, len(self.filtered_results) - 1, query=query
-                )
-                rendered += 1
-
-        # Atualiza contador
-        if total_matches == rendered:
-            self.count_label.configure(
-                text=f"{total_matches} resultado{'s' if total_matches != 1 else ''}"
-            )
-        else:
-            self.count_label.configure(
-                text=f"{total_matches} resultados (mostrando {rendered})"
-            )
+    def _apply_results(self, generation: int, query: str, matches: List[Dict]) -> None:
+        """Renderiza o resultado, se ainda for o da consulta mais recente"""
+        if self.window is None or not self._search_worker.is_current(generation):
+            return
 
-    def _create_result_item(self, item: Dict, index: int, query: str = "") -> None:
-        """Cria um item de resultado"""
-        is_selected = index == self.selected_index
-        bg = self.colors["accent"] if is_selected else self.colors["surface"]
+        # Página da consulta anterior ainda em andamento não é mais anexada
+        self._page_worker.cancel()
+        self._loading_more = False
+        # Página cheia: pode haver mais resultados (carregados ao rolar)
+        self._has_more = len(matches) >= SEARCH_RESULTS_LIMIT
+        # Só troca os dados: as linhas existentes são religadas
+        self.filtered_results = list(matches)
+        self.selected_index = -1
+        self.selected_indices.clear()
+        self._query = query
+        self._preview_cache.clear()
+        for row in self._rows:
+            row.index = -1
+        self._viewport.set_total(len(self.filtered_results))
+        self._render_rows()
+        self._update_count_label()
+
+    def _update_count_label(self) -> None:
+        total_matches = len(self.filtered_results)
+        label = f"{total_matches} resultado{'s' if total_matches != 1 else ''}"
+        if self._has_more:
+            # Há mais itens no histórico: a próxima página vem ao rolar
+            label = f"{total_matches}+ resultados (role para ver mais)"
+        if self._fuzzy and self.fuzzy_search_callback:
+            label += " (aproximada, mais relevantes primeiro)"
+        self.count_label.configure(text=label)
+
+    def _maybe_load_more(self) -> None:
+        """Pede a próxima página quando a rolagem chega perto do fim"""
+        if not self._has_more or self._loading_more:
+            return
+        if not self._viewport.near_end(ROW_POOL_SIZE):
+            return
+        self._loading_more = True
+        self._page_offset = len(self.filtered_results)
+        self._page_worker.submit(self._query)
+
+    def _post_page(
+        self, generation: int, query: str, page: Tuple[int, List[Dict]]
+    ) -> None:
+        """Repassa a página ao loop do Tk (thread do worker)"""
+        window = self.window
+        if window is None:
+            return
+        try:
+            window.after(0, lambda: self._append_page(generation, page))
+        except Exception as e:
+            logging.warning(f"Falha ao agendar página da busca: {e}")
 
+    def _append_page(self, generation: int, page: Tuple[int, List[Dict]]) -> None:
+        """Anexa a página aos resultados exibidos, sem mudar a rolagem"""
+        if self.window is None or not self._page_worker.is_current(generation):
+            return
+        offset, items = page
+        self._loading_more = False
+        if offset != len(self.filtered_results):
+            return
+        self._has_more = len(items) >= SEARCH_RESULTS_LIMIT
+        self.filtered_results.extend(items)
+        self._viewport.grow(len(self.filtered_results))
+        self._render_rows()
+        self._update_count_label()
+
+    def _create_row(self, container: Any) -> _ResultRow:
+        """Cria uma linha do conjunto fixo (só na criação da janela)"""
+        bg = self.colors["surface"]
         # Altura maior para permitir prévia em múltiplas linhas
-        container = self._results_container or getattr(
-            self.results_frame, "_scrollable_frame", self.results_frame
-        )
-        frame = ctk.CTkFrame(container, fg_color=bg, corner_radius=6, height=92)
-        # Recuo interno do conteúdo (mantém scrollbar no canto)
-        frame.pack(fill="x", pady=2, padx=12)
+        frame = ctk.CTkFrame(container, fg_color=bg, corner_radius=6, height=ROW_HEIGHT)
         frame.pack_propagate(False)
 
         inner = ctk.CTkFrame(frame, fg_color="transparent")
         inner.pack(fill="both", expand=True, padx=12, pady=8)
 
-        text = item.get("text", "")
-        timestamp = item.get("timestamp", "")
-
-        # Formata timestamp
-        try:
-            dt = datetime.fromisoformat(timestamp)
-            ts_str = dt.strftime("%d/%m/%Y %H:%M")
-        except:
-            ts_str = ""
-
-        text_color = self.colors["text_bright"] if is_selected else self.colors["text"]
-        muted_color = self.colors["text"] if is_selected else self.colors["text_muted"]
-
-        # Timestamp
-        if ts_str:
-            ctk.CTkLabel(
-                inner,
-                text=ts_str,
-                font=("Segoe UI", max(10, ModernTheme.FONT_SIZE_BASE - 2)),
-                text_color=muted_color,
-                anchor="w",
-            ).pack(anchor="w")
-
-        # Texto (prévia em múltiplas linhas). Se houver termo de busca,
-        # tenta mostrar um trecho que contenha a primeira ocorrência.
-        preview = self._build_preview(text or "", query or "")
+        ts_label = ctk.CTkLabel(
+            inner,
+            text="",
+            font=("Segoe UI", max(10, ModernTheme.FONT_SIZE_BASE - 2)),
+            text_color=self.colors["text_muted"],
+            anchor="w",
+        )
+        ts_label.pack(anchor="w")
 
         # Para permitir highlight de parte do texto, usa CTkTextbox (tk.Text interno suporta tags).
         preview_box = ctk.CTkTextbox(
@@ -383,34 +556,160 @@ class ModernSearchDialog:
             fg_color="transparent",
             border_width=0,
             font=("Segoe UI", ModernTheme.FONT_SIZE_BASE),
-            text_color=text_color,
+            text_color=self.colors["text"],
             scrollbar_button_color=bg,
             scrollbar_button_hover_color=bg,
         )
         preview_box.pack(anchor="w", fill="x")
-        try:
-            preview_box.insert("1.0", preview)
-            preview_box.configure(state="disabled")
-            self._highlight_query(preview_box, query)
-        except Exception:
-            pass
 
-        # Binds
-        def on_click(e, idx=index):
-            self._select_item(idx)
+        row = _ResultRow(frame, inner, ts_label, preview_box)
+
+        # Binds: o índice é lido da linha no momento do clique
+        def on_click(e):
+            if row.index >= 0:
+                self._select_item(row.index)
+
+        def on_ctrl_click(e):
+            if row.index >= 0:
+                self._toggle_item(row.index)
+
+        def on_shift_click(e):
+            if row.index >= 0:
+                self._select_range(row.index)
+
+        def on_double(e):
+            if row.index >= 0:
+                self._select_item(row.index)
+                self._on_copy()
+
+        # Binds dos widgets CTk são cumulativos: cada widget uma única vez
+        for w in [frame, inner, ts_label, preview_box]:
+            w.bind("<Button-1>", on_click)
+            w.bind("<Control-Button-1>", on_ctrl_click)
+            w.bind("<Shift-Button-1>", on_shift_click)
+            w.bind("<Double-Button-1>", on_double)
+            # "break" evita que o tk.Text da prévia role a si mesmo
+            w.bind("<MouseWheel>", self._on_mousewheel)
+            w.bind("<Button-4>", self._on_mousewheel)
+            w.bind("<Button-5>", self._on_mousewheel)
+
+        return row
+
+    def _render_rows(self) -> None:
+        """Liga as linhas às posições visíveis e atualiza a scrollbar"""
+        visible = list(self._viewport.rows())
+        # As linhas visíveis são sempre as primeiras do conjunto: reempacotar
+        # em ordem mantém a ordem na tela
+        for slot, row in enumerate(self._rows):
+            if slot < len(visible):
+                if not row.packed:
+                    row.frame.pack(fill="x", pady=ROW_PADY, padx=12)
+                    row.packed = True
+                self._bind_row(row, visible[slot])
+            else:
+                if row.packed:
+                    row.frame.pack_forget()
+                    row.packed = False
+                row.index = -1
+        self._update_scrollbar()
+        self._maybe_load_more()
+
+    def _bind_row(self, row: _ResultRow, index: int) -> None:
+        """Mostra o resultado `index` numa linha existente (só refaz o conteúdo se mudou)"""
+        if row.index != index:
+            row.index = index
+            item = self.filtered_results[index]
+            timestamp = item.get("timestamp", "")
+
+            # Formata timestamp
+            try:
+                dt = datetime.fromisoformat(timestamp)
+                ts_str = dt.strftime("%d/%m/%Y %H:%M")
+            except:
+                ts_str = ""
+            row.ts_label.configure(text=ts_str)
+
+            # Texto (prévia em múltiplas linhas). Se houver termo de busca,
+            # tenta mostrar um trecho que contenha a primeira ocorrência.
+            preview = self._preview_cache.get(index)
+            if preview is None:
+                preview = self._build_preview(item.get("text", "") or "", self._query)
+                self._preview_cache[index] = preview
+            try:
+                row.preview_box.configure(state="normal")
+                row.preview_box.delete("1.0", "end")
+                row.preview_box.insert("1.0", preview)
+                row.preview_box.configure(state="disabled")
+                self._highlight_query(row.preview_box, self._query)
+            except Exception:
+                pass
+        self._paint_row(row)
 
-        def on_double(e, idx=index):
-            self._select_item(idx)
-            self._on_copy()
+    def _paint_row(self, row: _ResultRow) -> None:
+        """Cores da linha conforme a seleção"""
+        is_selected = row.index in self.selected_indices
+        if row.selected is is_selected:
+            return
+        row.selected = is_selected
+        bg = self.colors["accent"] if is_selected else self.colors["surface"]
+        text_color = self.colors["text_bright"] if is_selected else self.colors["text"]
+        muted_color = self.colors["text"] if is_selected else self.colors["text_muted"]
+        row.frame.configure(fg_color=bg)
+        row.ts_label.configure(text_color=muted_color)
+        row.preview_box.configure(
+            text_color=text_color,
+            scrollbar_button_color=bg,
+            scrollbar_button_hover_color=bg,
+        )
 
-        for widget in [frame, inner]:
-            widget.bind("<Button-1>", on_click)
-            widget.bind("<Double-Button-1>", on_double)
-            for child in widget.winfo_children():
-                child.bind("<Button-1>", on_click)
-                child.bind("<Double-Button-1>", on_double)
+    def _update_scrollbar(self) -> None:
+        if self._scrollbar is None:
+            return
+        first, last = self._viewport.fractions()
+        # Esconde a barra (sem mudar o layout) quando tudo cabe
+        if first <= 0.0 and last >= 1.0:
+            color = hover = self.colors["bg"]
+        else:
+            color, hover = self.colors["bg_tertiary"], self.colors["surface"]
+        try:
+            self._scrollbar.configure(button_color=color, button_hover_color=hover)
+            self._scrollbar.set(first, last)
+        except Exception:
+            pass
 
-        self.result_buttons.append(frame)
+    def _on_scrollbar(self, *args: Any) -> None:
+        """Protocolo da scrollbar do Tk: ("moveto", fração) ou ("scroll", n, unidade)"""
+        changed = False
+        if args and args[0] == "moveto":
+            changed = self._viewport.moveto(float(args[1]))
+        elif args and args[0] == "scroll":
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                changed = self._viewport.scroll_pages(amount)
+            else:
+                changed = self._viewport.scroll(amount)
+        if changed:
+            self._render_rows()
+
+    def _on_mousewheel(self, event: Any) -> str:
+        if getattr(event, "num", None) == 4:
+            rows = -1
+        elif getattr(event, "num", None) == 5:
+            rows = 1
+        else:
+            delta = getattr(event, "delta", 0) or 0
+            steps = max(1, abs(delta) // 120)
+            rows = -steps if delta > 0 else steps
+        if self._viewport.scroll(rows):
+            self._render_rows()
+        return "break"
+
+    def _on_results_resize(self, event: Any) -> None:
+        """Quantas linhas cabem depende da altura da lista"""
+        height = getattr(event, "height", 0) or 0
+        visible = min(ROW_POOL_SIZE, max(1, height // ROW_PITCH))
+        if self._viewport.set_visible(visible):
+            self._render_rows()
 
     def _build_preview(self, full_text: str, query: str) -> str:
         """Constrói uma prévia curta (até ~3 linhas) preferindo mostrar o termo pesquisado."""
@@ -425,12 +724,18 @@ class ModernSearchDialog:
         preview_lines = raw_lines[:max_lines] if raw_lines else [""]
         preview = "\n".join(preview_lines)
 
-        q = (query or "").strip()
+        # Com vários termos, a prévia é centrada no primeiro termo encontrado
+        # (comparação sem acentos: posições mapeadas por `find_term`)
+        terms = split_terms(query)
+        q, pos = "", -1
+        for term in terms:
+            pos, _ = find_term(full_text or "", term)
+            if pos != -1:
+                q = term
+                break
         if q:
             # Se o termo não aparece no preview inicial, recorta ao redor da 1ª ocorrência
-            if q.lower() not in preview.lower():
-                lower_text = (full_text or "").lower()
-                pos = lower_text.find(q.lower())
+            if find_term(preview, q)[0] == -1:
                 if pos != -1:
                     # Encontra a linha que contém a ocorrência
                     lines = (full_text or "").splitlines()
@@ -451,11 +756,10 @@ class ModernSearchDialog:
                     # Se for uma única linha muito longa, corta em torno do match
                     if len(context_lines) == 1:
                         ln = context_lines[0]
-                        ln_low = ln.lower()
-                        p = ln_low.find(q.lower())
+                        p, p_end = find_term(ln, q)
                         if p != -1 and len(ln) > 180:
                             left = max(0, p - 60)
-                            right = min(len(ln), p + len(q) + 60)
+                            right = min(len(ln), p_end + 60)
                             snippet = ln[left:right].rstrip()
                             if left > 0:
                                 snippet = "…" + snippet
@@ -485,9 +789,9 @@ class ModernSearchDialog:
         return preview
 
     def _highlight_query(self, textbox: ctk.CTkTextbox, query: str) -> None:
-        """Destaca o termo pesquisado dentro do textbox (case-insensitive)."""
-        q = (query or "").strip()
-        if not q:
+        """Destaca os termos pesquisados dentro do textbox (sem diferenciar maiúsculas nem acentos)."""
+        terms = split_terms(query)
+        if not terms:
             return
 
         # CTkTextbox encapsula um tk.Text interno.
@@ -506,27 +810,46 @@ class ModernSearchDialog:
             foreground=self.colors.get("text_bright", "white"),
         )
 
-        # Procura todas as ocorrências usando o search do tk.Text (nocase).
-        start = "1.0"
-        while True:
-            pos = text_widget.search(q, start, stopindex="end", nocase=1)
-            if not pos:
-                break
-            end = f"{pos}+{len(q)}c"
-            text_widget.tag_add(tag, pos, end)
-            start = end
+        # Procura todas as ocorrências na prévia ("acao" destaca "ação")
+        content = text_widget.get("1.0", "end-1c")
+        for q in terms:
+            start = 0
+            while True:
+                pos, end = find_term(content, q, start)
+                if pos == -1:
+                    break
+                text_widget.tag_add(tag, f"1.0+{pos}c", f"1.0+{end}c")
+                start = end
 
     def _select_item(self, index: int) -> None:
-        """Seleciona um item"""
+        """Seleciona um item (descarta a seleção múltipla)"""
         self.selected_index = index
+        self.selected_indices = {index}
+        self._refresh_selection()
+
+    def _toggle_item(self, index: int) -> None:
+        """Ctrl+clique: inclui ou retira o item da seleção"""
+        if index in self.selected_indices:
+            self.selected_indices.discard(index)
+            if self.selected_index == index:
+                self.selected_index = min(self.selected_indices, default=-1)
+        else:
+            self.selected_indices.add(index)
+            self.selected_index = index
+        self._refresh_selection()
+
+    def _select_range(self, index: int) -> None:
+        """Shift+clique: seleciona do item ativo até o clicado"""
+        anchor = self.selected_index if self.selected_index >= 0 else index
+        low, high = sorted((anchor, index))
+        self.selected_indices = set(range(low, high + 1))
         self._refresh_selection()
 
     def _refresh_selection(self) -> None:
-        """Atualiza visual da seleção"""
-        for i, frame in enumerate(self.result_buttons):
-            is_selected = i == self.selected_index
-            bg = self.colors["accent"] if is_selected else self.colors["surface"]
-            frame.configure(fg_color=bg)
+        """Atualiza visual da seleção (só as linhas visíveis existem)"""
+        for row in self._rows:
+            if row.index >= 0:
+                self._paint_row(row)
 
     def _on_copy(self) -> None:
         """Copia o item selecionado"""
@@ -538,18 +861,54 @@ class ModernSearchDialog:
             return
 
         item = self.filtered_results[self.selected_index]
-        text = item.get("text", "")
 
+        # Passa o item: o texto completo de itens em blob é lido sob demanda
         if self.copy_callback:
-            self.copy_callback(text)
+            self.copy_callback(item)
 
         if self.notification_callback:
             self.notification_callback("Dahora App", "Copiado para a área de transferência.")
 
         self._on_close()
 
+    def _on_delete_key(self, event: Any) -> None:
+        """Tecla Delete: exclui a seleção, exceto durante a edição da busca"""
+        if isinstance(getattr(event, "widget", None), tk.Entry):
+            return
+        self._on_delete()
+
+    def _on_delete(self) -> None:
+        """Exclui do histórico os itens selecionados"""
+        items = [
+            self.filtered_results[i]
+            for i in sorted(self.selected_indices)
+            if 0 <= i < len(self.filtered_results)
+        ]
+        if not items:
+            if self.notification_callback:
+                self.notification_callback(
+                    "Dahora App", "Selecione itens para excluir!"
+                )
+            return
+        if not self.delete_callback:
+            return
+
+        try:
+            self.delete_callback(items)
+        except Exception as e:
+            logging.error(f"Erro ao excluir itens do histórico: {e}")
+            return
+
+        # Refaz a busca (completa) para refletir a exclusão
+        self._incremental.invalidate()
+        self._perform_search()
+
     def _on_close(self) -> None:
         """Fecha"""
+        # Resultado de busca ainda em andamento não é mais renderizado
+        self._search_worker.cancel()
+        self._page_worker.cancel()
+        self._loading_more = False
         if self.window:
             try:
                 self.window.withdraw()
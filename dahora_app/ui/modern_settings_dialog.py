@@ -24,7 +24,11 @@ from dahora_app.ui.modern_styles import (
 
 from dahora_app.ui.icon_manager import IconManager
 from dahora_app.utils import format_hotkey_display
-from dahora_app.constants import RESERVED_HOTKEYS_BASE
+from dahora_app.constants import (
+    MAX_HISTORY_ITEMS_JSON,
+    MAX_HISTORY_ITEMS_SQLITE,
+    RESERVED_HOTKEYS_BASE,
+)
 
 
 class ModernSettingsDialog:
@@ -1045,7 +1049,7 @@ class ModernSettingsDialog:
         max_history_entry.pack(anchor="w", pady=(0, 16))
         self._attach_tooltip(
             max_history_entry,
-            "Quantidade máxima de itens guardados no histórico.\nFaixa: 10–1000. Padrão: 100.\nValores maiores usam mais memória e deixam o menu maior.",
+            "Quantidade máxima de itens guardados no histórico.\nFaixa: 10–1000 (motor json) ou até 1.000.000 (motor sqlite). Padrão: 100.\nCom o sqlite, só os 1000 mais recentes ficam em memória; os demais aparecem na busca.",
         )
 
         monitor_interval_label = ModernLabel(
@@ -1611,8 +1615,12 @@ class ModernSettingsDialog:
                     max_history_items = 100
                 if max_history_items < 10:
                     max_history_items = 10
-                if max_history_items > 1000:
-                    max_history_items = 1000
+                if self.current_settings.get("history_storage_engine") == "sqlite":
+                    max_history_cap = MAX_HISTORY_ITEMS_SQLITE
+                else:
+                    max_history_cap = MAX_HISTORY_ITEMS_JSON
+                if max_history_items > max_history_cap:
+                    max_history_items = max_history_cap
                 if self.var_max_history:
                     self.var_max_history.set(max_history_items)
 
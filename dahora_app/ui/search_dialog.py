@@ -2,13 +2,15 @@
 Janela de Busca no Histórico do Dahora App
 """
 
-import hashlib
 import logging
 import threading
 from typing import Optional, Callable, List, Dict, Any
 from datetime import datetime
 from dahora_app.ui.styles import Windows11Style
 from dahora_app.ui.icon_manager import IconManager
+from dahora_app.constants import SEARCH_RESULTS_LIMIT
+from dahora_app.history_index import search_text_of, split_terms
+from dahora_app.history_entry import log_fingerprint
 
 # Import opcional de tkinter
 try:
@@ -32,12 +34,17 @@ class SearchDialog:
         """
         self.notification_callback = notification_callback
         self.get_history_callback: Optional[Callable] = None
+        self.search_callback: Optional[Callable] = None
         self.copy_callback: Optional[Callable] = None
 
     def set_get_history_callback(self, callback: Callable) -> None:
         """Define callback para obter histórico completo"""
         self.get_history_callback = callback
 
+    def set_search_callback(self, callback: Callable) -> None:
+        """Define callback de busca indexada: (query) -> itens do mais recente ao mais antigo"""
+        self.search_callback = callback
+
     def set_copy_callback(self, callback: Callable) -> None:
         """Define callback para copiar texto"""
         self.copy_callback = callback
@@ -135,50 +142,41 @@ class SearchDialog:
                 results_listbox.delete(0, tk.END)
                 filtered_results.clear()
 
-                if not self.get_history_callback:
+                if self.search_callback:
+                    matches = self.search_callback(query, SEARCH_RESULTS_LIMIT)
+                elif self.get_history_callback:
+                    terms = split_terms(query)
+                    matches = [
+                        item
+                        for item in reversed(self.get_history_callback())
+                        if all(t in search_text_of(item) for t in terms)
+                    ][:SEARCH_RESULTS_LIMIT]
+                else:
                     return
 
-                # Obtém histórico completo
-                history = self.get_history_callback()
-
-                if not query:
-                    # Mostra tudo se query vazia
-                    for item in reversed(history):
-                        text = item.get("text", "")
-                        timestamp = item.get("timestamp", "")
-
-                        # Formata timestamp
-                        try:
-                            dt = datetime.fromisoformat(timestamp)
-                            ts_str = dt.strftime("%d/%m/%Y %H:%M")
-                        except:
-                            ts_str = "sem data"
-
-                        display = f"[{ts_str}] {text[:80]}..."
-                        results_listbox.insert(tk.END, display)
-                        filtered_results.append(item)
-                else:
-                    # Busca por query
-                    for item in reversed(history):
-                        text = item.get("text", "").lower()
-                        if query in text:
-                            timestamp = item.get("timestamp", "")
-
-                            # Formata timestamp
-                            try:
-                                dt = datetime.fromisoformat(timestamp)
-                                ts_str = dt.strftime("%d/%m/%Y %H:%M")
-                            except:
-                                ts_str = "sem data"
-
-                            display = f"[{ts_str}] {item.get('text', '')[:80]}..."
-                            results_listbox.insert(tk.END, display)
-                            filtered_results.append(item)
+                for item in matches:
+                    timestamp = item.get("timestamp", "")
+
+                    # Formata timestamp
+                    try:
+                        dt = datetime.fromisoformat(timestamp)
+                        ts_str = dt.strftime("%d/%m/%Y %H:%M")
+                    except:
+                        ts_str = "sem data"
+
+                    display = f"[{ts_str}] {item.get('text', '')[:80]}..."
+                    results_listbox.insert(tk.END, display)
+                    filtered_results.append(item)
 
                 # Atualiza contagem
-                count_label.config(
-                    text=f"{len(filtered_results)} resultados encontrados"
-                )
+                if len(filtered_results) >= SEARCH_RESULTS_LIMIT:
+                    count_label.config(
+                        text=f"{SEARCH_RESULTS_LIMIT}+ resultados (refine a busca)"
+                    )
+                else:
+                    count_label.config(
+                        text=f"{len(filtered_results)} resultados encontrados"
+                    )
 
             # Botão buscar
             search_button = ttk.Button(
@@ -238,7 +236,7 @@ class SearchDialog:
                     text = item.get("text", "")
 
                     if self.copy_callback:
-                        self.copy_callback(text)
+                        self.copy_callback(item)
 
                     if self.notification_callback:
                         self.notification_callback(
@@ -246,15 +244,8 @@ class SearchDialog:
                         )
 
                     text_len = len(text) if text else 0
-                    text_hash = (
-                        hashlib.sha256(text.encode("utf-8", errors="replace"))
-                        .hexdigest()[:12]
-                        if text_len
-                        else "vazio"
-                    )
-                    logging.info(
-                        f"Item copiado da busca: len={text_len}, sha256={text_hash}"
-                    )
+                    text_fp = log_fingerprint(text) if text_len else "vazio"
+                    logging.info(f"Item copiado da busca: len={text_len}, fp={text_fp}")
                     root.destroy()
 
             def on_double_click(event):
@@ -0,0 +1,79 @@
+"""
+Janela de rolagem de listas virtualizadas
+
+A lista de resultados da busca criava um frame CTk por resultado (limitado a
+200) e destruía todos a cada consulta. Com virtualização, um conjunto fixo de
+linhas é reaproveitado: `ListViewport` só calcula quais índices dos dados as
+linhas mostram, a partir da rolagem. Não depende de Tk, para poder ser testado
+isoladamente; a ligação com os widgets fica em `ModernSearchDialog`.
+"""
+
+from typing import Tuple
+
+
+class ListViewport:
+    """Faixa de índices visíveis (`top` .. `top + visible`) de uma lista de `total` itens"""
+
+    def __init__(self, visible: int = 1):
+        self.total = 0
+        self.top = 0
+        self.visible = max(1, int(visible))
+
+    @property
+    def max_top(self) -> int:
+        return max(0, self.total - self.visible)
+
+    def _move(self, top: int) -> bool:
+        top = min(max(0, int(top)), self.max_top)
+        changed = top != self.top
+        self.top = top
+        return changed
+
+    def set_total(self, total: int) -> None:
+        """Novos dados: volta ao início"""
+        self.total = max(0, int(total))
+        self.top = 0
+
+    def grow(self, total: int) -> None:
+        """Mais dados no fim (próxima página): mantém a posição"""
+        self.total = max(self.total, int(total))
+
+    def near_end(self, margin: int) -> bool:
+        """Se a faixa visível está a até `margin` linhas do fim dos dados"""
+        return self.top + self.visible + max(0, int(margin)) >= self.total
+
+    def set_visible(self, visible: int) -> bool:
+        """Altera quantas linhas cabem (redimensionamento); True se a faixa mudou"""
+        visible = max(1, int(visible))
+        changed = visible != self.visible
+        self.visible = visible
+        return self._move(self.top) or changed
+
+    def scroll(self, rows: int) -> bool:
+        """Rola `rows` linhas (negativo = para cima); True se a faixa mudou"""
+        return self._move(self.top + rows)
+
+    def scroll_pages(self, pages: int) -> bool:
+        return self._move(self.top + pages * self.visible)
+
+    def moveto(self, fraction: float) -> bool:
+        """Posiciona pela fração da lista (protocolo `moveto` da scrollbar do Tk)"""
+        return self._move(round(float(fraction) * self.total))
+
+    def ensure_visible(self, index: int) -> bool:
+        """Rola o mínimo necessário para mostrar `index`"""
+        if index < self.top:
+            return self._move(index)
+        if index >= self.top + self.visible:
+            return self._move(index - self.visible + 1)
+        return False
+
+    def rows(self) -> range:
+        """Índices dos dados mostrados, de cima para baixo"""
+        return range(self.top, min(self.top + self.visible, self.total))
+
+    def fractions(self) -> Tuple[float, float]:
+        """Início e fim da faixa visível como frações (para `Scrollbar.set`)"""
+        if self.total <= self.visible:
+            return 0.0, 1.0
+        return self.top / self.total, (self.top + self.visible) / self.total
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do monitor de clipboard: comparar o texto vs token de mudança
+
+Uso:
+    py scripts/bench_clipboard_monitor.py [--ticks 20000] [--size-kb 512] [--changes 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_backend import MemoryClipboardBackend
+from dahora_app.clipboard_manager import ClipboardManager
+
+
+class _TextOnlyBackend(MemoryClipboardBackend):
+    """Clipboard em memória sem token: o monitor precisa ler e comparar o texto"""
+
+    def read_text(self) -> str:
+        # Cópia nova a cada leitura, como um clipboard real entrega
+        return super().read_text().encode("utf-8").decode("utf-8")
+
+    def change_token(self) -> Optional[int]:
+        return None
+
+
+def _run(backend: MemoryClipboardBackend, ticks: int, changes: int, size: int) -> float:
+    manager = ClipboardManager()
+    manager.set_clipboard_backend(backend)
+    manager.initialize_last_content()
+    every = max(1, ticks // max(1, changes))
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if tick % every == 0:
+            backend.write_text(f"{tick:08d}" + "x" * size)
+        manager._poll_clipboard_once()
+    elapsed = time.perf_counter() - start
+    manager.flush_history()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=20_000)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--changes", type=int, default=20)
+    args = parser.parse_args()
+
+    size = args.size_kb * 1024
+    with tempfile.TemporaryDirectory(prefix="dahora_bench_") as data_dir:
+        clipboard_module.HISTORY_FILE = os.path.join(data_dir, "clipboard_history.json")
+        text_backend = _TextOnlyBackend()
+        token_backend = MemoryClipboardBackend()
+        by_text = _run(text_backend, args.ticks, args.changes, size)
+        by_token = _run(token_backend, args.ticks, args.changes, size)
+
+    print(f"{args.ticks} ticks, clipboard de {args.size_kb} KiB, {args.changes} mudanças")
+    print(
+        f"comparando texto: {by_text * 1e6 / args.ticks:8.2f} µs/tick "
+        f"({text_backend.reads} leituras)"
+    )
+    print(
+        f"token de mudança: {by_token * 1e6 / args.ticks:8.2f} µs/tick "
+        f"({token_backend.reads} leituras)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das políticas de descarte: taxa de acerto e custo por cópia
+
+A sequência de cópias é sintética (trechos reutilizados com distribuição de
+Zipf misturados a cópias avulsas) ou lida de um arquivo com uma cópia por
+linha. Acerto = o texto copiado ainda estava no histórico.
+
+Uso:
+    py scripts/bench_eviction.py [--copies 50000] [--capacity 100] [--trace copias.txt]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.eviction import EVICTION_POLICIES, create_eviction_policy
+
+
+def _synthetic_trace(copies: int, snippets: int, reuse: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(snippets)]
+    trace = []
+    for i in range(copies):
+        if rng.random() < reuse:
+            rank = rng.choices(range(snippets), weights)[0]
+            trace.append(f"trecho reutilizado {rank}")
+        else:
+            trace.append(f"cópia avulsa {i}")
+    return trace
+
+
+def _replay_policy(name: str, trace: List[str], capacity: int):
+    """Só a política: acertos e custo da contabilidade por cópia"""
+    policy = create_eviction_policy(name)
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if key in policy:
+            hits += 1
+            policy.hit(key)
+            continue
+        if len(policy) >= capacity:
+            policy.remove(policy.victim())
+        policy.insert(key)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), elapsed / len(trace) * 1e6
+
+
+def _replay_manager(name: str, trace: List[str], capacity: int) -> float:
+    """Custo de `add_to_history` por cópia com a política ativa"""
+    manager = ClipboardManager()
+    manager.set_max_history_items(capacity)
+    manager.set_eviction_policy(name)
+    # Só a inclusão em memória: a gravação é medida em outros benchmarks
+    manager._schedule_save_locked = lambda: None
+    start = time.perf_counter()
+    for text in trace:
+        manager.add_to_history(text)
+    return (time.perf_counter() - start) / len(trace) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=50_000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--snippets", type=int, default=500)
+    parser.add_argument("--reuse", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--trace", help="Arquivo com uma cópia por linha")
+    args = parser.parse_args()
+
+    # Log INFO por item faz parte do custo medido, mas não da saída
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    if args.trace:
+        with open(args.trace, "r", encoding="utf-8") as f:
+            trace = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        trace = _synthetic_trace(args.copies, args.snippets, args.reuse, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="dahora_bench_") as data_dir:
+        clipboard_module.HISTORY_FILE = os.path.join(data_dir, "clipboard_history.json")
+        print(f"{len(trace)} cópias, capacidade {args.capacity}")
+        print(
+            f"{'política':>8} {'acertos':>9} {'política (µs/cópia)':>21} "
+            f"{'add_to_history (µs/cópia)':>27}"
+        )
+        for name in EVICTION_POLICIES:
+            hit_rate, policy_us = _replay_policy(name, trace, args.capacity)
+            manager_us = _replay_manager(name, trace, args.capacity)
+            print(
+                f"{name:>8} {hit_rate:>9.1%} {policy_us:>21.2f} {manager_us:>27.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da busca aproximada (tolerante a erros de digitação) no histórico
+
+Mede a latência de `TrigramIndex.fuzzy_search` com consultas digitadas com
+erros (troca, omissão e inversão de letras) em históricos de 10 mil e 100 mil
+itens, ao lado da busca exata para comparação. A coluna "acerto" indica se o
+item procurado aparece entre os 10 primeiros resultados.
+
+Uso:
+    py scripts/bench_fuzzy_search.py [--items 10000 100000] [--limit 100]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import List
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dahora_app.history_index import TrigramIndex
+
+# (consulta com erro, texto que o usuário procurava)
+QUERIES = [
+    ("relatrio mensal", "relatório mensal"),
+    ("cleinte", "cliente"),
+    ("pedidoo fiscal", "pedido fiscal"),
+    ("nota fsical", "nota fiscal"),
+    ("ab", "ab"),
+    ("zzzzzz", None),
+]
+
+
+def _random_text(rng: random.Random) -> str:
+    words = ["pedido", "cliente", "relatório", "mensal", "nota", "fiscal", "https://"]
+    parts = [rng.choice(words) for _ in range(rng.randint(2, 8))]
+    parts.append("".join(rng.choices(string.ascii_lowercase + string.digits, k=12)))
+    parts.append(str(rng.randint(0, 999)))
+    return " ".join(parts)
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _run(items: int, limit: int) -> None:
+    rng = random.Random(1234)
+    texts: List[str] = [_random_text(rng) for _ in range(items)]
+    index = TrigramIndex()
+    for i, text in enumerate(texts):
+        index.add(i, text)
+
+    print(f"{items} itens")
+    print(
+        f"{'consulta':<20} {'resultados':>10} {'aproximada (ms)':>16} "
+        f"{'exata (ms)':>11} {'acerto':>7}"
+    )
+    for query, wanted in QUERIES:
+        ranked = index.fuzzy_search(query, limit)
+        fuzzy_ms = _time(lambda: index.fuzzy_search(query, limit))
+        exact_ms = _time(lambda: index.search(query, limit))
+        if wanted is None:
+            hit = "-"
+        else:
+            top = [texts[key] for key, _ in ranked[:10]]
+            hit = "sim" if any(wanted in text for text in top) else "não"
+        print(
+            f"{query!r:<20} {len(ranked):>10} {fuzzy_ms:>16.2f} "
+            f"{exact_ms:>11.3f} {hit:>7}"
+        )
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    for items in args.items:
+        _run(items, args.limit)
+
+
+if __name__ == "__main__":
+    main()
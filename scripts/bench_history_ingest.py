@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de ingestão no histórico: add_to_history por item vs fila em lote
+
+Uso:
+    py scripts/bench_history_ingest.py [--items 20000] [--producers 1 10 100]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_manager import ClipboardManager
+
+
+def _run(mode: str, producers: int, items: int) -> float:
+    manager = ClipboardManager()
+    # Limite máximo permitido: o benchmark inclui o descarte dos mais antigos
+    manager.set_max_history_items(1000)
+    submit = manager.add_to_history if mode == "direto" else manager.enqueue_text
+    per_producer = items // producers
+    start_gate = threading.Barrier(producers + 1)
+
+    def produce(index: int) -> None:
+        start_gate.wait()
+        for i in range(per_producer):
+            submit(f"produtor {index} cópia {i}")
+
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    manager.flush_ingest()
+    elapsed = time.perf_counter() - start
+    assert len(manager.clipboard_history) == min(per_producer * producers, 1000)
+    manager.flush_history()
+    return per_producer * producers / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    # Log INFO por item faz parte do custo medido, mas não da saída
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    with tempfile.TemporaryDirectory(prefix="dahora_bench_") as data_dir:
+        clipboard_module.HISTORY_FILE = os.path.join(data_dir, "clipboard_history.json")
+        print(f"{'produtores':>10} {'direto (itens/s)':>18} {'em lote (itens/s)':>19}")
+        for producers in args.producers:
+            direct = _run("direto", producers, args.items)
+            batched = _run("lote", producers, args.items)
+            print(f"{producers:>10} {direct:>18,.0f} {batched:>19,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória: itens do histórico como dict vs HistoryEntry
+
+Uso:
+    py scripts/bench_history_memory.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dahora_app.history_entry import HistoryEntry
+
+
+def _raw_items(count: int):
+    """Itens como chegam do JSON (strings novas para cada campo)"""
+    start = datetime(2026, 1, 1, 8, 0, 0)
+    raw = [
+        {
+            "text": f"texto copiado número {i}",
+            "timestamp": (start + timedelta(seconds=i, microseconds=i % 997)).isoformat(),
+            "app": "Dahora App",
+        }
+        for i in range(count)
+    ]
+    # Passa por json para não compartilhar strings entre itens (como na leitura real)
+    return json.loads(json.dumps(raw))
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'itens':>8} {'dict (KiB)':>12} {'HistoryEntry (KiB)':>20} {'redução':>9}")
+    for size in args.sizes:
+        as_dict = _measure(lambda: _raw_items(size))
+        as_entry = _measure(lambda: [HistoryEntry.from_dict(i) for i in _raw_items(size)])
+        print(
+            f"{size:>8} {as_dict / 1024:>12.0f} {as_entry / 1024:>20.0f} "
+            f"{(1 - as_entry / as_dict) * 100:>8.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
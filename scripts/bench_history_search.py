@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da busca no histórico: índice de trigramas vs varredura linear
+
+Também simula a digitação de uma consulta, caractere a caractere: busca
+completa no índice a cada tecla vs `IncrementalSearch` (refina o resultado
+anterior).
+
+Uso:
+    py scripts/bench_history_search.py [--items 50000] [--typed "relatório mensal"]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Adicionar raiz ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dahora_app.history_entry import HistoryEntry
+from dahora_app.history_index import IncrementalSearch, TrigramIndex, split_terms
+
+QUERIES = ["pedido", "cliente 42", "xyz", "relatório mensal", "ab", "zzzzzz"]
+
+
+def _random_text(rng: random.Random) -> str:
+    words = ["pedido", "cliente", "relatório", "mensal", "nota", "fiscal", "https://"]
+    parts = [rng.choice(words) for _ in range(rng.randint(2, 8))]
+    parts.append("".join(rng.choices(string.ascii_lowercase + string.digits, k=12)))
+    parts.append(str(rng.randint(0, 999)))
+    return " ".join(parts)
+
+
+def _linear(texts, query):
+    terms = split_terms(query)
+    return [
+        i
+        for i in range(len(texts) - 1, -1, -1)
+        if all(t in texts[i].lower() for t in terms)
+    ]
+
+
+def _time(fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--typed", default="relatório mensal")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    texts = [_random_text(rng) for _ in range(args.items)]
+
+    index = TrigramIndex()
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        index.add(i, text)
+    print(f"Indexação de {args.items} itens: {(time.perf_counter() - start):.2f}s")
+
+    print(f"{'consulta':<20} {'índice (ms)':>12} {'linear (ms)':>12}")
+    for query in QUERIES:
+        indexed = _time(lambda: index.search(query, args.limit))
+        linear = _time(lambda: _linear(texts, query)[: args.limit], repeat=3)
+        print(f"{query!r:<20} {indexed:>12.3f} {linear:>12.3f}")
+
+    # Digitação: resultados completos (sem limite), como na janela de busca
+    entries = [HistoryEntry(text) for text in texts]
+    full = lambda q: [entries[k] for k in index.search(q)]  # noqa: E731
+    incremental = IncrementalSearch(full)
+    prefixes = [args.typed[:n] for n in range(1, len(args.typed) + 1)]
+    full_ms = {p: float("inf") for p in prefixes}
+    incr_ms = {p: float("inf") for p in prefixes}
+    for _ in range(5):
+        incremental.invalidate()
+        for prefix in prefixes:
+            start = time.perf_counter()
+            full(prefix)
+            full_ms[prefix] = min(full_ms[prefix], time.perf_counter() - start)
+            start = time.perf_counter()
+            incremental.search(prefix)
+            incr_ms[prefix] = min(incr_ms[prefix], time.perf_counter() - start)
+
+    print()
+    print(f"{'digitado':<20} {'resultados':>10} {'completa (ms)':>14} {'incremental (ms)':>17}")
+    for prefix in prefixes:
+        print(
+            f"{prefix!r:<20} {len(full(prefix)):>10} {full_ms[prefix] * 1000:>14.3f} "
+            f"{incr_ms[prefix] * 1000:>17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,33 @@ import tempfile
 import shutil
 import json
 
+from dahora_app.clipboard_manager import ClipboardManager
+
+
+@pytest.fixture(autouse=True)
+def close_clipboard_managers(request, monkeypatch):
+    """
+    Encerra a persistência de todo ClipboardManager criado no teste.
+
+    A thread de persistência grava com atraso; sem o encerramento a gravação
+    pendente pode acontecer depois do teste. Quando o teste usa
+    `temp_data_dir`, o diretório só é removido depois do encerramento.
+    """
+    if "temp_data_dir" in request.fixturenames:
+        request.getfixturevalue("temp_data_dir")
+    managers = []
+    original_init = ClipboardManager.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        managers.append(self)
+
+    monkeypatch.setattr(ClipboardManager, "__init__", tracking_init)
+    yield
+    for manager in managers:
+        manager.stop_monitoring()
+        manager.close_history(2.0)
+
 
 @pytest.fixture
 def temp_data_dir():
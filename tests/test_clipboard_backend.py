@@ -0,0 +1,195 @@
+"""
+Testes para os backends de clipboard e a detecção de mudanças do monitor
+"""
+import os
+import threading
+import time
+
+import pytest
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_backend import (
+    MemoryClipboardBackend,
+    WindowsClipboardBackend,
+)
+from dahora_app.clipboard_manager import ClipboardManager
+
+
+class _FakeUser32:
+    def __init__(self, sequence):
+        self.sequence = sequence
+
+    def GetClipboardSequenceNumber(self):
+        return self.sequence
+
+
+class TestBackends:
+    """Testa os backends isoladamente"""
+
+    def test_memory_backend_token_changes_on_write(self):
+        backend = MemoryClipboardBackend("inicial")
+        token = backend.change_token()
+        assert backend.change_token() == token
+        backend.write_text("novo")
+        assert backend.change_token() != token
+        assert backend.read_text() == "novo"
+
+    def test_windows_backend_uses_sequence_number(self):
+        user32 = _FakeUser32(42)
+        backend = WindowsClipboardBackend(user32)
+        assert backend.change_token() == 42
+        user32.sequence = 0
+        assert backend.change_token() is None
+
+
+class TestMonitorPolling:
+    """Testa o polling do monitor com o clipboard em memória"""
+
+    @pytest.fixture
+    def make_manager(self, monkeypatch, temp_data_dir):
+        monkeypatch.setattr(
+            clipboard_module,
+            "HISTORY_FILE",
+            os.path.join(temp_data_dir, "clipboard_history.json"),
+        )
+        managers = []
+
+        def _make(backend):
+            manager = ClipboardManager()
+            manager.set_clipboard_backend(backend)
+            manager.initialize_last_content()
+            managers.append(manager)
+            return manager
+
+        yield _make
+        # Grava o pendente ainda no diretório temporário
+        for manager in managers:
+            manager.close_history()
+
+    def test_reads_text_only_when_token_changes(self, make_manager):
+        backend = MemoryClipboardBackend("inicial")
+        manager = make_manager(backend)
+        reads = backend.reads
+
+        for _ in range(50):
+            assert manager._poll_clipboard_once() is False
+        assert backend.reads == reads
+
+        backend.write_text("copiado por outro app")
+        assert manager._poll_clipboard_once() is True
+        assert backend.reads == reads + 1
+        # A cópia entra pela fila de ingestão em lote
+        assert manager.flush_ingest(2.0)
+        assert [i["text"] for i in manager.clipboard_history] == [
+            "copiado por outro app"
+        ]
+
+    def test_burst_of_copies_goes_through_ingest_queue(self, make_manager):
+        backend = MemoryClipboardBackend()
+        manager = make_manager(backend)
+        batches = []
+        add_many = manager.add_many
+        manager.add_many = lambda texts: batches.append(list(texts)) or add_many(texts)
+
+        for i in range(20):
+            backend.write_text(f"cópia {i}")
+            assert manager._poll_clipboard_once() is True
+        assert manager.flush_ingest(2.0)
+
+        assert [i["text"] for i in manager.clipboard_history] == [
+            f"cópia {i}" for i in range(20)
+        ]
+        assert sum(len(b) for b in batches) == 20
+
+    def test_same_text_rewritten_is_not_duplicated(self, make_manager):
+        backend = MemoryClipboardBackend("igual")
+        manager = make_manager(backend)
+
+        backend.write_text("igual")
+        assert manager._poll_clipboard_once() is False
+        assert len(manager.clipboard_history) == 0
+
+    def test_paused_tracks_content_without_history(self, make_manager):
+        backend = MemoryClipboardBackend()
+        manager = make_manager(backend)
+        manager.paused = True
+
+        backend.write_text("durante a pausa")
+        assert manager._poll_clipboard_once() is False
+        manager.paused = False
+        assert manager._poll_clipboard_once() is False
+        assert manager.last_clipboard_content == "durante a pausa"
+        assert len(manager.clipboard_history) == 0
+
+    def test_copy_text_goes_through_backend(self, make_manager):
+        backend = MemoryClipboardBackend()
+        manager = make_manager(backend)
+        manager.copy_text("via backend")
+        assert backend.read_text() == "via backend"
+        assert manager.paste_text() == "via backend"
+
+
+class TestMonitorWakeup:
+    """Testa a espera interrompível do loop do monitor"""
+
+    @pytest.fixture
+    def start(self, monkeypatch, temp_data_dir):
+        monkeypatch.setattr(
+            clipboard_module,
+            "HISTORY_FILE",
+            os.path.join(temp_data_dir, "clipboard_history.json"),
+        )
+        managers = []
+
+        def _start(backend, **kwargs):
+            manager = ClipboardManager()
+            manager.set_clipboard_backend(backend)
+            # Sem burst: só o aviso (ou o encerramento) acorda o monitor a tempo
+            manager.set_monitoring_config(30.0, 300.0, burst_window_s=0, jitter=0)
+            changed = threading.Event()
+            thread = threading.Thread(
+                target=manager.monitor_clipboard_smart,
+                kwargs=dict(on_change_callback=changed.set, **kwargs),
+                daemon=True,
+            )
+            thread.start()
+            managers.append(manager)
+            return manager, thread, changed
+
+        yield _start
+        for manager in managers:
+            manager.stop_monitoring()
+            manager.close_history()
+
+    def test_notify_picks_up_change_immediately(self, start):
+        backend = MemoryClipboardBackend("inicial")
+        manager, thread, changed = start(backend)
+        # Dá tempo do monitor ler o conteúdo inicial e entrar na espera
+        time.sleep(0.1)
+
+        backend.write_text("copiado")
+        manager.notify_clipboard_changed()
+        assert changed.wait(2)
+        assert manager.clipboard_history[-1]["text"] == "copiado"
+
+        manager.stop_monitoring()
+        thread.join(2)
+        assert not thread.is_alive()
+
+    def test_stop_while_paused(self, start):
+        backend = MemoryClipboardBackend()
+        manager, thread, _ = start(backend)
+        manager.toggle_pause()
+        time.sleep(0.05)
+        manager.stop_monitoring()
+        thread.join(2)
+        assert not thread.is_alive()
+
+    def test_should_stop_ends_loop(self, start):
+        stop = threading.Event()
+        backend = MemoryClipboardBackend()
+        manager, thread, _ = start(backend, should_stop=stop.is_set)
+        stop.set()
+        manager.notify_clipboard_changed()
+        thread.join(2)
+        assert not thread.is_alive()
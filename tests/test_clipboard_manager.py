@@ -1,8 +1,12 @@
+import json
 import os
+import threading
+import time
 from unittest.mock import MagicMock
 
 import dahora_app.clipboard_manager as clipboard_module
 from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.history_crypto import PortableBackend
 
 
 def test_load_history_legacy_migrates_and_sanitizes(
@@ -83,3 +87,557 @@ def test_load_history_disables_writes_on_decrypt_error(
     assert manager.clipboard_history == []
     assert manager._history_write_disabled is True
     assert "decrypt failed" in (manager._history_write_disabled_reason or "")
+
+
+def _portable_manager(temp_data_dir):
+    manager = ClipboardManager()
+    manager.set_encryption_backend(
+        PortableBackend(os.path.join(temp_data_dir, "history.key"))
+    )
+    return manager
+
+
+def test_save_history_appends_journal_after_first_snapshot(
+    monkeypatch, temp_data_dir
+):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.add_to_history("primeiro")
+    manager.save_history()  # primeiro save grava snapshot com a chave de dados
+    manager.add_to_history("segundo")
+    manager.add_to_history("terceiro")
+    manager.save_history()
+
+    with open(history_path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert snapshot["version"] == 2
+    assert len(snapshot["items"]) == 1
+    assert "primeiro" not in json.dumps(snapshot)
+    with open(history_path + ".journal", "r", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert [i["text"] for i in reloaded.clipboard_history] == [
+        "primeiro",
+        "segundo",
+        "terceiro",
+    ]
+
+
+def test_journal_compacts_into_snapshot(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager._journal_compact_threshold = 3
+    for i in range(5):
+        manager.add_to_history(f"item {i}")
+        manager.save_history()
+
+    assert os.path.exists(history_path)
+    assert manager._get_journal().record_count <= 3
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert [i["text"] for i in reloaded.clipboard_history] == [
+        f"item {i}" for i in range(5)
+    ]
+
+
+def test_clear_history_discards_journal(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.add_to_history("segredo")
+    manager.save_history()
+    manager.clear_history()
+
+    assert not os.path.exists(history_path + ".journal")
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert reloaded.clipboard_history == []
+
+
+def test_snapshot_reuses_sealed_items(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.add_to_history("a")
+    manager.add_to_history("b")
+    manager.flush_history()
+    with open(history_path, "r", encoding="utf-8") as f:
+        first = json.load(f)["items"]
+
+    manager.add_to_history("c")
+    manager._snapshot_required = True
+    manager.flush_history()
+    with open(history_path, "r", encoding="utf-8") as f:
+        second = json.load(f)["items"]
+
+    # Itens já selados não são re-criptografados na compactação
+    assert second[:2] == first
+    assert len(second) == 3
+
+
+def test_load_history_disables_writes_on_backend_mismatch(
+    monkeypatch, create_test_json_file, temp_data_dir
+):
+    raw = {"version": 2, "backend": "dpapi", "key": "AAAA", "items": []}
+    history_path = create_test_json_file("clipboard_history.json", raw)
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.load_history()
+
+    assert manager.clipboard_history == []
+    assert manager._history_write_disabled is True
+
+
+def test_search_uses_index_and_follows_eviction(monkeypatch, temp_data_dir):
+    monkeypatch.setattr(
+        clipboard_module, "HISTORY_FILE", os.path.join(temp_data_dir, "h.json")
+    )
+    manager = _portable_manager(temp_data_dir)
+    manager.set_max_history_items(10)
+    for i in range(12):
+        manager.add_to_history(f"pedido #{i:02d} cliente")
+    manager.add_to_history("outro texto")
+
+    results = manager.search("cliente pedido")
+    assert [r["text"] for r in results][:2] == [
+        "pedido #11 cliente",
+        "pedido #10 cliente",
+    ]
+    # Itens descartados pelo limite saem do índice
+    assert manager.search("#02") == []
+    assert len(manager.search("#03 cliente")) == 1
+    assert len(manager.search("")) == 10
+
+
+def test_set_max_history_items_shrinks_incrementally(monkeypatch, temp_data_dir):
+    monkeypatch.setattr(
+        clipboard_module, "HISTORY_FILE", os.path.join(temp_data_dir, "h.json")
+    )
+    manager = _portable_manager(temp_data_dir)
+    manager.set_max_history_items(20)
+    for i in range(20):
+        manager.add_to_history(f"item {i:02d}")
+
+    manager.set_max_history_items(10)
+
+    assert len(manager.clipboard_history) == 10
+    assert manager.get_recent_items(2) == list(manager.clipboard_history)[-2:]
+    assert len(manager._history_key_counts) == 10
+    assert manager.search("item 05") == []
+    # Item descartado pode voltar ao histórico
+    manager.add_to_history("item 05")
+    assert manager.get_recent_items(1)[0]["text"] == "item 05"
+
+
+def test_add_to_history_returns_entry_and_skips_duplicates(monkeypatch):
+    manager = ClipboardManager()
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+
+    entry = manager.add_to_history("  texto  ")
+    assert entry is not None
+    assert entry.text == "texto"
+    assert manager.add_to_history("texto") is None
+    assert len(manager.clipboard_history) == 1
+
+
+def test_add_many_schedules_one_save_per_batch(monkeypatch):
+    manager = ClipboardManager()
+    manager.max_history_items = 3
+    manager.clipboard_history.resize(3)
+    saves = []
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: saves.append(1))
+    manager.add_to_history("a")
+
+    added = manager.add_many(["b", "  ", "a", "c", "b", "d", "e"])
+
+    assert [e.text for e in added] == ["b", "c", "d", "e"]
+    assert [i["text"] for i in manager.clipboard_history] == ["c", "d", "e"]
+    assert set(manager._items_by_key) == {"c", "d", "e"}
+    assert len(saves) == 2
+    assert manager.add_many(["c", ""]) == []
+    assert len(saves) == 2
+
+
+def test_enqueue_text_coalesces_into_add_many(monkeypatch):
+    manager = ClipboardManager()
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+    batches = []
+    original = manager.add_many
+
+    def spy(texts):
+        batches.append(list(texts))
+        return original(texts)
+
+    monkeypatch.setattr(manager, "add_many", spy)
+    for i in range(20):
+        manager.enqueue_text(f"rajada {i}")
+    assert manager.flush_ingest(2)
+
+    assert sum(len(b) for b in batches) == 20
+    assert len(batches) < 20
+    assert [i["text"] for i in manager.clipboard_history] == [
+        f"rajada {i}" for i in range(20)
+    ]
+
+
+def test_background_writer_persists_without_timer_threads(
+    monkeypatch, temp_data_dir
+):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.set_persistence_config(50, 1000)
+    before = threading.active_count()
+    for i in range(30):
+        manager.add_to_history(f"item {i}")
+    # Uma única thread de gravação, reaproveitada entre as janelas
+    assert threading.active_count() <= before + 1
+    assert manager.close_history(timeout=2)
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert len(reloaded.clipboard_history) == 30
+
+
+def test_tray_reads_do_not_wait_for_slow_snapshot_write(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = _portable_manager(temp_data_dir)
+    for i in range(50):
+        manager.add_to_history(f"item {i}")
+
+    writing = threading.Event()
+    release = threading.Event()
+    original_write = clipboard_module.atomic_write_json
+
+    def slow_write(path, payload):
+        writing.set()
+        release.wait(5)
+        original_write(path, payload)
+
+    monkeypatch.setattr(clipboard_module, "atomic_write_json", slow_write)
+    saver = threading.Thread(target=manager.save_history)
+    saver.start()
+    try:
+        assert writing.wait(5)
+        # Leituras terminam enquanto a gravação continua bloqueada
+        reads_done = threading.Event()
+
+        def read_tray():
+            for _ in range(200):
+                manager.get_recent_items(5)
+            reads_done.set()
+
+        reader = threading.Thread(target=read_tray)
+        reader.start()
+        assert reads_done.wait(5)
+        assert saver.is_alive()
+        reader.join(5)
+        # Novas cópias também não esperam a gravação
+        assert manager.add_to_history("durante a gravação") is not None
+        assert not manager._is_own_content("durante a gravação")
+    finally:
+        release.set()
+        saver.join(5)
+
+    manager.flush_history()
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert reloaded.clipboard_history[-1]["text"] == "durante a gravação"
+    assert len(reloaded.clipboard_history) == 51
+
+
+def test_size_budget_evicts_oldest_and_tracks_total(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = _portable_manager(temp_data_dir)
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+    manager.set_retention_limits(3000, 2000)
+
+    for i in range(5):
+        manager.add_to_history(f"{i}" * 1000)
+    assert [i["text"][0] for i in manager.clipboard_history] == ["2", "3", "4"]
+    assert manager._history_chars == 3000
+
+    # Acima do limite por item: não entra
+    assert manager.add_to_history("x" * 2001) is None
+    assert manager._history_chars == 3000
+
+    manager.set_max_history_items(10)
+    manager.add_to_history("curto")
+    assert manager._history_chars == sum(i.size for i in manager.clipboard_history)
+    assert manager._history_chars <= 3000
+
+    manager.set_retention_limits(1024, 2000)
+    assert [i["text"][0] for i in manager.clipboard_history] == ["4", "c"]
+    assert set(manager._items_by_key) == {"4" * 1000, "curto"}
+    assert manager._history_chars == 1005
+
+    manager.clear_history()
+    assert manager._history_chars == 0
+
+
+def test_size_budget_applies_on_load(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    for i in range(4):
+        manager.add_to_history(f"{i}" * 1000)
+    manager.flush_history()
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.set_retention_limits(2500, 2000)
+    reloaded.load_history()
+    assert [i["text"][0] for i in reloaded.clipboard_history] == ["2", "3"]
+    assert reloaded._history_chars == 2000
+    assert manager.close_history(2.0)
+    assert reloaded.close_history(2.0)
+
+
+def test_large_text_spills_to_blob(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.set_inline_limit(clipboard_module.BLOB_PREVIEW_CHARS)
+    big = "registro de log\n" * 2000
+    entry = manager.add_to_history(big)
+
+    assert entry.blob and entry.size == len(big.strip())
+    assert len(entry.text) == clipboard_module.BLOB_PREVIEW_CHARS
+    assert manager.add_to_history(big) is None
+    assert manager.load_text(entry) == big.strip()
+    manager.flush_history()
+    with open(history_path, "r", encoding="utf-8") as f:
+        assert len(f.read()) < len(big)
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert reloaded.load_text(reloaded.get_recent_items(1)[0]) == big.strip()
+
+    reloaded.clear_history()
+    assert os.listdir(os.path.join(temp_data_dir, "history_blobs")) == ["key.json"]
+
+
+def test_load_history_tail_first_then_background(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    for i in range(20):
+        manager.add_to_history(f"item {i:02d}")
+    manager.flush_history()
+
+    reloaded = _portable_manager(temp_data_dir)
+    started = threading.Event()
+    release = threading.Event()
+    original_open = reloaded._open_deferred
+
+    def slow_open(sealed_items):
+        started.set()
+        release.wait(5)
+        return original_open(sealed_items)
+
+    monkeypatch.setattr(reloaded, "_open_deferred", slow_open)
+    reloaded.load_history(tail_items=3)
+
+    assert started.wait(5)
+    assert not reloaded.history_ready.is_set()
+    assert [i["text"] for i in reloaded.get_recent_items(10)] == [
+        "item 17",
+        "item 18",
+        "item 19",
+    ]
+    # Gravação durante a carga tardia não pode perder os itens antigos
+    reloaded.add_to_history("novo")
+    reloaded._snapshot_required = True
+    reloaded.flush_history()
+
+    release.set()
+    assert reloaded.wait_until_loaded(5)
+    texts = [i["text"] for i in reloaded.clipboard_history]
+    assert texts == [f"item {i:02d}" for i in range(20)] + ["novo"]
+    assert reloaded.search("item 05")[0]["text"] == "item 05"
+
+    reloaded.flush_history()
+    final = _portable_manager(temp_data_dir)
+    final.load_history()
+    assert len(final.clipboard_history) == 21
+
+
+def test_removed_item_outside_tail_stays_removed(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = _portable_manager(temp_data_dir)
+    for i in range(10):
+        manager.add_to_history(f"item{i}")
+    manager.flush_history()  # snapshot
+    assert manager.remove(["item1", "item8"]) == 2
+    manager.flush_history()  # registros "del" no journal
+
+    expected = [f"item{i}" for i in (0, 2, 3, 4, 5, 6, 7, 9)]
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history(tail_items=5)
+    assert reloaded.wait_until_loaded(5)
+    assert [i["text"] for i in reloaded.clipboard_history] == expected
+
+    # O snapshot seguinte também não traz item1 de volta
+    reloaded._snapshot_required = True
+    reloaded.flush_history()
+    final = _portable_manager(temp_data_dir)
+    final.load_history()
+    assert [i["text"] for i in final.clipboard_history] == expected
+
+
+def test_expiry_removes_due_items_incrementally(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    manager.set_expiry_policy(3600, [(r"^senha", 60), (r"^fixo", 0)])
+    for text in ("nota", "senha 123", "fixo"):
+        manager.add_to_history(text)
+    manager.flush_history()  # snapshot inicial
+    manager.add_to_history("senha 456")
+    manager.flush_history()
+
+    removed = []
+    manager.set_on_items_removed_callback(removed.extend)
+    now = time.time()
+    assert manager.expire_due(now + 120) == 2
+    assert [i.text for i in removed] == ["senha 123", "senha 456"]
+    assert [i["text"] for i in manager.clipboard_history] == ["nota", "fixo"]
+    assert manager.search("senha") == []
+
+    snapshot_before = os.path.getmtime(history_path)
+    manager.flush_history()
+    # Remoção vai para o journal, sem regravar o snapshot
+    assert os.path.getmtime(history_path) == snapshot_before
+    with open(history_path + ".journal", "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["op"] for r in records] == ["add", "del", "del"]
+    assert "senha" not in json.dumps(records)
+
+    # Copiado de novo depois de expirar: volta ao histórico após o reload
+    manager.add_to_history("senha 123")
+    manager.flush_history()
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert [i["text"] for i in reloaded.clipboard_history] == [
+        "nota",
+        "fixo",
+        "senha 123",
+    ]
+
+    assert manager.expire_due(now + 7200) == 2
+    assert [i["text"] for i in manager.clipboard_history] == ["fixo"]
+
+
+def test_search_ignores_case_and_accents(monkeypatch):
+    manager = ClipboardManager()
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+    for text in ("Reunião de AÇÃO", "acao rapida", "nada a ver"):
+        manager.add_to_history(text)
+    assert [i.text for i in manager.search("acao")] == [
+        "acao rapida",
+        "Reunião de AÇÃO",
+    ]
+    assert [i.text for i in manager.search("reuniao Ação")] == ["Reunião de AÇÃO"]
+    # Normalização calculada na inclusão e reaproveitada pelo índice
+    item = manager.clipboard_history[0]
+    assert item._search_key == "reuniao de acao"
+    assert manager.clipboard_history[1].search_key is manager.clipboard_history[1].text
+
+
+def test_remove_by_id_and_predicate(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+    manager = _portable_manager(temp_data_dir)
+    for text in ("a", "bb", "ccc", "dddd", "eeeee"):
+        manager.add_to_history(text)
+    manager.flush_history()  # snapshot inicial
+    manager.add_to_history("ffffff")  # ainda não gravado
+
+    removed = []
+    manager.set_on_items_removed_callback(removed.extend)
+    keys = [i.key for i in manager.clipboard_history if i.text in ("bb", "ffffff")]
+    assert manager.remove(keys + keys + ["desconhecido"]) == 2
+    assert sorted(i.text for i in removed) == ["bb", "ffffff"]
+    assert manager.remove_where(lambda item: len(item.text) >= 4) == 2
+    assert manager.remove_where(lambda item: False) == 0
+    assert [i["text"] for i in manager.clipboard_history] == ["a", "ccc"]
+    assert manager._history_chars == 4
+    assert manager.search("dddd") == []
+
+    snapshot_before = os.path.getmtime(history_path)
+    manager.flush_history()
+    assert os.path.getmtime(history_path) == snapshot_before
+    with open(history_path + ".journal", "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    # Só os itens já gravados viram "del"; o não gravado nem chega ao journal
+    assert [r["op"] for r in records] == ["del", "del", "del"]
+
+    reloaded = _portable_manager(temp_data_dir)
+    reloaded.load_history()
+    assert [i["text"] for i in reloaded.clipboard_history] == ["a", "ccc"]
+
+
+def test_expiry_thread_removes_item_without_polling(monkeypatch):
+    manager = ClipboardManager()
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+    expired = threading.Event()
+    manager.set_on_items_removed_callback(lambda items: expired.set())
+    manager.set_expiry_policy(0.05)
+
+    manager.add_to_history("token temporário")
+    assert expired.wait(2.0)
+    assert manager.clipboard_history == []
+    assert manager._history_chars == 0
+    assert manager.close_history(1.0)
+
+
+def test_fuzzy_search_tolerates_typos_and_prefers_reused(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = _portable_manager(temp_data_dir)
+    monkeypatch.setattr(manager, "_schedule_save_locked", lambda: None)
+    for text in ("Relatório antigo", "Relatório reutilizado", "Relatório novo", "Outro"):
+        manager.add_to_history(text)
+    manager.add_to_history("Relatório reutilizado")  # cópia repetida conta como reuso
+
+    assert manager.search("relatrio") == []
+    found = [i.text for i in manager.search("relatrio", fuzzy=True)]
+    assert found == ["Relatório reutilizado", "Relatório novo", "Relatório antigo"]
+    assert len(manager.search("relatrio", limit=1, fuzzy=True)) == 1
+
+    manager.clear_history()
+    assert manager.search("relatrio", fuzzy=True) == []
+
+
+def test_paths_are_fixed_at_construction(monkeypatch, temp_data_dir):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = _portable_manager(temp_data_dir)
+
+    other_dir = os.path.join(temp_data_dir, "outro")
+    monkeypatch.setattr(
+        clipboard_module, "HISTORY_FILE", os.path.join(other_dir, "h.json")
+    )
+    manager.add_to_history("gravado no lugar original")
+    assert manager.close_history(2.0)
+
+    assert os.path.exists(history_path)
+    assert not os.path.exists(other_dir)
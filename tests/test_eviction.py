@@ -0,0 +1,138 @@
+"""
+Testes para as políticas de descarte do histórico
+"""
+import os
+
+import pytest
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.eviction import LfuPolicy, LruPolicy, create_eviction_policy
+from dahora_app.history_crypto import PortableBackend
+
+
+class TestPolicies:
+    """Testa as políticas isoladamente"""
+
+    def test_fifo_ignores_hits(self):
+        policy = create_eviction_policy("fifo")
+        for key in "abc":
+            policy.insert(key)
+        policy.hit("a")
+        assert policy.victim() == "a"
+        policy.remove("a")
+        assert policy.victim() == "b"
+
+    def test_lru_moves_hit_to_end(self):
+        policy = LruPolicy()
+        for key in "abc":
+            policy.insert(key)
+        policy.hit("a")
+        assert policy.victim() == "b"
+        policy.remove("b")
+        assert policy.victim() == "c"
+
+    def test_lfu_evicts_least_frequent_then_oldest(self):
+        policy = LfuPolicy()
+        for key in "abc":
+            policy.insert(key)
+        policy.hit("a")
+        policy.hit("a")
+        policy.hit("b")
+        assert policy.victim() == "c"
+        policy.remove("c")
+        assert policy.victim() == "b"
+        # Remoção fora da ordem esvazia o menor balde: mínimo recalculado
+        policy.remove("b")
+        assert policy.victim() == "a"
+        assert policy.frequency("a") == 3
+
+    def test_lfu_rebuild_keeps_known_frequencies(self):
+        policy = LfuPolicy()
+        policy.insert("a")
+        policy.hit("a")
+        policy.rebuild(["x", "a", "y"])
+        assert len(policy) == 3
+        assert policy.frequency("a") == 2
+        assert policy.victim() == "x"
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            create_eviction_policy("arc")
+
+
+def _manager(monkeypatch, temp_data_dir, policy):
+    history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+    monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+    manager = ClipboardManager()
+    manager.set_encryption_backend(
+        PortableBackend(os.path.join(temp_data_dir, "history.key"))
+    )
+    manager.set_max_history_items(10)
+    manager.set_eviction_policy(policy)
+    return manager
+
+
+class TestManagerEviction:
+    """Testa o descarte pelo ClipboardManager"""
+
+    def test_fifo_keeps_previous_behavior(self, monkeypatch, temp_data_dir):
+        manager = _manager(monkeypatch, temp_data_dir, "fifo")
+        for i in range(10):
+            manager.add_to_history(f"item {i}")
+        assert manager.add_to_history("item 0") is None
+        manager.add_to_history("novo")
+        assert manager.clipboard_history[0]["text"] == "item 1"
+
+    def test_lru_recopy_moves_to_top_and_persists(self, monkeypatch, temp_data_dir):
+        manager = _manager(monkeypatch, temp_data_dir, "lru")
+        for i in range(10):
+            manager.add_to_history(f"item {i}")
+        manager.flush_history()
+
+        again = manager.add_to_history("item 0")
+        assert again is not None
+        assert manager.clipboard_history[-1] is again
+        assert len(manager.clipboard_history) == 10
+        manager.add_to_history("novo")
+        assert [i["text"] for i in manager.clipboard_history][:1] == ["item 2"]
+        assert manager.search("item 0")[0] is again
+        manager.flush_history()
+
+        reloaded = _manager(monkeypatch, temp_data_dir, "lru")
+        reloaded.load_history()
+        assert [i["text"] for i in reloaded.clipboard_history][-2:] == [
+            "item 0",
+            "novo",
+        ]
+        assert reloaded.clipboard_history[-2]["timestamp"] == again.timestamp
+
+    def test_lfu_keeps_frequent_snippet(self, monkeypatch, temp_data_dir):
+        manager = _manager(monkeypatch, temp_data_dir, "lfu")
+        manager.add_to_history("assinatura")
+        manager.add_to_history("assinatura")
+        for i in range(30):
+            manager.add_to_history(f"avulso {i}")
+        texts = [i["text"] for i in manager.clipboard_history]
+        assert "assinatura" in texts
+        assert len(texts) == 10
+        assert manager._history_chars == sum(len(t) for t in texts)
+
+    @pytest.mark.parametrize("policy", ["lru", "lfu"])
+    def test_reload_matches_live_history(self, monkeypatch, temp_data_dir, policy):
+        manager = _manager(monkeypatch, temp_data_dir, policy)
+        manager.add_to_history("A")
+        manager.add_to_history("A")
+        for i in range(9):
+            manager.add_to_history(f"x{i}")
+        manager.flush_history()
+        # Cheio: o LFU descarta x0, que não é o mais antigo
+        manager.add_to_history("x9")
+        manager.flush_history()
+        live = [i["text"] for i in manager.clipboard_history]
+
+        reloaded = _manager(monkeypatch, temp_data_dir, policy)
+        reloaded.load_history()
+        assert [i["text"] for i in reloaded.clipboard_history] == live
+        if policy == "lfu":
+            assert live == ["A"] + [f"x{i}" for i in range(1, 10)]
@@ -0,0 +1,77 @@
+"""
+Testes para o conjunto com expiração (conteúdo colado pelo próprio app)
+"""
+from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.expiring_set import ExpiringSet
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestExpiringSet:
+    """Testa inclusão, renovação e expiração"""
+
+    def test_membership_ends_after_ttl(self):
+        clock = _Clock()
+        keys = ExpiringSet(clock)
+        keys.add("a", 2.0)
+        assert "a" in keys
+        clock.now += 1.9
+        assert "a" in keys
+        clock.now += 0.2
+        assert "a" not in keys
+
+    def test_expire_removes_only_due_keys(self):
+        clock = _Clock()
+        keys = ExpiringSet(clock)
+        keys.add("curto", 1.0)
+        keys.add("longo", 10.0)
+        clock.now += 5
+        assert keys.expire() == 1
+        assert len(keys) == 1
+        assert "longo" in keys
+
+    def test_renewal_survives_old_heap_entry(self):
+        clock = _Clock()
+        keys = ExpiringSet(clock)
+        keys.add("a", 1.0)
+        clock.now += 0.5
+        keys.add("a", 5.0)
+        clock.now += 1.0
+        assert keys.expire() == 0
+        assert "a" in keys
+
+    def test_pop_expired_returns_keys_in_deadline_order(self):
+        clock = _Clock()
+        keys = ExpiringSet(clock)
+        keys.add_at("b", 105.0)
+        keys.add_at("a", 103.0)
+        keys.add_at("c", 200.0)
+        keys.discard("c")
+        assert keys.next_expiry() == 103.0
+        assert keys.pop_expired(110.0) == ["a", "b"]
+        assert keys.next_expiry() is None
+        assert len(keys) == 0
+
+    def test_heap_stays_bounded_under_renewals(self):
+        clock = _Clock()
+        keys = ExpiringSet(clock)
+        for _ in range(10_000):
+            keys.add("mesmo", 60.0)
+        assert len(keys) == 1
+        assert len(keys._heap) <= 2 * len(keys) + 17
+
+
+def test_own_content_is_keyed_by_fingerprint():
+    manager = ClipboardManager()
+    big = "x" * 1_000_000
+    manager.mark_own_content(big)
+    # Outro objeto str com o mesmo conteúdo também é reconhecido
+    assert manager._is_own_content("".join(["x"] * 1_000_000))
+    assert not manager._is_own_content("outro")
+    assert all(not isinstance(k, str) for k in manager._own_content._expiry)
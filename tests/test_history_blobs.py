@@ -0,0 +1,90 @@
+"""
+Testes para os blobs de conteúdos grandes do histórico
+"""
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+import dahora_app.history_blobs as blobs_module
+from dahora_app.history_blobs import BlobStore, stream_digest
+from dahora_app.history_crypto import PortableBackend
+
+
+def _store(temp_data_dir):
+    return BlobStore(
+        os.path.join(temp_data_dir, "blobs"),
+        PortableBackend(os.path.join(temp_data_dir, "history.key")),
+    )
+
+
+class TestBlobStore:
+    """Testa gravação em blocos, leitura e coleta"""
+
+    def test_stream_digest_matches_sha256(self):
+        text = "ação " * 1000
+        assert stream_digest(text, chunk_chars=7) == hashlib.sha256(
+            text.encode("utf-8")
+        ).hexdigest()
+
+    def test_roundtrip_in_chunks(self, temp_data_dir):
+        store = _store(temp_data_dir)
+        text = "linha de log ✓\n" * 500
+        blob_id = stream_digest(text)
+        store.write(blob_id, text, chunk_chars=100)
+        assert text not in open(store.path_for(blob_id), "rb").read().decode(
+            "latin-1"
+        )
+        # Nova instância relê a chave de dados do diretório
+        assert _store(temp_data_dir).read(blob_id) == text
+
+    def test_tampered_chunk_rejected(self, temp_data_dir):
+        store = _store(temp_data_dir)
+        text = "x" * 1000
+        blob_id = stream_digest(text)
+        store.write(blob_id, text, chunk_chars=100)
+        path = store.path_for(blob_id)
+        data = bytearray(open(path, "rb").read())
+        data[-1] ^= 0x01
+        open(path, "wb").write(bytes(data))
+        with pytest.raises(ValueError):
+            store.read(blob_id)
+
+    def test_collect_removes_unreferenced(self, temp_data_dir):
+        store = _store(temp_data_dir)
+        ids = []
+        for text in ("a" * 10, "b" * 10):
+            ids.append(stream_digest(text))
+            store.write(ids[-1], text)
+        assert store.collect([ids[0]]) == 1
+        assert store.ids() == {ids[0]}
+
+    def test_concurrent_writes_share_one_key(self, temp_data_dir, monkeypatch):
+        generate = blobs_module.EnvelopeCipher.generate
+        created = []
+
+        def slow_generate():
+            created.append(1)
+            time.sleep(0.05)  # alarga a janela entre verificar e criar a chave
+            return generate()
+
+        monkeypatch.setattr(blobs_module.EnvelopeCipher, "generate", slow_generate)
+        store = _store(temp_data_dir)
+        texts = [f"conteúdo grande {i}" * 50 for i in range(6)]
+        barrier = threading.Barrier(len(texts))
+
+        def write(text):
+            barrier.wait()
+            store.write(stream_digest(text), text)
+
+        threads = [threading.Thread(target=write, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(created) == 1
+        reopened = _store(temp_data_dir)
+        assert [reopened.read(stream_digest(t)) for t in texts] == texts
@@ -0,0 +1,67 @@
+"""
+Testes para o buffer circular do histórico
+"""
+from dahora_app.history_buffer import HistoryBuffer
+
+
+def _items(*texts):
+    return [{"text": t} for t in texts]
+
+
+class TestHistoryBuffer:
+    """Testa inclusão, descarte e redimensionamento"""
+
+    def test_initial_items_keep_most_recent(self):
+        buf = HistoryBuffer(_items("a", "b", "c"), maxlen=2)
+        assert buf == _items("b", "c")
+
+    def test_append_returns_evicted(self):
+        buf = HistoryBuffer(maxlen=2)
+        assert buf.append({"text": "a"}) is None
+        assert buf.append({"text": "b"}) is None
+        assert buf.append({"text": "c"}) == {"text": "a"}
+        assert len(buf) == 2
+
+    def test_resize_shrink_returns_only_removed(self):
+        buf = HistoryBuffer(_items("a", "b", "c", "d"), maxlen=4)
+        assert buf.resize(2) == _items("a", "b")
+        assert buf == _items("c", "d")
+
+    def test_resize_grow_keeps_items(self):
+        buf = HistoryBuffer(_items("a", "b"), maxlen=2)
+        assert buf.resize(5) == []
+        buf.append({"text": "c"})
+        assert buf == _items("a", "b", "c")
+
+    def test_remove_items_by_identity_anywhere(self):
+        items = _items("a", "b", "c", "d")
+        buf = HistoryBuffer(items, maxlen=10)
+        assert buf.remove_items([items[2], items[0]]) == _items("c", "a")
+        assert buf == _items("b", "d")
+        # Igual em conteúdo, mas outro objeto: não remove
+        assert buf.remove_items([{"text": "b"}]) == []
+        assert len(buf) == 2
+
+    def test_move_to_end_and_index_access(self):
+        items = _items("a", "b", "c")
+        buf = HistoryBuffer(items, maxlen=3)
+        buf.move_to_end(items[0])
+        assert buf == _items("b", "c", "a")
+        assert buf.popleft() == {"text": "b"}
+        assert buf[0] == {"text": "c"}
+        assert buf[-1] == {"text": "a"}
+
+    def test_recent(self):
+        buf = HistoryBuffer(_items("a", "b", "c"), maxlen=10)
+        assert buf.recent(2) == _items("b", "c")
+        assert buf.recent(10) == _items("a", "b", "c")
+        assert buf.recent(0) == []
+
+    def test_sequence_protocol(self):
+        buf = HistoryBuffer(_items("a", "b", "c"), maxlen=10)
+        assert [i["text"] for i in reversed(buf)] == ["c", "b", "a"]
+        assert buf[-1] == {"text": "c"}
+        assert buf[:2] == _items("a", "b")
+        buf.clear()
+        assert not buf
+        assert buf == []
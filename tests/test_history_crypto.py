@@ -0,0 +1,74 @@
+"""
+Testes para criptografia do histórico (envelope encryption)
+"""
+import os
+
+import pytest
+
+from dahora_app.history_crypto import (
+    EnvelopeCipher,
+    PortableBackend,
+    open_sealed,
+    seal,
+)
+
+
+class TestSeal:
+    """Testa seal/open_sealed (AES-GCM)"""
+
+    def test_roundtrip(self):
+        key = os.urandom(32)
+        blob = seal(key, "ação ✓".encode("utf-8"), b"aad")
+        assert open_sealed(key, blob, b"aad").decode("utf-8") == "ação ✓"
+
+    def test_empty_plaintext(self):
+        key = os.urandom(32)
+        assert open_sealed(key, seal(key, b"")) == b""
+
+    def test_tampered_blob_rejected(self):
+        key = os.urandom(32)
+        blob = bytearray(seal(key, b"segredo"))
+        blob[-1] ^= 0x01
+        with pytest.raises(ValueError):
+            open_sealed(key, bytes(blob))
+
+    def test_wrong_aad_rejected(self):
+        key = os.urandom(32)
+        blob = seal(key, b"segredo", b"a")
+        with pytest.raises(ValueError):
+            open_sealed(key, blob, b"b")
+
+    def test_nonce_is_random(self):
+        key = os.urandom(32)
+        assert seal(key, b"x") != seal(key, b"x")
+
+    def test_unknown_algorithm_rejected(self):
+        key = os.urandom(32)
+        blob = bytearray(seal(key, b"segredo"))
+        blob[0] = 2
+        with pytest.raises(ValueError):
+            open_sealed(key, bytes(blob))
+
+
+class TestEnvelope:
+    """Testa chave de dados protegida pelo backend portátil"""
+
+    def test_portable_backend_persists_master_key(self, temp_data_dir):
+        key_path = os.path.join(temp_data_dir, "history.key")
+        envelope = EnvelopeCipher.generate()
+        wrapped = envelope.wrap(PortableBackend(key_path))
+        sealed = envelope.seal(b"item")
+
+        # Nova instância lê a mesma chave mestra do disco
+        restored = EnvelopeCipher.unwrap(PortableBackend(key_path), wrapped)
+        assert restored.open(sealed) == b"item"
+
+    def test_unwrap_fails_with_other_master_key(self, temp_data_dir):
+        envelope = EnvelopeCipher.generate()
+        wrapped = envelope.wrap(
+            PortableBackend(os.path.join(temp_data_dir, "a.key"))
+        )
+        with pytest.raises(ValueError):
+            EnvelopeCipher.unwrap(
+                PortableBackend(os.path.join(temp_data_dir, "b.key")), wrapped
+            )
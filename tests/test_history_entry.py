@@ -0,0 +1,73 @@
+"""
+Testes para a representação compacta dos itens do histórico
+"""
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from dahora_app.history_entry import (
+    HistoryEntry,
+    fingerprint_text,
+    log_fingerprint,
+)
+
+
+class TestHistoryEntry:
+    """Testa conversão sem perdas e compatibilidade com dict"""
+
+    @pytest.mark.parametrize(
+        "timestamp",
+        [
+            "2026-01-05T10:20:30.123456",
+            "2026-01-05T10:20:30",
+            "",
+            "ontem",
+            "2026-01-05T10:20:30+00:00",
+        ],
+    )
+    def test_roundtrip_is_lossless(self, timestamp):
+        raw = {"text": "abc", "timestamp": timestamp, "app": "Dahora App"}
+        assert HistoryEntry.from_dict(raw).to_dict() == raw
+
+    def test_timestamp_stored_as_epoch(self):
+        entry = HistoryEntry.from_dict(
+            {"text": "x", "timestamp": "2026-01-05T10:20:30", "app": ""}
+        )
+        assert entry.created == datetime(2026, 1, 5, 10, 20, 30).timestamp()
+        assert entry._raw_timestamp is None
+
+    def test_app_is_interned(self):
+        a = HistoryEntry("a", None, "".join(["Dahora", " App"]))
+        b = HistoryEntry("b", None, "".join(["Dahora ", "App"]))
+        assert a.app is b.app
+
+    def test_mapping_access(self):
+        entry = HistoryEntry.from_dict({"text": "x", "timestamp": "", "app": "A"})
+        assert entry["text"] == "x"
+        assert entry.get("app") == "A"
+        assert entry.get("outro", 1) == 1
+        with pytest.raises(KeyError):
+            entry["outro"]
+        assert entry == {"text": "x", "timestamp": "", "app": "A"}
+
+    def test_fingerprint_computed_once_at_creation(self):
+        entry = HistoryEntry("texto")
+        assert entry.fingerprint == fingerprint_text("texto")
+
+    def test_log_fingerprint_is_stable_across_runs(self):
+        # Não usa hash(): o valor é o mesmo em qualquer processo
+        expected = hashlib.sha256("texto".encode("utf-8")).hexdigest()[:12]
+        assert log_fingerprint("texto") == expected
+        entry = HistoryEntry("texto")
+        assert entry.log_fingerprint == expected
+        blob_entry = HistoryEntry("prévia", blob="ab" * 32, size=10)
+        assert blob_entry.log_fingerprint == "ab" * 6
+
+    def test_digest_is_stable_sha256_and_cached(self):
+        entry = HistoryEntry("texto")
+        assert entry.digest is entry.digest
+        assert entry.digest == hashlib.sha256(b"texto").hexdigest()
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(HistoryEntry("x"), "__dict__")
@@ -0,0 +1,239 @@
+"""
+Testes para o índice de trigramas da busca no histórico
+"""
+import random
+
+from dahora_app.history_index import (
+    IncrementalSearch,
+    TrigramIndex,
+    find_term,
+    max_typos,
+    normalize_text,
+    refines,
+    split_terms,
+    substring_distance,
+)
+from dahora_app.history_entry import HistoryEntry
+
+
+def _index(*texts, **kwargs):
+    index = TrigramIndex(**kwargs)
+    for i, text in enumerate(texts):
+        index.add(i, text)
+    return index
+
+
+class TestTrigramIndex:
+    """Testa consultas e manutenção incremental do índice"""
+
+    def test_split_terms(self):
+        assert split_terms("  Foo   BAR ") == ["foo", "bar"]
+        assert split_terms("") == []
+
+    def test_normalize_text_ignores_case_and_accents(self):
+        assert normalize_text("Ação Rápida") == "acao rapida"
+        assert normalize_text("STRASSE") == normalize_text("Straße")
+        assert normalize_text("ﬁm") == "fim"
+        assert split_terms("  CORAÇÃO  Pão ") == ["coracao", "pao"]
+
+    def test_accent_insensitive_search(self):
+        index = _index("Ação urgente", "acao sem acento", "outra coisa")
+        assert index.search("acao") == [1, 0]
+        assert index.search("AÇÃO urg") == [0]
+
+    def test_find_term_maps_back_to_original_positions(self):
+        text = "Straße da ação"
+        start, end = find_term(text, "acao")
+        assert text[start:end] == "ação"
+        start, end = find_term(text, "strasse")
+        assert text[start:end] == "Straße"
+        assert find_term(text, "acao", end + 5) == (-1, -1)
+        assert find_term("abc ABC", "abc", 1) == (4, 7)
+
+    def test_empty_query_returns_all_newest_first(self):
+        index = _index("a", "b", "c")
+        assert index.search("") == [2, 1, 0]
+
+    def test_substring_case_insensitive(self):
+        index = _index("Relatório Mensal", "outra coisa", "RELATÓRIO anual")
+        assert index.search("relatório") == [2, 0]
+
+    def test_multi_term_and(self):
+        index = _index("alpha beta", "alpha gamma", "beta gamma alpha")
+        assert index.search("alpha gamma") == [2, 1]
+        assert index.search("gamma beta") == [2]
+
+    def test_short_terms_fall_back_to_scan(self):
+        index = _index("ab cd", "xy", "abxy")
+        assert index.search("ab") == [2, 0]
+        assert index.search("xy ab") == [2]
+
+    def test_limit(self):
+        index = _index(*["item %d" % i for i in range(10)])
+        assert index.search("item", limit=3) == [9, 8, 7]
+
+    def test_remove_and_readd(self):
+        index = _index("banana", "bandana")
+        index.remove(0)
+        assert index.search("ana") == [1]
+        assert len(index) == 1
+        index.add(0, "banana")
+        # Re-adicionado vira o mais recente
+        assert index.search("ana") == [0, 1]
+
+    def test_unindexed_long_text_is_still_found(self):
+        index = _index("x" * 50 + "agulha", "curto", max_indexed_chars=20)
+        assert index.search("agulha") == [0]
+        assert index.search("curto") == [1]
+
+    def test_no_match(self):
+        index = _index("abc", "def")
+        assert index.search("zzz") == []
+        assert index.search("abc def") == []
+
+    def test_clear(self):
+        index = _index("abc")
+        index.clear()
+        assert len(index) == 0
+        assert index.search("abc") == []
+
+
+class TestIncrementalSearch:
+    """Testa o reaproveitamento do resultado anterior na digitação"""
+
+    def _search(self, texts, version=None, limit=None):
+        index = _index(*texts)
+        entries = [HistoryEntry(text) for text in texts]
+        calls = []
+
+        def full(query):
+            calls.append(query)
+            return [entries[k] for k in index.search(query, limit)]
+
+        incremental = IncrementalSearch(full, version, limit)
+        return (lambda q: [e.text for e in incremental.search(q)]), incremental, calls
+
+    def test_refines(self):
+        assert refines(["relat"], ["relato"])
+        assert refines(["relat"], ["mensal", "relatorio"])
+        assert not refines(["relato"], ["relat"])
+        assert not refines(["relat"], [])
+        assert refines([], ["x"])
+
+    def test_typing_filters_previous_results(self):
+        texts = ["relatório mensal", "relação", "relato anual", "outro"]
+        search, incremental, calls = self._search(texts)
+        assert search("rel") == texts[2::-1]
+        assert search("rela") == texts[2::-1]
+        assert search("relat") == ["relato anual", "relatório mensal"]
+        assert search("relat mens") == ["relatório mensal"]
+        assert incremental.last_refined
+        assert calls == ["rel"]
+
+    def test_deletion_or_edit_falls_back_to_full_search(self):
+        texts = ["relatório", "relação"]
+        search, incremental, calls = self._search(texts)
+        search("relat")
+        assert search("rela") == ["relação", "relatório"]
+        assert not incremental.last_refined
+        search("relx")  # edição no meio
+        search("")
+        search("r")
+        assert calls == ["relat", "rela", "relx", "", "r"]
+
+    def test_truncated_result_is_not_refined(self):
+        texts = ["relato 1", "relação", "relato 2", "relato 3"]
+        search, incremental, calls = self._search(texts, limit=2)
+        assert search("rel") == ["relato 3", "relato 2"]
+        # Truncado: "relato 1" ficou de fora e precisa da busca completa
+        assert search("relato") == ["relato 3", "relato 2"]
+        assert not incremental.last_refined
+        assert search("relato 1") == ["relato 1"]
+        assert search("relato 1") == ["relato 1"]
+        assert incremental.last_refined
+        assert calls == ["rel", "relato", "relato 1"]
+
+    def test_history_change_or_invalidate_forces_full_search(self):
+        version = [0]
+        search, incremental, calls = self._search(["abc"], lambda: version[0])
+        search("ab")
+        version[0] += 1
+        search("abc")
+        incremental.invalidate()
+        search("abc")
+        search("abc")
+        assert calls == ["ab", "abc", "abc"]
+
+    def test_index_version_changes_on_updates(self):
+        index = TrigramIndex()
+        versions = [index.version]
+        index.add(1, "a")
+        versions.append(index.version)
+        index.remove(1)
+        versions.append(index.version)
+        index.remove(1)  # ausente: não altera
+        index.clear()
+        versions.append(index.version)
+        assert versions == sorted(set(versions))
+
+
+def _osa_distance_brute(term, text):
+    """Menor distância (com inversões) de `term` a um trecho de `text`"""
+    rows = [[0] * (len(text) + 1)]
+    for i in range(1, len(term) + 1):
+        row = [i]
+        for j in range(1, len(text) + 1):
+            best = min(
+                rows[i - 1][j] + 1,
+                row[j - 1] + 1,
+                rows[i - 1][j - 1] + (term[i - 1] != text[j - 1]),
+            )
+            if i > 1 and j > 1 and term[i - 1] == text[j - 2] and term[i - 2] == text[j - 1]:
+                best = min(best, rows[i - 2][j - 2] + 1)
+            row.append(best)
+        rows.append(row)
+    return min(rows[-1])
+
+
+class TestFuzzySearch:
+    """Testa a busca aproximada"""
+
+    def test_substring_distance_matches_dynamic_programming(self):
+        rng = random.Random(3)
+        for _ in range(2000):
+            term = "".join(rng.choice("abc") for _ in range(rng.randint(1, 8)))
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 16)))
+            expected = _osa_distance_brute(term, text)
+            assert substring_distance(term, text, 99) == expected
+            assert substring_distance(term, text, expected - 1) is None
+
+    def test_max_typos(self):
+        assert [max_typos("a" * n) for n in (2, 3, 4, 7, 8)] == [0, 0, 1, 1, 2]
+
+    def test_tolerates_typos_and_ranks_exact_first(self):
+        index = _index("relatoiro", "relatório mensal", "relatorio anual", "outra coisa")
+        keys = [key for key, _ in index.fuzzy_search("relatorio")]
+        # Exatos (mais recente primeiro entre empatados), depois o com erro
+        assert keys == [2, 1, 0]
+        assert [key for key, _ in index.fuzzy_search("relatrio mensal")] == [1]
+        assert index.fuzzy_search("xyzxyzxyz") == []
+        # Letras invertidas contam como um erro
+        assert substring_distance("cleinte", "o cliente", 1) == 1
+        assert [key for key, _ in index.fuzzy_search("mensla")] == [1]
+
+    def test_short_terms_must_match_exactly(self):
+        index = _index("abc", "abd", "xyz")
+        assert [key for key, _ in index.fuzzy_search("ab")] == [1, 0]
+        assert [key for key, _ in index.fuzzy_search("abx")] == []
+
+    def test_frequency_and_limit(self):
+        index = _index("cliente antigo", "cliente reutilizado", "cliente novo")
+        uses = {1: 5}
+        ranked = index.fuzzy_search("cliente", frequency=lambda k: uses.get(k, 0))
+        # Reutilizado supera o mais recente; sem uso, o mais antigo fica por último
+        assert [key for key, _ in ranked] == [1, 2, 0]
+        assert len(index.fuzzy_search("cliente", limit=1)) == 1
+
+    def test_max_candidates_bounds_verification(self):
+        index = _index(*["pedido %d" % i for i in range(50)])
+        assert len(index.fuzzy_search("pedido", max_candidates=10)) == 10
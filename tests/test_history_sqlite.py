@@ -0,0 +1,380 @@
+"""
+Testes para o motor SQLite do histórico
+"""
+import os
+import sqlite3
+import time
+
+import dahora_app.clipboard_manager as clipboard_module
+from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.history_crypto import PortableBackend
+from dahora_app.history_sqlite import SqliteHistoryStore
+
+
+def _item(text):
+    return {"text": text, "timestamp": "", "app": ""}
+
+
+class TestSqliteHistoryStore:
+    """Testa o store SQLite isoladamente"""
+
+    def test_add_and_load_recent_keeps_order(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        for i in range(5):
+            store.add(_item(f"item {i}"), f"h{i}")
+        assert [i["text"] for i in store.load_recent(3)] == ["item 2", "item 3", "item 4"]
+        store.close()
+
+    def test_duplicate_hash_ignored(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        store.add(_item("a"), "h")
+        store.add(_item("a"), "h")
+        assert store.count() == 1
+        store.close()
+
+    def test_search_uses_index_and_short_terms(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        store.add(_item("Relatório mensal"), "h1")
+        store.add(_item("outra coisa"), "h2")
+        store.add(_item("RELATÓRIO anual"), "h3")
+
+        assert [i["text"] for i in store.search("relat")] == [
+            "RELATÓRIO anual",
+            "Relatório mensal",
+        ]
+        assert [i["text"] for i in store.search("ou")] == ["outra coisa"]
+        assert len(store.search("")) == 3
+        assert len(store.search("relat", limit=1)) == 1
+        store.close()
+
+    def test_blob_columns_roundtrip(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        item = dict(_item("prévia"), blob="ab" * 32, size=10_000_000)
+        store.add(item, "ab" * 32)
+        store.add(_item("inline"), "h2")
+        loaded = store.load_recent(2)
+        assert loaded[0] == item
+        assert "blob" not in loaded[1]
+        store.close()
+
+    def test_search_ignores_accents(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        store.add(_item("Ação pendente"), "h1")
+        store.add(_item("pé"), "h2")
+        assert [i["text"] for i in store.search("acao")] == ["Ação pendente"]
+        assert [i["text"] for i in store.search("PE")] == ["pé", "Ação pendente"]
+        store.remove_hashes(["h1"])
+        assert store.search("acao") == []
+        store.close()
+
+    def test_migrates_previous_schema(self, temp_data_dir):
+        path = os.path.join(temp_data_dir, "h.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                timestamp TEXT NOT NULL DEFAULT '',
+                app TEXT NOT NULL DEFAULT '',
+                text_hash TEXT NOT NULL UNIQUE
+            );
+            CREATE VIRTUAL TABLE entries_fts USING fts5(
+                text, content='entries', content_rowid='id', tokenize='trigram'
+            );
+            CREATE TRIGGER entries_ai AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            INSERT INTO entries(text, text_hash) VALUES ('Relatório de ação', 'h1');
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        store = SqliteHistoryStore(path)
+        store.open()
+        assert [i["text"] for i in store.search("relatorio acao")] == [
+            "Relatório de ação"
+        ]
+        store.add(_item("outra ação"), "h2")
+        assert len(store.search("acao")) == 2
+        store.close()
+
+    def test_remove_and_clear(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        store.add(_item("alpha"), "h1")
+        store.add(_item("beta"), "h2")
+        store.remove_hashes(["h1"])
+        assert store.search("alpha") == []
+        store.clear()
+        assert store.count() == 0
+        store.close()
+
+    def test_readd_moves_to_top_and_trim(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        for i in range(5):
+            store.add(_item(f"item {i}"), f"h{i}")
+        store.add(dict(_item("prévia"), blob="ab" * 32, size=10), "hb")
+        store.add(_item("item 1"), "h1")  # copiado de novo: vai para o topo
+        assert store.count() == 6
+        assert store.load_recent(1)[0]["text"] == "item 1"
+
+        assert store.trim(10) == []
+        assert store.trim(2) == []
+        assert [i["text"] for i in store.load_recent(10)] == ["prévia", "item 1"]
+        store.add(_item("item 5"), "h5")
+        assert store.trim(2) == ["ab" * 32]
+        assert store.count() == 2
+        store.close()
+
+    def test_search_pages_and_excludes(self, temp_data_dir):
+        store = SqliteHistoryStore(os.path.join(temp_data_dir, "h.db"))
+        store.open()
+        for i in range(6):
+            store.add(_item(f"linha {i}"), f"h{i}")
+
+        def texts(**kwargs):
+            return [i["text"] for i in store.search("linha", **kwargs)]
+
+        assert texts(limit=2) == ["linha 5", "linha 4"]
+        assert texts(limit=2, offset=2) == ["linha 3", "linha 2"]
+        assert texts(offset=4) == ["linha 1", "linha 0"]
+        assert texts(limit=2, exclude_hashes=["h5", "h3"]) == ["linha 4", "linha 2"]
+        store.close()
+
+    def test_remove_expired_and_recompute(self, temp_data_dir):
+        path = os.path.join(temp_data_dir, "h.db")
+        store = SqliteHistoryStore(path)
+        store.open()
+        store.add(_item("senha"), "h1", expires_at=100.0)
+        store.add(_item("nota"), "h2")
+        assert store.remove_expired(50.0) == []
+        assert [i["text"] for i in store.remove_expired(150.0)] == ["senha"]
+        assert store.count() == 1
+
+        store.recompute_expiry(lambda item: 200.0, "política")
+        store.close()
+        store = SqliteHistoryStore(path)
+        store.open()
+        assert store.get_meta("expiry_policy") == "política"
+        assert [i["text"] for i in store.remove_expired(250.0)] == ["nota"]
+        assert store.count() == 0
+        store.close()
+
+
+class TestClipboardManagerSqlite:
+    """Testa o ClipboardManager com motor SQLite"""
+
+    def test_migrates_json_history_once(self, monkeypatch, temp_data_dir):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+        backend = PortableBackend(os.path.join(temp_data_dir, "history.key"))
+
+        legacy = ClipboardManager()
+        legacy.set_encryption_backend(backend)
+        legacy.add_to_history("antigo 1")
+        legacy.add_to_history("antigo 2")
+        legacy.flush_history()
+
+        manager = ClipboardManager()
+        manager.set_encryption_backend(backend)
+        manager.set_storage_engine("sqlite")
+        manager.load_history()
+
+        assert [i["text"] for i in manager.clipboard_history] == ["antigo 1", "antigo 2"]
+        assert not os.path.exists(history_path)
+        assert os.path.exists(history_path + ".migrated")
+
+    def test_add_evict_and_search(self, monkeypatch, temp_data_dir):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+        manager = ClipboardManager()
+        manager.set_storage_engine("sqlite")
+        manager.max_history_items = 10
+        manager.load_history()
+        for i in range(12):
+            manager.add_to_history(f"linha {i:02d}")
+
+        results = manager.search("linha")
+        assert len(results) == 10
+        assert results[0]["text"] == "linha 11"
+        assert manager.search("linha 00") == []
+
+        manager.clear_history()
+        assert manager.search("") == []
+
+    def test_expired_items_leave_the_database(self, monkeypatch, temp_data_dir):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+        manager = ClipboardManager()
+        manager.set_storage_engine("sqlite")
+        manager.load_history()
+        manager.set_expiry_policy(0, [("^senha", 60)])
+        manager.add_to_history("senha antiga")
+        manager.add_to_history("nota")
+        manager.flush_history()
+
+        assert manager.expire_due(time.time() + 120) == 1
+        manager.add_to_history("senha antiga")  # copiada de novo
+        manager.flush_history()
+
+        reloaded = ClipboardManager()
+        reloaded.set_storage_engine("sqlite")
+        reloaded.load_history()
+        assert [i["text"] for i in reloaded.clipboard_history] == [
+            "nota",
+            "senha antiga",
+        ]
+
+    def test_tail_first_load(self, monkeypatch, temp_data_dir):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+
+        manager = ClipboardManager()
+        manager.set_storage_engine("sqlite")
+        manager.load_history()
+        for i in range(8):
+            manager.add_to_history(f"linha {i}")
+        manager.flush_history()
+
+        reloaded = ClipboardManager()
+        reloaded.set_storage_engine("sqlite")
+        reloaded.load_history(tail_items=2)
+        assert reloaded.wait_until_loaded(5)
+        assert [i["text"] for i in reloaded.clipboard_history] == [
+            f"linha {i}" for i in range(8)
+        ]
+
+    def test_item_cap_depends_on_engine(self, monkeypatch, temp_data_dir):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+        manager = ClipboardManager()
+        manager.set_max_history_items(50_000)
+        assert manager.max_history_items == 1000
+
+        # O valor pedido volta a valer ao trocar para o SQLite
+        manager.set_storage_engine("sqlite")
+        assert manager.max_history_items == 50_000
+        manager.set_max_history_items(5_000_000)
+        assert manager.max_history_items == 1_000_000
+
+    def _paged_manager(self, monkeypatch, temp_data_dir, window=20, max_items=100):
+        history_path = os.path.join(temp_data_dir, "clipboard_history.json")
+        monkeypatch.setattr(clipboard_module, "HISTORY_FILE", history_path)
+        monkeypatch.setattr(clipboard_module, "SQLITE_MEMORY_ITEMS", window)
+
+        manager = ClipboardManager()
+        manager.set_encryption_backend(
+            PortableBackend(os.path.join(temp_data_dir, "history.key"))
+        )
+        manager.set_storage_engine("sqlite")
+        manager.set_max_history_items(max_items)
+        manager.load_history()
+        return manager
+
+    def test_paged_history_keeps_only_recent_items_in_memory(
+        self, monkeypatch, temp_data_dir
+    ):
+        manager = self._paged_manager(monkeypatch, temp_data_dir)
+        manager.add_many([f"linha {i:02d}" for i in range(60)])
+        manager.flush_history()
+
+        assert len(manager.clipboard_history) == 20
+        assert manager.clipboard_history[0]["text"] == "linha 40"
+        assert manager.get_history_size() == 60
+        # Itens fora da memória continuam buscáveis
+        assert [i["text"] for i in manager.search("linha 05")] == ["linha 05"]
+
+        reloaded = self._paged_manager(monkeypatch, temp_data_dir)
+        assert len(reloaded.clipboard_history) == 20
+        pages = [reloaded.search("linha", 25, offset=o) for o in (0, 25, 50)]
+        assert [len(p) for p in pages] == [25, 25, 10]
+        texts = [i["text"] for p in pages for i in p]
+        assert texts == [f"linha {i:02d}" for i in range(59, -1, -1)]
+
+        # Diminuir o limite corta o banco na próxima gravação
+        reloaded.set_max_history_items(30)
+        reloaded.flush_history()
+        assert reloaded.get_history_size() == 30
+        assert reloaded.search("linha 29") == []
+
+    def test_search_reads_unsaved_state_without_writing(
+        self, monkeypatch, temp_data_dir
+    ):
+        manager = self._paged_manager(monkeypatch, temp_data_dir, max_items=10)
+        manager.set_persistence_config(10000, 4096)
+        manager.add_to_history("nota antiga")
+        manager.add_to_history("nota removida")
+        manager.flush_history()
+
+        manager.add_to_history("nota nova")
+        manager.remove(["nota removida"])
+
+        def fail(**kwargs):
+            raise AssertionError("a busca não deve gravar")
+
+        monkeypatch.setattr(manager, "_write_history", fail)
+        assert [i["text"] for i in manager.search("nota")] == [
+            "nota nova",
+            "nota antiga",
+        ]
+        assert [i["text"] for i in manager.search("nota", 1, offset=1)] == [
+            "nota antiga"
+        ]
+        # O banco ainda está atrás da memória
+        store = manager._sqlite_store
+        assert [i["text"] for i in store.search("nota")] == [
+            "nota removida",
+            "nota antiga",
+        ]
+
+    def test_remove_item_outside_memory(self, monkeypatch, temp_data_dir):
+        manager = self._paged_manager(monkeypatch, temp_data_dir, window=5)
+        manager.add_many([f"linha {i}" for i in range(10)])
+        manager.flush_history()
+
+        old = manager.search("linha 2")
+        assert manager.remove([i.key for i in old]) == 1
+        assert manager.search("linha 2") == []
+
+        reloaded = self._paged_manager(monkeypatch, temp_data_dir, window=5)
+        assert reloaded.get_history_size() == 9
+        assert reloaded.search("linha 2") == []
+
+    def test_expire_stored_items(self, monkeypatch, temp_data_dir):
+        manager = self._paged_manager(monkeypatch, temp_data_dir, window=5)
+        manager.set_expiry_policy(0, [("^senha", 60)])
+        manager.add_many(["senha 1", "nota 1", "senha 2"])
+        manager.add_many([f"linha {i}" for i in range(5)])
+        manager.flush_history()
+        assert len(manager.clipboard_history) == 5
+
+        assert manager.expire_stored(time.time() + 120) == 2
+        assert manager.search("senha") == []
+        assert [i["text"] for i in manager.search("nota")] == ["nota 1"]
+
+    def test_trimmed_blob_is_deleted(self, monkeypatch, temp_data_dir):
+        manager = self._paged_manager(monkeypatch, temp_data_dir, window=5, max_items=10)
+        big = manager.add_to_history("x" * 300_000)
+        assert big.blob
+        blob_path = os.path.join(temp_data_dir, "history_blobs")
+        manager.flush_history()
+        assert os.listdir(blob_path)
+
+        # A linha guarda o blob: o item volta completo na carga
+        reloaded = self._paged_manager(monkeypatch, temp_data_dir, window=5, max_items=10)
+        assert reloaded.load_text(reloaded.clipboard_history[-1]) == "x" * 300_000
+
+        reloaded.add_many([f"linha {i}" for i in range(10)])
+        reloaded.flush_history()
+        assert reloaded.get_history_size() == 10
+        assert not [n for n in os.listdir(blob_path) if n.endswith(".blob")]
@@ -0,0 +1,60 @@
+"""
+Testes para a fila de ingestão em lote
+"""
+import threading
+
+from dahora_app.ingest_queue import IngestQueue
+
+
+class TestIngestQueue:
+    """Testa a coalescência e o encerramento da fila"""
+
+    def test_coalesces_within_window(self):
+        batches = []
+        release = threading.Event()
+
+        def sink(batch):
+            release.wait(2)
+            batches.append(batch)
+
+        queue = IngestQueue(sink, window_s=0.05)
+        for i in range(10):
+            queue.put(str(i))
+        release.set()
+        assert queue.flush(2)
+        assert batches == [[str(i) for i in range(10)]]
+        queue.stop(2)
+
+    def test_respects_max_batch_and_order(self):
+        batches = []
+        queue = IngestQueue(batches.append, window_s=0.05, max_batch=4)
+        for i in range(10):
+            queue.put(i)
+        assert queue.flush(2)
+        assert all(len(b) <= 4 for b in batches)
+        assert [x for b in batches for x in b] == list(range(10))
+        queue.stop(2)
+
+    def test_sink_error_does_not_stop_queue(self):
+        delivered = []
+
+        def sink(batch):
+            if batch == ["ruim"]:
+                raise RuntimeError("falha")
+            delivered.extend(batch)
+
+        queue = IngestQueue(sink, window_s=0.0)
+        queue.put("ruim")
+        assert queue.flush(2)
+        queue.put("bom")
+        assert queue.flush(2)
+        assert delivered == ["bom"]
+        queue.stop(2)
+
+    def test_stop_drains_and_rejects_new_items(self):
+        delivered = []
+        queue = IngestQueue(delivered.extend, window_s=0.5)
+        queue.put("a")
+        queue.stop(2)
+        assert delivered == ["a"]
+        assert queue.put("b") is False
@@ -0,0 +1,75 @@
+"""
+Testes para a thread de persistência do histórico
+"""
+import threading
+import time
+
+from dahora_app.persistence_worker import PersistenceWorker
+
+
+class TestPersistenceWorker:
+    """Testa a coalescência, os limites e o encerramento"""
+
+    def test_coalesces_notifications_within_latency(self):
+        writes = []
+        worker = PersistenceWorker(lambda: writes.append(time.monotonic()), max_latency_s=0.1)
+        start = time.monotonic()
+        for _ in range(20):
+            worker.notify()
+        assert worker.flush(2)
+        assert len(writes) == 1
+        # Sem o flush, a gravação aconteceria no fim da janela
+        worker.notify()
+        deadline = time.monotonic() + 2
+        while len(writes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(writes) == 2
+        assert writes[1] - start < 1.5
+        worker.stop(2)
+
+    def test_max_pending_triggers_write_early(self):
+        written = threading.Event()
+        worker = PersistenceWorker(written.set, max_latency_s=60.0, max_pending=5)
+        for _ in range(4):
+            worker.notify()
+        assert not written.wait(0.1)
+        worker.notify()
+        assert written.wait(2)
+        worker.stop(2)
+
+    def test_discard_skips_worker_write(self):
+        writes = []
+        worker = PersistenceWorker(lambda: writes.append(1), max_latency_s=0.05)
+        worker.notify()
+        worker.discard()
+        assert worker.pending == 0
+        time.sleep(0.15)
+        assert writes == []
+        worker.stop(2)
+
+    def test_write_error_is_counted_and_worker_survives(self):
+        calls = []
+
+        def write():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("disco cheio")
+
+        worker = PersistenceWorker(write, max_latency_s=0.0)
+        worker.notify()
+        assert worker.flush(2)
+        worker.notify()
+        assert worker.flush(2)
+        assert len(calls) == 2
+        assert worker.writes == 2
+        worker.stop(2)
+
+    def test_stop_writes_pending_and_ignores_later_notifications(self):
+        writes = []
+        worker = PersistenceWorker(lambda: writes.append(1), max_latency_s=60.0)
+        worker.notify()
+        assert worker.stop(2)
+        assert writes == [1]
+        worker.notify()
+        assert worker.pending == 0
+        assert worker.flush(0.1)
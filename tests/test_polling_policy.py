@@ -0,0 +1,75 @@
+"""
+Testes para a curva de polling do monitor de clipboard
+"""
+import pytest
+
+from dahora_app.clipboard_manager import ClipboardManager
+from dahora_app.polling_policy import PollingPolicy
+
+
+def _policy(**kwargs):
+    params = dict(
+        burst_interval_s=0.25,
+        burst_window_s=2.0,
+        idle_ceiling_s=10.0,
+        jitter=0.0,
+    )
+    params.update(kwargs)
+    return PollingPolicy(3.0, 30.0, **params)
+
+
+class TestPollingPolicy:
+    """Testa a curva isoladamente"""
+
+    def test_burst_then_active_then_ceiling(self):
+        policy = _policy()
+        assert policy.interval(0.0) == 0.25
+        assert policy.interval(1.9) == 0.25
+        assert policy.interval(2.0) == pytest.approx(3.0)
+        # Meia-vida: metade do caminho entre o ativo e o teto
+        assert policy.interval(32.0) == pytest.approx(6.5)
+        assert policy.interval(10_000.0) == pytest.approx(10.0)
+
+    def test_curve_is_monotonic_after_burst(self):
+        policy = _policy()
+        values = [policy.interval(2.0 + i) for i in range(0, 600, 5)]
+        assert values == sorted(values)
+
+    def test_jitter_stays_within_bounds(self):
+        low = _policy(jitter=0.2, rng=lambda: 0.0)
+        high = _policy(jitter=0.2, rng=lambda: 0.999999)
+        assert low.interval(2.0) == pytest.approx(2.4)
+        assert high.interval(2.0) == pytest.approx(3.6, rel=1e-5)
+        # Nunca abaixo do burst nem acima do teto
+        assert low.interval(0.0) == 0.25
+        assert high.interval(10_000.0) == 10.0
+
+    def test_invalid_shape_is_normalized(self):
+        policy = PollingPolicy(3.0, 30.0, burst_interval_s=5.0, idle_ceiling_s=1.0)
+        assert policy.burst_interval_s == 3.0
+        assert policy.idle_ceiling_s == 3.0
+
+
+class TestSetMonitoringConfig:
+    """Testa a configuração da curva pelo ClipboardManager"""
+
+    def test_exposes_and_clamps_curve(self):
+        manager = ClipboardManager()
+        manager.set_monitoring_config(
+            2.0, 60.0, burst_interval_s=0.01, burst_window_s=99, idle_ceiling_s=500, jitter=2
+        )
+        policy = manager.polling_policy
+        assert policy.active_interval_s == 2.0
+        assert policy.half_life_s == 60.0
+        assert policy.burst_interval_s == 0.05
+        assert policy.burst_window_s == 30.0
+        assert policy.idle_ceiling_s == 120.0
+        assert policy.jitter == 0.5
+
+    def test_omitted_parameters_keep_current_curve(self):
+        manager = ClipboardManager()
+        manager.set_monitoring_config(3.0, 30.0, burst_window_s=5.0, idle_ceiling_s=20.0)
+        manager.set_monitoring_config(4.0, 40.0)
+        assert manager.polling_policy.burst_window_s == 5.0
+        assert manager.polling_policy.idle_ceiling_s == 20.0
+        assert manager.polling_policy.active_interval_s == 4.0
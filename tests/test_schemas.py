@@ -5,6 +5,7 @@ import pytest
 from pydantic import ValidationError
 from dahora_app.schemas import (
     CustomShortcutSchema,
+    ExpiryRuleSchema,
     SettingsSchema,
     NotificationSchema,
     AppConfigSchema
@@ -90,9 +91,26 @@ class TestSettingsSchema:
         with pytest.raises(ValidationError):
             SettingsSchema(max_history_items=5)
         
-        # Máximo 1000
+        # Acima de 1000 no motor json: reduzido, sem invalidar o resto
+        settings = SettingsSchema(max_history_items=2000, prefix="meu")
+        assert settings.max_history_items == 1000
+        assert settings.prefix == "meu"
+
+    def test_max_history_bounds_sqlite(self):
+        # O motor sqlite guarda o excedente só no banco
+        settings = SettingsSchema(
+            max_history_items=200000, history_storage_engine="sqlite"
+        )
+        assert settings.max_history_items == 200000
+
+        # Trocar o motor para json reduz o limite
+        settings.history_storage_engine = "json"
+        assert settings.max_history_items == 1000
+
         with pytest.raises(ValidationError):
-            SettingsSchema(max_history_items=2000)
+            SettingsSchema(
+                max_history_items=2_000_000, history_storage_engine="sqlite"
+            )
     
     def test_bracket_must_be_different(self):
         with pytest.raises(ValidationError) as exc_info:
@@ -218,6 +236,19 @@ class TestSettingsSchema:
         with pytest.raises(ValidationError):
             SettingsSchema(tray_menu_cache_window_ms=2001)
     
+    def test_history_expiry_rules(self):
+        settings = SettingsSchema(
+            history_entry_ttl_minutes=30,
+            history_expiry_rules=[{"pattern": r"^sk-", "ttl_minutes": 1}],
+        )
+        assert settings.history_expiry_rules[0].ttl_minutes == 1
+
+        with pytest.raises(ValidationError):
+            ExpiryRuleSchema(pattern="(sem fechar", ttl_minutes=1)
+
+        with pytest.raises(ValidationError):
+            SettingsSchema(history_entry_ttl_minutes=-1)
+
     def test_extra_fields_rejected(self):
         with pytest.raises(ValidationError):
             SettingsSchema(unknown_field="should_fail")
@@ -0,0 +1,91 @@
+"""
+Testes para o worker de busca em segundo plano
+"""
+import threading
+
+from dahora_app.search_worker import SearchWorker
+
+
+class _Recorder:
+    def __init__(self):
+        self.delivered = []
+        self.event = threading.Event()
+
+    def __call__(self, generation, query, result):
+        self.delivered.append((generation, query, result))
+        self.event.set()
+
+
+class TestSearchWorker:
+    """Testa gerações, descarte e entrega"""
+
+    def test_delivers_result_with_generation(self):
+        recorder = _Recorder()
+        worker = SearchWorker(lambda q: q.upper(), recorder)
+        generation = worker.submit("abc")
+        assert recorder.event.wait(2.0)
+        assert recorder.delivered == [(generation, "abc", "ABC")]
+        assert worker.is_current(generation)
+        worker.stop(1.0)
+
+    def test_superseded_queries_are_dropped(self):
+        started = threading.Event()
+        release = threading.Event()
+        executed = []
+
+        def search(query):
+            executed.append(query)
+            if query == "a":
+                started.set()
+                release.wait(2.0)
+            return query
+
+        recorder = _Recorder()
+        worker = SearchWorker(search, recorder)
+        worker.submit("a")
+        assert started.wait(2.0)
+        # Enquanto "a" roda, só a última consulta fica na fila
+        worker.submit("ab")
+        worker.submit("abc")
+        last = worker.submit("abcd")
+        release.set()
+        assert recorder.event.wait(2.0)
+        worker.stop(2.0)
+
+        assert executed == ["a", "abcd"]
+        assert recorder.delivered == [(last, "abcd", "abcd")]
+
+    def test_cancel_discards_running_result(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def search(query):
+            started.set()
+            release.wait(2.0)
+            return query
+
+        recorder = _Recorder()
+        worker = SearchWorker(search, recorder)
+        generation = worker.submit("x")
+        assert started.wait(2.0)
+        worker.cancel()
+        assert not worker.is_current(generation)
+        release.set()
+        worker.stop(2.0)
+        assert recorder.delivered == []
+
+    def test_errors_do_not_stop_the_worker(self):
+        recorder = _Recorder()
+
+        def search(query):
+            if query == "erro":
+                raise ValueError("falha")
+            return query
+
+        worker = SearchWorker(search, recorder)
+        worker.submit("erro")
+        generation = worker.submit("ok")
+        assert recorder.event.wait(2.0)
+        assert recorder.delivered[-1] == (generation, "ok", "ok")
+        worker.stop(1.0)
+        assert worker.submit("depois") == 0
@@ -9,6 +9,7 @@ import json
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 # Importa o módulo de settings
+import dahora_app.settings as settings_module
 from dahora_app.settings import SettingsManager
 
 
@@ -151,3 +152,48 @@ def test_settings_file_atomic_write(temp_data_dir):
         # Cleanup
         if os.path.exists(temp_file):
             os.remove(temp_file)
+
+
+def test_validate_settings_drops_invalid_expiry_rules():
+    """Regra de expiração inválida é descartada sem perder as demais configurações"""
+    settings_manager = SettingsManager()
+    result = settings_manager.validate_settings(
+        {
+            "prefix": "TEST",
+            "history_entry_ttl_minutes": 15,
+            "history_expiry_rules": [
+                {"pattern": "^senha", "ttl_minutes": 1},
+                {"pattern": "[", "ttl_minutes": 1},
+            ],
+        }
+    )
+
+    assert result["prefix"] == "TEST"
+    assert result["history_entry_ttl_minutes"] == 15
+    assert result["history_expiry_rules"] == [{"pattern": "^senha", "ttl_minutes": 1}]
+
+
+def test_max_history_above_json_limit_is_clamped_not_reset():
+    """Limite acima do motor json é reduzido sem descartar as demais configurações"""
+    settings_manager = SettingsManager()
+    result = settings_manager.validate_settings(
+        {"prefix": "TEST", "max_history_items": 50000, "history_storage_engine": "json"}
+    )
+
+    assert result["prefix"] == "TEST"
+    assert result["max_history_items"] == 1000
+
+
+def test_switching_engine_to_json_reclamps_max_history(monkeypatch, temp_data_dir):
+    """Trocar só o motor para json refaz o limite de itens"""
+    monkeypatch.setattr(
+        settings_module, "SETTINGS_FILE", os.path.join(temp_data_dir, "settings.json")
+    )
+    settings_manager = SettingsManager()
+    settings_manager.update_all(
+        {"history_storage_engine": "sqlite", "max_history_items": 50000}
+    )
+    assert settings_manager.max_history_items == 50000
+
+    settings_manager.update_all({"history_storage_engine": "json"})
+    assert settings_manager.max_history_items == 1000
@@ -0,0 +1,67 @@
+"""
+Testes para a janela de rolagem da lista virtualizada
+"""
+from dahora_app.ui.virtual_list import ListViewport
+
+
+class TestListViewport:
+    """Testa a faixa de índices visíveis"""
+
+    def test_rows_and_fractions(self):
+        viewport = ListViewport(visible=5)
+        viewport.set_total(3)
+        assert list(viewport.rows()) == [0, 1, 2]
+        assert viewport.fractions() == (0.0, 1.0)
+
+        viewport.set_total(100)
+        assert list(viewport.rows()) == [0, 1, 2, 3, 4]
+        assert viewport.fractions() == (0.0, 0.05)
+
+    def test_scroll_is_clamped(self):
+        viewport = ListViewport(visible=5)
+        viewport.set_total(20)
+        assert not viewport.scroll(-3)
+        assert viewport.scroll(3)
+        assert viewport.top == 3
+        assert viewport.scroll(100)
+        assert list(viewport.rows()) == [15, 16, 17, 18, 19]
+        assert viewport.scroll_pages(-1)
+        assert viewport.top == 10
+
+    def test_moveto_and_ensure_visible(self):
+        viewport = ListViewport(visible=4)
+        viewport.set_total(40)
+        assert viewport.moveto(0.5)
+        assert viewport.top == 20
+        assert viewport.moveto(1.0)
+        assert viewport.top == 36
+        assert viewport.ensure_visible(2)
+        assert viewport.top == 2
+        assert viewport.ensure_visible(10)
+        assert list(viewport.rows()) == [7, 8, 9, 10]
+        assert not viewport.ensure_visible(8)
+
+    def test_new_data_and_resize(self):
+        viewport = ListViewport(visible=4)
+        viewport.set_total(40)
+        viewport.moveto(1.0)
+        viewport.set_total(10)
+        assert viewport.top == 0
+        viewport.scroll(100)
+        assert viewport.top == 6
+        # Mais linhas cabem: a faixa recua para não passar do fim
+        assert viewport.set_visible(8)
+        assert list(viewport.rows()) == list(range(2, 10))
+
+    def test_next_page_keeps_position(self):
+        viewport = ListViewport(visible=5)
+        viewport.set_total(20)
+        assert not viewport.near_end(5)
+        viewport.scroll(12)
+        assert viewport.near_end(5)
+
+        viewport.grow(40)
+        assert viewport.top == 12
+        assert not viewport.near_end(5)
+        assert viewport.scroll(100)
+        assert list(viewport.rows()) == [35, 36, 37, 38, 39]